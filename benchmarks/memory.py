@@ -0,0 +1,71 @@
+"""
+Measures the memory per command of a large engine, before and after `compact()` and `freeze()`,
+and the memory of an overlay of it with one overridden command.
+
+    python benchmarks/memory.py --commands 100000
+
+Commands are registered in groups of one command with nine subcommands.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from invokify import InvokeEngine  # noqa: E402
+
+
+def build(commands: int) -> InvokeEngine:
+    engine = InvokeEngine()
+    for group in range(commands // 10):
+
+        def parent(amount: int):
+            return amount
+
+        command = engine.command(parent, name=f"group{group}", aliases=[f"g{group}"])
+        for index in range(9):
+
+            def child(amount: int, name: str = "all"):
+                return amount, name
+
+            command.subcommand(child, name=f"sub{index}")
+    return engine
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=100_000)
+    parser.add_argument("--overlays", type=int, default=10)
+    args = parser.parse_args(argv)
+    total = args.commands // 10 * 10
+
+    tracemalloc.start()
+    start = traced()
+    engine = build(total)
+    print(f"{total} commands")
+    print(f"registered {(traced() - start) / total:>8.0f} bytes per command")
+    engine.compact()
+    compacted = traced()
+    print(f"compacted  {(compacted - start) / total:>8.0f} bytes per command")
+    overlays = []
+    for _ in range(args.overlays):
+        overlay = engine.overlay()
+        overlay.edit("group0", "sub0")
+        overlays.append(overlay)
+    print(f"overlay    {(traced() - compacted) / max(args.overlays, 1):>8.0f} bytes per overlay")
+    del overlays
+    engine.freeze()
+    print(f"frozen     {(traced() - start) / total:>8.0f} bytes per command")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Compares the iterative `InvokeEngine.parse`, with and without `freeze()`, against the previous
+recursive implementation, which sliced the remaining arguments once per subcommand level.
+
+Run with `python benchmarks/parse_dispatch.py`.
+"""
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from invokify import Command, InvokeEngine  # noqa: E402
+
+DEPTHS = (1, 5, 10, 20)
+TAILS = (10, 100, 1_000, 10_000)
+
+
+def recursive_parse(
+    engine: InvokeEngine,
+    command_list: list[Any],
+    _command: Optional[Command] = None,
+    _callstack: Optional[list[Command]] = None,
+) -> tuple[Any, ...]:
+    if _callstack is None:
+        _callstack = []
+    else:
+        _callstack.append(_command)  # type: ignore
+
+    if len(command_list) == 0:
+        return (_command, command_list, tuple(_callstack))
+
+    if _command is None:
+        command = engine.commands.get(command_list[0])
+    else:
+        command = _command.children.get(command_list[0])
+
+    if command is None:
+        return (_command, command_list, tuple(_callstack))
+
+    return recursive_parse(engine, command_list[1:], command, _callstack)
+
+
+def build_engine(depth: int) -> tuple[InvokeEngine, list[str]]:
+    engine = InvokeEngine()
+    command = engine.command(lambda: None, name="level0")
+    for level in range(1, depth):
+        command = command.subcommand(lambda: None, name=f"level{level}")
+    return engine, [f"level{level}" for level in range(depth)]
+
+
+def main() -> None:
+    print(
+        f"{'depth':>5} {'tail':>6} {'recursive':>12} {'iterative':>12} {'frozen':>12} {'speedup':>8}"
+    )
+    for depth in DEPTHS:
+        engine, path = build_engine(depth)
+        frozen, _ = build_engine(depth)
+        frozen.freeze()
+        for tail in TAILS:
+            command_list = [*path, *range(tail)]
+            number = max(10, 200_000 // (tail + depth * 10))
+            old = timeit.timeit(lambda: recursive_parse(engine, command_list), number=number)
+            new = timeit.timeit(lambda: engine.parse(command_list), number=number)
+            fixed = timeit.timeit(lambda: frozen.parse(command_list), number=number)
+            print(
+                f"{depth:>5} {tail:>6} {old / number * 1e6:>10.2f}us {new / number * 1e6:>10.2f}us "
+                f"{fixed / number * 1e6:>10.2f}us {old / min(new, fixed):>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares the startup time of registering commands eagerly, by importing every module,
+against registering them lazily from a JSON manifest and from a binary manifest.
+
+    python benchmarks/startup.py --modules 200 --commands 20
+
+Every measurement runs in a fresh interpreter, so only invokify itself is imported yet.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from invokify import InvokeEngine, write_manifest  # noqa: E402
+
+EAGER = """
+import importlib, time
+import invokify
+start = time.perf_counter()
+from registry import engine
+for index in range({modules}):
+    importlib.import_module(f"commands{{index}}")
+registered = time.perf_counter()
+engine.parse(["module0_command0"])
+print(registered - start, time.perf_counter() - registered)
+"""
+
+BINARY = """
+import time
+import invokify
+start = time.perf_counter()
+from registry import engine
+invokify.load_manifest("manifest.bin", engine)
+registered = time.perf_counter()
+engine.parse(["module0_command0"])
+print(registered - start, time.perf_counter() - registered)
+"""
+
+LAZY = """
+import json, time
+import invokify
+start = time.perf_counter()
+from registry import engine
+with open("manifest.json") as file:
+    engine.register_manifest(json.load(file))
+registered = time.perf_counter()
+engine.parse(["module0_command0"])
+print(registered - start, time.perf_counter() - registered)
+"""
+
+
+def write_modules(directory: Path, modules: int, commands: int) -> None:
+    (directory / "registry.py").write_text("from invokify import InvokeEngine\n\nengine = InvokeEngine()\n")
+    manifest = []
+    for module in range(modules):
+        source = ["from invokify import meta", "from registry import engine", ""]
+        for command in range(commands):
+            name = f"module{module}_command{command}"
+            source.append(
+                textwrap.dedent(
+                    f"""
+                    @engine.command(aliases=["{name}_alias"])
+                    @meta.help("Runs {name}.")
+                    def {name}(amount: int, *names: str):
+                        return amount, names
+                    """
+                )
+            )
+            manifest.append(
+                {
+                    "name": name,
+                    "source": f"commands{module}:{name}",
+                    "aliases": [f"{name}_alias"],
+                    "help": f"Runs {name}.",
+                }
+            )
+        (directory / f"commands{module}.py").write_text("\n".join(source))
+    (directory / "manifest.json").write_text(json.dumps(manifest))
+    engine = InvokeEngine()
+    engine.register_manifest(manifest)
+    write_manifest(engine, directory / "manifest.bin")
+
+
+def measure(directory: Path, script: str, repeat: int) -> tuple[float, float]:
+    """Returns the best registration and first parse times, in seconds."""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=directory,
+            env={"PYTHONPATH": f"{ROOT}:{directory}", "PYTHONDONTWRITEBYTECODE": "1"},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        registered, parsed = output.split()
+        runs.append((float(registered), float(parsed)))
+    return min(runs)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--commands", type=int, default=20, help="Commands per module.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as name:
+        directory = Path(name)
+        write_modules(directory, args.modules, args.commands)
+        total = args.modules * args.commands
+        print(f"{total} commands in {args.modules} modules")
+        for label, script in (("eager", EAGER), ("lazy", LAZY), ("binary", BINARY)):
+            registered, parsed = measure(directory, script.format(modules=args.modules), args.repeat)
+            print(f"{label:<6} register {registered * 1e3:>9.2f}ms  first parse {parsed * 1e3:>9.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
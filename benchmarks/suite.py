@@ -0,0 +1,366 @@
+"""
+The benchmark suite for parsing, dispatch and invocation.
+
+Run it before each release and compare against the results of the previous one:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline results.json --output new.json
+
+Results are written as JSON. When a baseline is given, every benchmark that got slower
+than `--threshold` times its baseline is reported and the exit code is 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import invokify  # noqa: E402
+from invokify import ArgParser, Completer, InvokeEngine, meta, string_to_args  # noqa: E402
+from invokify.parser import BACKENDS, TokenStream  # noqa: E402
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(func: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+    """Registers a setup function, which returns the function to time."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+SHORT = "buy 10"
+LONG = " ".join(
+    f'word{index} {index} -{index}.5 "quoted {index} \\"text\\"" [{index}, two, 3.0]'
+    for index in range(40)
+)
+NESTED = "[" * 50 + "1, 2" + "]" * 50
+BULK = "tag [" + ", ".join(str(index * 7919) for index in range(100_000)) + '] "' + "note " * 20_000 + '"'
+
+
+@benchmark
+def tokenize_short() -> Callable[[], Any]:
+    return lambda: string_to_args(SHORT)
+
+
+@benchmark
+def tokenize_long() -> Callable[[], Any]:
+    return lambda: string_to_args(LONG)
+
+
+@benchmark
+def tokenize_nested() -> Callable[[], Any]:
+    return lambda: string_to_args(NESTED)
+
+
+if TokenStream is not None:
+
+    @benchmark
+    def tokenize_short_tokenstream() -> Callable[[], Any]:
+        parse = BACKENDS["tokenstream"]
+        return lambda: parse(SHORT)
+
+    @benchmark
+    def tokenize_long_tokenstream() -> Callable[[], Any]:
+        parse = BACKENDS["tokenstream"]
+        return lambda: parse(LONG)
+
+
+@benchmark
+def tokenize_bulk() -> Callable[[], Any]:
+    return lambda: string_to_args(BULK)
+
+
+@benchmark
+def tokenize_bulk_views() -> Callable[[], Any]:
+    return lambda: string_to_args(BULK, backend="views")
+
+
+@benchmark
+def tokenize_cached() -> Callable[[], Any]:
+    parser = ArgParser(cache_size=128)
+    return lambda: parser.parse(LONG)
+
+
+def wide_engine() -> InvokeEngine:
+    engine = InvokeEngine()
+    for index in range(10_000):
+        engine.command(lambda: None, name=f"command{index}", aliases=[f"alias{index}"])
+    return engine
+
+
+@benchmark
+def parse_wide() -> Callable[[], Any]:
+    engine = wide_engine()
+    command_list = ["alias5000", 1, 2, 3]
+    return lambda: engine.parse(command_list)
+
+
+@benchmark
+def parse_wide_frozen() -> Callable[[], Any]:
+    engine = wide_engine()
+    engine.freeze()
+    command_list = ["alias5000", 1, 2, 3]
+    return lambda: engine.parse(command_list)
+
+
+@benchmark
+def parse_wide_prefix() -> Callable[[], Any]:
+    engine = wide_engine()
+    engine.prefix_matching = True
+    command_list = ["aliasx", 1, 2, 3]
+    engine.parse(command_list)  # Builds the index.
+    return lambda: engine.parse(command_list)
+
+
+@benchmark
+def suggest_wide() -> Callable[[], Any]:
+    engine = wide_engine()
+    engine.suggest("comand5000")  # Builds the index.
+    return lambda: engine.suggest("comand5000")
+
+
+@benchmark
+def complete_typing() -> Callable[[], Any]:
+    engine = wide_engine()
+    completer = Completer(engine)
+    line = "alias50"
+    prefixes = [line[:end] for end in range(len(line) + 1)]
+    return lambda: [completer.complete(prefix) for prefix in prefixes]
+
+
+def deep_engine() -> tuple[InvokeEngine, list[Any]]:
+    engine = InvokeEngine()
+    command = engine.command(lambda: None, name="level0")
+    for level in range(1, 20):
+        command = command.subcommand(lambda: None, name=f"level{level}")
+    return engine, [f"level{level}" for level in range(20)] + list(range(100))
+
+
+@benchmark
+def parse_deep() -> Callable[[], Any]:
+    engine, command_list = deep_engine()
+    return lambda: engine.parse(command_list)
+
+
+@benchmark
+def parse_deep_frozen() -> Callable[[], Any]:
+    engine, command_list = deep_engine()
+    engine.freeze()
+    return lambda: engine.parse(command_list)
+
+
+@benchmark
+def call_plain() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy(amount: int):
+        return amount
+
+    return lambda: buy(10)
+
+
+@benchmark
+def call_injections() -> Callable[[], Any]:
+    engine = InvokeEngine()
+    injections = {f"value{index}": index for index in range(10)}
+
+    @engine.command
+    @meta.inject(**injections)
+    @meta.require(engine=True, command=True)
+    def buy(amount: int, engine: InvokeEngine, command: Any, **values: int):
+        return amount
+
+    return lambda: buy(10, engine=engine)
+
+
+@benchmark
+def call_coerced() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.coerce()
+    def buy(item: str, amount: int, ids: list[int]):
+        return amount
+
+    return lambda: buy("apple", "10", [1, 2, 3])
+
+
+@benchmark
+def call_cached() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.cache()
+    def quote(item: str, ids: list[int]):
+        return sum(ids) * len(item)
+
+    return lambda: quote("apple", [1, 2, 3])
+
+
+@benchmark
+def call_rate_limited() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.rate_limit(1_000_000, 1, key="user")
+    def buy(amount: int, *, user: int):
+        return amount
+
+    users = iter(range(10**9))
+    return lambda: buy(10, user=next(users))
+
+
+@benchmark
+def invoke_many() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy(amount: int):
+        return amount
+
+    @engine.command
+    def balance():
+        return 0
+
+    lines = ["balance", "buy 10", "buy 5", "balance", "buy 10"] * 200
+    return lambda: sum(1 for _ in engine.invoke_many(lines))
+
+
+@benchmark
+def invoke_chain() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy(amount: int):
+        return amount
+
+    @engine.command
+    def total(*amounts: int):
+        return sum(amounts)
+
+    line = " && ".join(f"buy {amount}" for amount in range(19)) + " | total 1"
+    return lambda: engine.invoke_chain(line)
+
+
+@benchmark
+def invoke_chain_resolved() -> Callable[[], Any]:
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy(amount: int):
+        return amount
+
+    chain = engine.chain(" && ".join(f"buy {amount}" for amount in range(20)))
+    return lambda: engine.invoke_chain(chain)
+
+
+@benchmark
+def invoke_chain_recursive() -> Callable[[], Any]:
+    """The passthrough pattern `invoke_chain` replaces: every command parses the rest of the chain."""
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.require(engine=True)
+    def buy(amount: int, *rest: Any, engine: InvokeEngine, responses: Optional[list[Any]] = None):
+        responses = [] if responses is None else responses
+        responses.append(amount)
+        cmd, args, _ = engine.parse(rest)
+        if cmd is not None:
+            cmd(*args, responses=responses, engine=engine)
+        return responses
+
+    line = " ".join(f"buy {amount}" for amount in range(20))
+
+    def run() -> Any:
+        cmd, args, _ = engine.parse(string_to_args(line))
+        return cmd(*args, engine=engine)
+
+    return run
+
+
+@benchmark
+def invoke_many_instrumented() -> Callable[[], Any]:
+    engine = InvokeEngine()
+    engine.instrument()
+
+    @engine.command
+    def buy(amount: int):
+        return amount
+
+    @engine.command
+    def balance():
+        return 0
+
+    lines = ["balance", "buy 10", "buy 5", "balance", "buy 10"] * 200
+    return lambda: sum(1 for _ in engine.invoke_many(lines))
+
+
+def run(names: list[str], repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name in names:
+        func = BENCHMARKS[name]()
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = {"seconds": best, "number": number}
+        print(f"{name:<28} {best * 1e6:>12.3f}us", file=sys.stderr)
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Returns a line for every benchmark slower than `threshold` times its baseline."""
+    regressions = []
+    previous = baseline.get("results", {})
+    for name, result in results.items():
+        if name not in previous:
+            continue
+        ratio = result["seconds"] / previous[name]["seconds"]
+        if ratio > threshold:
+            regressions.append(f"{name} is {ratio:.2f}x slower than the baseline")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("names", nargs="*", help="The benchmarks to run, all by default.")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results.")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - BENCHMARKS.keys()
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(args.names or list(BENCHMARKS), args.repeat)
+    report = {
+        "invokify": invokify.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Calls one command, shared by several engines, from a thread pool
+and checks every call received its own engine.
+
+Run with `python benchmarks/threaded_invoke.py`.
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from invokify import Command, InvokeEngine, meta  # noqa: E402
+
+CALLS_PER_THREAD = 50_000
+THREADS = (1, 2, 4, 8, 16)
+
+
+@meta.inject(value=10)
+@meta.require(engine=True, command=True)
+def thing(amount: int, value: int, engine: InvokeEngine, command: Command):
+    return engine
+
+
+def main() -> None:
+    print(f"{'threads':>7} {'calls/s':>12} {'wrong engine':>13}")
+    for threads in THREADS:
+        engines = [InvokeEngine() for _ in range(threads)]
+        command = engines[0].command(thing)
+        for engine in engines[1:]:
+            engine.command(command)
+        barrier = threading.Barrier(threads + 1)
+
+        def run(engine: InvokeEngine) -> int:
+            barrier.wait()
+            return sum(
+                command(1, engine=engine) is not engine for _ in range(CALLS_PER_THREAD)
+            )
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(run, engine) for engine in engines]
+            barrier.wait()
+            start = time.perf_counter()
+            wrong = sum(future.result() for future in futures)
+            elapsed = time.perf_counter() - start
+
+        print(f"{threads:>7} {threads * CALLS_PER_THREAD / elapsed:>12,.0f} {wrong:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from invokify import InvokeEngine, meta, string_to_args
+from invokify import InvokeEngine, meta
 
 engine = InvokeEngine()
 
@@ -20,37 +20,26 @@ player = Player()
 
 
 @engine.command
+@meta.coerce()
 @meta.inject(obj=player)
-@meta.require(engine=True)
-def buy(amount: int, *args, obj: Player, responses: list = None, engine):
-    if responses is None:
-        responses = []
-    responses.append(obj.buy(amount))
-    cmd, cmd_args, _ = engine.parse(args)
-    if cmd is not None:
-        cmd(*cmd_args, responses=responses, engine=engine)
-    return responses
+def buy(amount: int, obj: Player):
+    return obj.buy(amount)
 
 
 @engine.command
+@meta.coerce()
 @meta.inject(obj=player)
-@meta.require(engine=True)
-def sell(amount: int, *args, obj: Player, responses: list = None, engine):
-    if responses is None:
-        responses = []
-    responses.append(obj.sell(amount))
-    cmd, cmd_args, _ = engine.parse(args)
-    if cmd is not None:
-        cmd(*cmd_args, responses=responses, engine=engine)
-    return responses
+def sell(amount: int, obj: Player):
+    return obj.sell(amount)
 
 
-while True:
-    user = input()
+@engine.command
+def shout(text: str):
+    return text.upper()
 
-    result = string_to_args(user)
 
-    command, args, cs = engine.parse(result)
+# Try "buy 10 && sell 5" or "sell 20 | shout".
+while True:
+    user = input()
 
-    print(cs)
-    print("\n".join(command(*args, engine=engine)))
+    print("\n".join(engine.invoke_chain(user)))
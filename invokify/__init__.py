@@ -4,10 +4,59 @@ __all__ = [
     "Command",
     "CommandAlreadyExists",
     "EngineRequired",
+    "EngineFrozen",
+    "CommandNotFound",
+    "AsyncInvokeEngine",
+    "CommandDispatcher",
+    "CommandTooLong",
+    "CommandSplitter",
+    "read_commands",
+    "DispatchNode",
+    "InvokeResult",
+    "CommandOverlay",
+    "Chain",
+    "Link",
+    "string_to_chain",
     "string_to_args",
+    "InvalidArgumentSyntax",
+    "InvalidArgumentCount",
+    "CallPlan",
+    "ArgumentConversionError",
+    "ArgParser",
+    "StringView",
+    "CacheInfo",
+    "ResultCache",
+    "RateLimited",
+    "CheckFailed",
+    "Limit",
+    "LimitStore",
+    "MemoryStore",
+    "Metrics",
+    "Profiler",
+    "Completer",
+    "Completion",
+    "ManifestError",
+    "export_manifest",
+    "write_manifest",
+    "read_manifest",
+    "load_manifest",
 ]
 
 __version__ = "0.1.3"
 
 from invokify.invokify import *
+from invokify.callplan import *
+from invokify.checks import *
+from invokify.caching import *
+from invokify.coercion import *
+from invokify.aio import *
+from invokify.executors import *
+from invokify.reader import *
 from invokify.parser import *
+from invokify.pipeline import *
+from invokify.limits import *
+from invokify.metrics import *
+from invokify.overlay import *
+from invokify.profiling import *
+from invokify.completion import *
+from invokify.manifest import *
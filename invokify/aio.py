@@ -0,0 +1,139 @@
+"""
+Asyncio support
+
+An engine that parses, resolves and awaits commands on an event loop.
+"""
+__all__ = ["AsyncInvokeEngine"]
+
+import asyncio
+import inspect
+import weakref
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Optional, Sequence
+
+from invokify.checks import run_checks_async
+from invokify.invokify import Command, CommandNotFound, InvokeEngine
+from invokify.parser import string_to_args
+
+DEFAULT = object()
+
+
+@dataclass(slots=True)
+class AsyncInvokeEngine(InvokeEngine):
+    """
+    An engine with an async `invoke` method.
+    Coroutine commands are awaited, sync commands run inline on the loop.
+    """
+
+    concurrency: Optional[int] = None  # The most commands that can run at once. None is unlimited.
+    timeout: Optional[float] = None  # Seconds a coroutine command may take. None is unlimited.
+    parser: Callable[[str], Sequence[Any]] = field(
+        default=string_to_args, repr=False
+    )  # Turns strings passed to `invoke` into arguments, such as an `ArgParser`.
+    semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False
+    )  # Limit the concurrency per event loop, since a semaphore can only be used on one.
+
+    def __post_init__(self) -> None:
+        if self.concurrency is not None and self.concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """The semaphore of the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.concurrency)  # type: ignore[arg-type]
+        return semaphore
+
+    async def invoke(
+        self,
+        command: str | Sequence[Any],
+        *args: Any,
+        timeout: Optional[float] | object = DEFAULT,
+        context: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Parses and runs a command, awaiting its result if it's awaitable.
+        `args` are passed before the parsed arguments, such as `self` for commands in classes,
+        and `context` to the checks of its requirements, which may be coroutine functions.
+        Raises `CommandNotFound` if nothing matched and `TimeoutError` if the command took too long.
+        """
+        if self.metrics is not None:
+            return await self.invoke_measured(command, args, timeout, context, kwargs)
+        command_list = self.parser(command) if isinstance(command, str) else command
+        cmd, cmd_args, callstack = self.parse(command_list)
+        if cmd is None:
+            raise CommandNotFound(command)
+        if cmd.checks:
+            await run_checks_async(self.checks_for(cmd), cmd, context, {})
+        return await self.call(cmd, callstack, (*args, *cmd_args), timeout, kwargs)
+
+    async def invoke_measured(
+        self,
+        command: str | Sequence[Any],
+        args: tuple[Any, ...],
+        timeout: Optional[float] | object,
+        context: Any,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """`invoke`, recording the time spent in each phase in the engine's metrics."""
+        cmd = None
+        callstack: tuple[Command, ...] = ()
+        marks = [perf_counter()]
+        try:
+            command_list = self.parser(command) if isinstance(command, str) else command
+            marks.append(perf_counter())
+            cmd, cmd_args, callstack = self.parse(command_list)
+            marks.append(perf_counter())
+            if cmd is None:
+                raise CommandNotFound(command)
+            if cmd.checks:
+                await run_checks_async(self.checks_for(cmd), cmd, context, {})
+            result = await self.call(cmd, callstack, (*args, *cmd_args), timeout, kwargs)
+        except BaseException:
+            self.record_invocation(marks, cmd, callstack, True)
+            raise
+        self.record_invocation(marks, cmd, callstack, False)
+        return result
+
+    async def call(
+        self,
+        cmd: Command,
+        callstack: Sequence[Command],
+        args: tuple[Any, ...],
+        timeout: Optional[float] | object,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if timeout is DEFAULT:
+            timeout = self.timeout
+
+        if self.concurrency is None:
+            return await self.run(self.start(cmd, callstack, args, kwargs), timeout)  # type: ignore
+        async with self.semaphore():
+            return await self.run(self.start(cmd, callstack, args, kwargs), timeout)  # type: ignore
+
+    def start(
+        self,
+        cmd: Command,
+        callstack: Sequence[Command],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Calls a command, or returns a coroutine that samples it while it runs if it's profiled."""
+        if self.profiler is not None or cmd.profiler is not None:
+            profiling = self.profiler_for(cmd, callstack)
+            if profiling is not None:
+                profiler, path = profiling
+                return profiler.run_async(path, cmd, *args, engine=self, **kwargs)
+        return cmd(*args, engine=self, **kwargs)
+
+    @staticmethod
+    async def run(result: Any, timeout: Optional[float]) -> Any:
+        if not inspect.isawaitable(result):
+            return result
+        if timeout is None:
+            return await result
+        return await asyncio.wait_for(result, timeout)
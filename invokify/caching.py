@@ -0,0 +1,137 @@
+"""
+Caching
+
+Memoizes the results of pure commands per argument tuple, see `meta.cache`.
+Arguments are turned into hashable keys that keep their types,
+including the nested lists `string_to_args` produces.
+"""
+__all__ = ["ResultCache"]
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Hashable, Mapping, Optional
+
+from invokify.parser import CacheInfo
+
+SCALARS = frozenset({str, int, float, bool, type(None)})  # Hashable types that need no checks.
+MISSING = object()  # Returned by `ResultCache.get` for keys that aren't cached.
+
+
+def hashable(value: Any) -> Hashable:
+    """
+    Returns a hashable stand-in for a value, which keeps the types of everything in it,
+    so `True`, `1` and `1.0` and lists, tuples, dicts and sets stay apart. Raises TypeError.
+    """
+    kind = type(value)
+    if kind in SCALARS:
+        return (kind, value)
+    if isinstance(value, (list, tuple)):
+        kinds = tuple(map(type, value))
+        if SCALARS.issuperset(kinds):
+            return (kind, kinds, tuple(value))
+        return (kind, tuple([hashable(item) for item in value]))
+    if isinstance(value, dict):
+        return (kind, frozenset([(hashable(key), hashable(item)) for key, item in value.items()]))
+    if isinstance(value, (set, frozenset)):
+        return (kind, frozenset([hashable(item) for item in value]))
+    hash(value)
+    return (kind, value)
+
+
+def cache_key(
+    args: tuple[Any, ...], kwargs: Mapping[str, Any], scope: Optional[Hashable] = None
+) -> Optional[Hashable]:
+    """
+    The key of a call, or None if its arguments can't be hashed.
+    `scope` is part of the key too, such as the `cache_token` of the engine injected into the command,
+    which is left out of the arguments then.
+    """
+    if scope is not None:
+        kwargs = {name: value for name, value in kwargs.items() if name != "engine"}
+    try:
+        key = hashable(args)
+        if kwargs:
+            key = (key, frozenset([(name, hashable(value)) for name, value in kwargs.items()]))
+    except TypeError:
+        return None
+    return key if scope is None else (key, scope)
+
+
+@dataclass(slots=True)
+class ResultCache:
+    """
+    A bounded LRU cache of a command's results, where entries expire `ttl` seconds after they were stored.
+    Cached results are returned as they are, so commands shouldn't return objects that callers change.
+    """
+
+    maxsize: Optional[int] = 128  # The maximum amount of cached calls. None is unbounded.
+    ttl: Optional[float] = None  # Seconds until a result is computed again. None keeps it until it's evicted.
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    entries: "OrderedDict[Hashable, tuple[float, Any]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )  # The expiry time and result per key.
+
+    def __post_init__(self) -> None:
+        if self.maxsize is not None and self.maxsize < 0:
+            raise ValueError("maxsize cannot be negative.")
+        if self.ttl is not None and self.ttl <= 0:
+            raise ValueError("ttl must be positive.")
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached result for `key`, or `MISSING`."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires, result = entry
+            if self.ttl is None or monotonic() < expires:
+                self.hits += 1
+                try:
+                    self.entries.move_to_end(key)
+                except KeyError:  # Evicted by another thread in the meantime.
+                    pass
+                return result
+            self.entries.pop(key, None)
+        self.misses += 1
+        return MISSING
+
+    def put(self, key: Hashable, result: Any) -> None:
+        if self.maxsize == 0:
+            return
+        expires = 0.0 if self.ttl is None else monotonic() + self.ttl
+        self.entries[key] = (expires, result)
+        if self.maxsize is not None and len(self.entries) > self.maxsize:
+            try:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            except KeyError:
+                pass
+
+    def invalidate(self, key: Optional[Hashable] = None, scoped: bool = False) -> None:
+        """
+        Drops the result for `key`, or every result if it's None.
+        `scoped` also drops the results of the key for every engine, see `cache_key`.
+        """
+        if key is None:
+            self.entries.clear()
+            return
+        self.entries.pop(key, None)
+        if scoped:
+            for cached in [cached for cached in self.entries if cached[0] == key]:  # type: ignore
+                self.entries.pop(cached, None)
+
+    def cache_info(self) -> CacheInfo:
+        """Returns the current cache counters."""
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self.entries),
+            maxsize=self.maxsize,
+        )
+
+    def cache_clear(self) -> None:
+        """Empties the cache and resets its counters."""
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
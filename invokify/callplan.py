@@ -0,0 +1,117 @@
+"""
+Call plans
+
+Describes how a command's function can be called,
+worked out once from its signature when the command is registered.
+"""
+__all__ = ["InvalidArgumentCount", "CallPlan", "build_plan"]
+
+import inspect
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+class InvalidArgumentCount(TypeError):
+    """
+    Will be raised when a command is called with more or fewer
+    positional arguments than its function accepts.
+    """
+
+
+@dataclass(slots=True, frozen=True)
+class CallPlan:
+    """The shape of a command's function, as far as invoking it is concerned."""
+
+    min_args: int  # The amount of positional arguments that must be passed.
+    max_args: int  # The most positional arguments that can be passed, sys.maxsize with *args.
+    accepts_kwargs: bool  # Whether the function takes **kwargs.
+    injects: frozenset[str]  # The injected names the function accepts.
+    keyword_only: tuple[str, ...]  # The function's keyword-only parameters.
+    required_keywords: frozenset[str]  # Parameters without defaults that must be passed by keyword.
+    positional: tuple[Optional[str], ...]  # The positional parameters' names, None for positional-only ones.
+
+    @property
+    def varargs(self) -> bool:
+        return self.max_args == sys.maxsize
+
+    def check(self, name: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        """Raises `InvalidArgumentCount` when `args` and `kwargs` can't be bound."""
+        if not self.min_args <= len(args) <= self.max_args and not self.filled(args, kwargs):
+            if self.min_args == self.max_args:
+                expected = str(self.min_args)
+            elif self.varargs:
+                expected = f"at least {self.min_args}"
+            else:
+                expected = f"{self.min_args} to {self.max_args}"
+            raise InvalidArgumentCount(
+                f"{name} takes {expected} positional arguments but {len(args)} were given."
+            )
+        if self.required_keywords and not self.required_keywords <= kwargs.keys():
+            missing = ", ".join(sorted(self.required_keywords - kwargs.keys()))
+            raise InvalidArgumentCount(f"{name} is missing keyword arguments: {missing}.")
+
+    def filled(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> bool:
+        """Whether keyword arguments fill the required positional parameters `args` leaves out."""
+        if not kwargs or len(args) > self.min_args:
+            return False
+        return all(name in kwargs for name in self.positional[len(args) : self.min_args])
+
+
+def build_plan(func: Callable[..., Any], injected: Iterable[str]) -> Optional[CallPlan]:
+    """
+    Builds the call plan of a function, given the names that may be injected into it.
+    Returns None if the function has no readable signature.
+    """
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return None
+
+    injected = frozenset(injected)
+    min_args = max_args = 0
+    varargs = accepts_kwargs = False
+    # Positional parameters after an injected one can only be filled by keyword.
+    positional_open = True
+    names = set()
+    keyword_only = []
+    positional: list[Optional[str]] = []
+    required_keywords = set()
+
+    for parameter in signature.parameters.values():
+        required = parameter.default is inspect.Parameter.empty
+        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+            varargs = positional_open
+            continue
+        if parameter.kind == inspect.Parameter.VAR_KEYWORD:
+            accepts_kwargs = True
+            continue
+
+        if parameter.kind != inspect.Parameter.POSITIONAL_ONLY:
+            names.add(parameter.name)
+        if parameter.kind == inspect.Parameter.KEYWORD_ONLY:
+            keyword_only.append(parameter.name)
+
+        if parameter.name in injected and parameter.kind != inspect.Parameter.POSITIONAL_ONLY:
+            positional_open = positional_open and parameter.kind not in POSITIONAL
+        elif parameter.kind in POSITIONAL and positional_open:
+            max_args += 1
+            positional.append(
+                None if parameter.kind == inspect.Parameter.POSITIONAL_ONLY else parameter.name
+            )
+            if required:
+                min_args = max_args
+        elif required:
+            required_keywords.add(parameter.name)
+
+    return CallPlan(
+        min_args=min_args,
+        max_args=sys.maxsize if varargs else max_args,
+        accepts_kwargs=accepts_kwargs,
+        injects=injected if accepts_kwargs else injected & names,
+        keyword_only=tuple(keyword_only),
+        required_keywords=frozenset(required_keywords),
+        positional=tuple(positional),
+    )
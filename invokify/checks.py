@@ -0,0 +1,82 @@
+"""
+Checks
+
+Evaluates an engine's check functions for the requirements of the commands it invokes,
+such as `@meta.require(admin=True)` with a check registered under "admin", see `InvokeEngine.check`.
+"""
+__all__ = ["CheckFailed", "run_checks", "run_checks_async"]
+
+import inspect
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Optional
+
+if TYPE_CHECKING:
+    from invokify.invokify import Command
+
+SPECIAL_REQUIREMENTS = frozenset({"engine", "command"})  # Requirements that are injections, never checked.
+
+CheckPlan = tuple[tuple[str, Optional[Callable[[Any], Any]]], ...]  # Requirement names and their checks.
+
+
+class CheckFailed(Exception):
+    """Will be raised when a command is invoked in a context that doesn't pass one of its checks."""
+
+    def __init__(self, command: str, requirement: str) -> None:
+        super().__init__(f"{command!r} requires {requirement!r}.")
+        self.command = command
+        self.requirement = requirement  # The name of the check that failed.
+
+
+def check_plan(
+    checks: Mapping[str, Callable[[Any], Any]], requirements: Iterable[str]
+) -> CheckPlan:
+    """
+    The checks to run for a command's requirements, in the order they were registered.
+    Once an engine has checks, requirements without one come last with None, and fail.
+    """
+    if not checks:
+        return ()
+    plan: list[tuple[str, Optional[Callable[[Any], Any]]]] = [
+        (name, check) for name, check in checks.items() if name in requirements
+    ]
+    plan.extend((name, None) for name in requirements if name not in checks)
+    return tuple(plan)
+
+
+def run_checks(plan: CheckPlan, command: "Command", context: Any, results: dict[str, bool]) -> None:
+    """
+    Evaluates the checks of a `check_plan`, raising `CheckFailed` at the first that fails.
+    `results` holds the results of the request so far.
+    Async checks raise `TypeError`, since they can't be awaited here; see `run_checks_async`.
+    """
+    for name, check in plan:
+        passed = results.get(name)
+        if passed is None:
+            if check is None:
+                raise CheckFailed(command.name, name)
+            result = check(context)
+            if inspect.isawaitable(result):
+                if inspect.iscoroutine(result):
+                    result.close()
+                raise TypeError(
+                    f"The check for {name!r} is async, invoke {command.name!r} with `AsyncInvokeEngine.invoke`."
+                )
+            passed = results[name] = bool(result)
+        if not passed:
+            raise CheckFailed(command.name, name)
+
+
+async def run_checks_async(
+    plan: CheckPlan, command: "Command", context: Any, results: dict[str, bool]
+) -> None:
+    """`run_checks`, awaiting the checks that are coroutine functions."""
+    for name, check in plan:
+        passed = results.get(name)
+        if passed is None:
+            if check is None:
+                raise CheckFailed(command.name, name)
+            result = check(context)
+            if inspect.isawaitable(result):
+                result = await result
+            passed = results[name] = bool(result)
+        if not passed:
+            raise CheckFailed(command.name, name)
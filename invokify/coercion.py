@@ -0,0 +1,251 @@
+"""
+Coercion
+
+Converts a command's positional arguments to the types in its function's annotations.
+Converters are built once per annotation and reused by every command that shares it.
+"""
+__all__ = ["ArgumentConversionError", "Converters", "converter_for", "build_converters"]
+
+import enum
+import functools
+import inspect
+import types
+import typing
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, Optional, Union
+
+from invokify.callplan import CallPlan
+from invokify.parser import StringView
+
+Converter = Callable[[Any], Any]
+
+TRUE_WORDS = frozenset({"true", "yes", "y", "on", "1"})
+FALSE_WORDS = frozenset({"false", "no", "n", "off", "0"})
+
+
+class ArgumentConversionError(ValueError):
+    """
+    Will be raised when an argument can't be converted to its annotated type.
+    `position` is the argument's index in the positional arguments.
+    """
+
+    def __init__(self, position: int, name: str, value: Any, expected: Any) -> None:
+        self.position = position
+        self.name = name
+        self.value = value
+        self.expected = expected
+        expected_name = getattr(expected, "__name__", None) or repr(expected)
+        super().__init__(
+            f"Argument {position} ({name}) expected {expected_name} but got {value!r}."
+        )
+
+
+def to_int(value: Any) -> int:
+    if type(value) is int:
+        return value
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(value)
+        return int(value)
+    if isinstance(value, str):
+        return int(value)
+    raise TypeError(value)
+
+
+def to_float(value: Any) -> float:
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        return float(value)
+    raise TypeError(value)
+
+
+def to_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, StringView)):
+        return str(value)
+    raise TypeError(value)
+
+
+def to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in TRUE_WORDS:
+            return True
+        if lowered in FALSE_WORDS:
+            return False
+    elif value == 0 or value == 1:
+        return bool(value)
+    raise ValueError(value)
+
+
+def to_list(value: Any) -> list[Any]:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if isinstance(value, (array, memoryview)):
+        return value.tolist()
+    raise TypeError(value)
+
+
+SIMPLE_CONVERTERS: dict[Any, Converter] = {
+    int: to_int,
+    float: to_float,
+    str: to_str,
+    bool: to_bool,
+    list: to_list,
+}
+
+
+def list_converter(item: Converter) -> Converter:
+    def convert(value: Any) -> list[Any]:
+        if isinstance(value, (array, memoryview)):
+            value = value.tolist()
+        elif not isinstance(value, (list, tuple)):
+            raise TypeError(value)
+        return [item(entry) for entry in value]
+
+    return convert
+
+
+def enum_converter(cls: type[enum.Enum]) -> Converter:
+    def convert(value: Any) -> enum.Enum:
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str) and value in cls.__members__:
+            return cls[value]
+        return cls(value)
+
+    return convert
+
+
+def literal_converter(options: tuple[Any, ...]) -> Converter:
+    by_text = {str(option): option for option in options}
+    option_types = {type(option) for option in options}
+
+    def convert(value: Any) -> Any:
+        if type(value) in option_types and value in options:
+            return value
+        try:
+            return by_text[str(value)]
+        except KeyError:
+            raise ValueError(value) from None
+
+    return convert
+
+
+def union_converter(members: tuple[Any, ...]) -> Converter:
+    optional = type(None) in members
+    converters = [converter_for(member) for member in members if member is not type(None)]
+    exact = tuple(member for member in members if isinstance(member, type))
+
+    def convert(value: Any) -> Any:
+        if value is None and optional:
+            return None
+        # Values that already have one of the types are kept as they are.
+        if exact and type(value) in exact:
+            return value
+        for converter in converters:
+            if converter is None:
+                return value
+            try:
+                return converter(value)
+            except (ValueError, TypeError, KeyError):
+                continue
+        raise ValueError(value)
+
+    return convert
+
+
+@functools.lru_cache(maxsize=None)
+def converter_for(annotation: Any) -> Optional[Converter]:
+    """
+    Returns the converter for an annotation, or None if values are passed through as they are.
+    Converters are cached per annotation.
+    """
+    if annotation in SIMPLE_CONVERTERS:
+        return SIMPLE_CONVERTERS[annotation]
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is list:
+        item = converter_for(args[0]) if args else None
+        return list_converter(item) if item is not None else to_list
+    if origin is Literal:
+        return literal_converter(args)
+    if origin is Union or origin is types.UnionType:
+        return union_converter(args)
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return enum_converter(annotation)
+    return None
+
+
+def safe_converter_for(annotation: Any) -> Optional[Converter]:
+    try:
+        return converter_for(annotation)
+    except TypeError:  # Unhashable annotations can't be cached or converted.
+        return None
+
+
+@dataclass(slots=True, frozen=True)
+class Converters:
+    """The converters of a command's positional arguments."""
+
+    parameters: tuple[tuple[str, Any], ...]  # The name and annotation of every positional parameter.
+    positional: tuple[Optional[Converter], ...]  # One converter per positional parameter.
+    rest: Optional[Converter]  # The converter for arguments that end up in *args.
+    rest_parameter: tuple[str, Any] = ("", None)
+
+    def __call__(self, args: tuple[Any, ...]) -> tuple[Any, ...]:
+        positional = self.positional
+        converted = []
+        for position, value in enumerate(args):
+            converter = positional[position] if position < len(positional) else self.rest
+            if converter is not None:
+                try:
+                    value = converter(value)
+                except (ValueError, TypeError, KeyError):
+                    if position < len(positional):
+                        name, expected = self.parameters[position]
+                    else:
+                        name, expected = self.rest_parameter
+                    raise ArgumentConversionError(position, name, value, expected) from None
+            converted.append(value)
+        return tuple(converted)
+
+
+def build_converters(func: Callable[..., Any], plan: CallPlan) -> Optional[Converters]:
+    """
+    Builds the converters for a function's positional arguments from its annotations.
+    Returns None when none of the arguments would be converted.
+    """
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return None
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:  # Unresolvable forward references keep their raw annotations.
+        hints = {}
+
+    parameters = []
+    positional: list[Optional[Converter]] = []
+    rest = None
+    rest_parameter: tuple[str, Any] = ("", None)
+    for parameter in signature.parameters.values():
+        annotation = hints.get(parameter.name, parameter.annotation)
+        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+            rest = safe_converter_for(annotation)
+            rest_parameter = (parameter.name, annotation)
+        elif (
+            parameter.kind
+            in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+            and len(positional) < plan.max_args
+        ):
+            parameters.append((parameter.name, annotation))
+            positional.append(safe_converter_for(annotation))
+
+    if rest is None and not any(positional):
+        return None
+    return Converters(tuple(parameters), tuple(positional), rest, rest_parameter)
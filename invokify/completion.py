@@ -0,0 +1,104 @@
+"""
+Completion
+
+Completes command names for interactive shells and consoles. A `Completer` keeps the words
+it already resolved, so typing at the end of a line only looks at the new characters.
+"""
+__all__ = ["Completion", "Completer"]
+
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from invokify.resolution import NameIndex
+
+if TYPE_CHECKING:
+    from invokify.invokify import Command, InvokeEngine
+
+WORD_REGEX = re.compile(r"\s*(\S+)(?=\s)")  # A word that was ended by whitespace.
+ARGUMENT_CHARACTERS = frozenset('"[],')  # Words containing these are arguments, never commands.
+
+
+@dataclass(slots=True, frozen=True)
+class Completion:
+    """The candidates for the word before the cursor."""
+
+    start: int  # Where the word being completed starts in the line.
+    word: str  # The part of the word that was typed.
+    candidates: tuple[str, ...]  # The names of the commands, subcommands and aliases it can become, sorted.
+
+
+@dataclass(slots=True)
+class Completer:
+    """
+    Completes lines for a single session, such as one shell or console connection.
+    Lines that extend the previous one reuse its resolved words and search within its candidates.
+    """
+
+    engine: "InvokeEngine"
+    text: str = field(default="", init=False)  # The complete words of the previous line.
+    callstack: list["Command"] = field(default_factory=list, init=False)
+    indexes: list[NameIndex] = field(
+        default_factory=list, init=False, repr=False
+    )  # The index every word was resolved against, to notice new commands.
+    arguments: bool = field(default=False, init=False)  # Whether a word didn't resolve, so the rest are arguments.
+    last: Optional[tuple[NameIndex, int, str, int, int]] = field(
+        default=None, init=False, repr=False
+    )  # The index, start, word and range of names of the previous completion.
+
+    def complete(self, line: str, cursor: Optional[int] = None) -> Completion:
+        """Returns the candidates for the word that ends at `cursor`, the end of the line by default."""
+        text = line if cursor is None else line[:cursor]
+        if not text.startswith(self.text) or not self.current():
+            self.reset()
+
+        position = len(self.text)
+        while match := WORD_REGEX.match(text, position):
+            self.resolve(match[1])
+            position = match.end()
+        self.text = text[:position]
+
+        word = text[position:].lstrip()
+        start = len(text) - len(word)
+        if self.arguments or ARGUMENT_CHARACTERS.intersection(word):
+            return Completion(start, word, ())
+
+        index = self.engine.index_for(self.callstack[-1] if self.callstack else None)
+        low, high = 0, len(index.names)
+        if self.last is not None:
+            last_index, last_start, last_word, last_low, last_high = self.last
+            if last_index is index and last_start == start and word.startswith(last_word):
+                low, high = last_low, last_high
+        low, high = index.prefix_range(word, low, high)
+        self.last = (index, start, word, low, high)
+        return Completion(start, word, index.names[low:high])
+
+    def resolve(self, word: str) -> None:
+        if self.arguments:
+            return
+        level = self.callstack[-1] if self.callstack else None
+        index = self.engine.index_for(level)
+        names = self.engine.commands if level is None else level.children
+        command = None
+        if not ARGUMENT_CHARACTERS.intersection(word):
+            command = names.get(word)
+            if command is None and self.engine.prefix_matching:
+                command = index.unique_prefix(word)
+        self.indexes.append(index)
+        if command is None:
+            self.arguments = True
+            return
+        self.callstack.append(command)
+
+    def current(self) -> bool:
+        """Whether no commands were added to the levels the resolved words went through since."""
+        levels: list[Optional["Command"]] = [None, *self.callstack]
+        return all(
+            self.engine.index_for(level) is index for level, index in zip(levels, self.indexes)
+        )
+
+    def reset(self) -> None:
+        self.text = ""
+        self.callstack.clear()
+        self.indexes.clear()
+        self.arguments = False
@@ -0,0 +1,255 @@
+"""
+Executors
+
+Runs commands in managed thread and process pools, according to their execution policy.
+"""
+__all__ = ["CommandDispatcher"]
+
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Optional, Sequence
+
+from invokify.caching import MISSING, cache_key
+from invokify.checks import run_checks
+from invokify.invokify import Command, CommandNotFound, InvokeEngine, import_object
+from invokify.limits import check_limits
+from invokify.parser import string_to_args
+
+ENGINES: dict[str, InvokeEngine] = {}  # The engines a process worker has imported, by path.
+
+
+def load_engine(path: str) -> InvokeEngine:
+    """Imports an engine from a "module:attribute" path, once per process."""
+    engine = ENGINES.get(path)
+    if engine is None:
+        engine = ENGINES[path] = import_object(path)
+    return engine
+
+
+def run_in_worker(
+    engine_path: str, path: tuple[str, ...], args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> Any:
+    """
+    Runs a command inside a process worker.
+    The command is looked up again in the worker's own copy of the engine,
+    so the engine and command can be injected without being pickled.
+    Its arguments were checked and converted, and its limits and result cache applied,
+    by the process that submitted it, see `CommandDispatcher.run_in_process`.
+    """
+    engine = load_engine(engine_path)
+    cmd, rest, _ = engine.parse(path)
+    if cmd is None or rest:
+        raise CommandNotFound(path)
+    if cmd.injects_engine:
+        kwargs["engine"] = engine
+    return cmd.func(*args, **cmd.static_kwargs, **kwargs)
+
+
+def find_engine_path(engine: InvokeEngine, command: Command) -> Optional[str]:
+    """Finds the module attribute an engine is stored in, starting with the command's module."""
+    module_name = getattr(command.func, "__module__", None)
+    module = sys.modules.get(module_name) if module_name else None
+    if module is None:
+        return None
+    for name, value in vars(module).items():
+        if value is engine:
+            return f"{module_name}:{name}"
+    return None
+
+
+@dataclass(slots=True)
+class CommandDispatcher:
+    """
+    Submits commands to the pool their execution policy asks for and returns futures.
+    Inline commands run immediately and return a finished future.
+
+    Process workers import the engine themselves, from `engine_path` ("module:attribute")
+    or from the module that defines the command, so it has to live at module level.
+    """
+
+    engine: InvokeEngine
+    max_threads: Optional[int] = None
+    max_processes: Optional[int] = None
+    engine_path: Optional[str] = None
+    parser: Callable[[str], Sequence[Any]] = field(default=string_to_args, repr=False)
+    mp_context: Optional[Any] = field(default=None, repr=False)  # A multiprocessing context for the process pool.
+    thread_pool: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+    process_pool: Optional[ProcessPoolExecutor] = field(default=None, init=False, repr=False)
+    engine_paths: dict[str, Optional[str]] = field(default_factory=dict, init=False, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __enter__(self) -> "CommandDispatcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+    def threads(self) -> ThreadPoolExecutor:
+        if self.thread_pool is None:
+            with self.lock:
+                if self.thread_pool is None:
+                    self.thread_pool = ThreadPoolExecutor(
+                        self.max_threads, thread_name_prefix="invokify"
+                    )
+        return self.thread_pool
+
+    def processes(self) -> ProcessPoolExecutor:
+        if self.process_pool is None:
+            with self.lock:
+                if self.process_pool is None:
+                    self.process_pool = ProcessPoolExecutor(
+                        self.max_processes, mp_context=self.mp_context
+                    )
+        return self.process_pool
+
+    def resolve_engine_path(self, command: Command) -> str:
+        if self.engine_path is not None:
+            return self.engine_path
+        module = getattr(command.func, "__module__", "")
+        if module not in self.engine_paths:
+            self.engine_paths[module] = find_engine_path(self.engine, command)
+        path = self.engine_paths[module]
+        if path is None:
+            raise ValueError(
+                f"Cannot find the engine of {command.name!r} for a process worker, pass engine_path."
+            )
+        return path
+
+    def submit(
+        self, command: str | Sequence[Any], *args: Any, context: Any = None, **kwargs: Any
+    ) -> "Future[Any]":
+        """
+        Parses a command and runs it according to its execution policy.
+        `args` are passed before the parsed arguments. Raises `CommandNotFound` if nothing matched.
+        The checks of its requirements run with `context` before it's submitted, raising `CheckFailed`.
+        """
+        if self.engine.metrics is not None:
+            return self.submit_measured(command, args, context, kwargs)
+        command_list = self.parser(command) if isinstance(command, str) else command
+        cmd, cmd_args, callstack = self.engine.parse(command_list)
+        if cmd is None:
+            raise CommandNotFound(command)
+        if cmd.checks:
+            run_checks(self.engine.checks_for(cmd), cmd, context, {})
+        return self.run(cmd, callstack, (*args, *cmd_args), kwargs)
+
+    def submit_measured(
+        self,
+        command: str | Sequence[Any],
+        args: tuple[Any, ...],
+        context: Any,
+        kwargs: dict[str, Any],
+    ) -> "Future[Any]":
+        """`submit`, recording the time spent in each phase in the engine's metrics."""
+        cmd = None
+        callstack: tuple[Command, ...] = ()
+        marks = [perf_counter()]
+        try:
+            command_list = self.parser(command) if isinstance(command, str) else command
+            marks.append(perf_counter())
+            cmd, cmd_args, callstack = self.engine.parse(command_list)
+            marks.append(perf_counter())
+            if cmd is None:
+                raise CommandNotFound(command)
+            if cmd.checks:
+                run_checks(self.engine.checks_for(cmd), cmd, context, {})
+            future = self.run(cmd, callstack, (*args, *cmd_args), kwargs)
+        except Exception:
+            self.engine.record_invocation(marks, cmd, callstack, True)
+            raise
+        # Execution is measured from submission, so it includes the time spent queued.
+        future.add_done_callback(
+            lambda done: self.engine.record_invocation(
+                marks, cmd, callstack, done.cancelled() or done.exception() is not None
+            )
+        )
+        return future
+
+    def run(
+        self,
+        cmd: Command,
+        callstack: Sequence[Command],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> "Future[Any]":
+        if cmd.execution == "thread":
+            profiling = self.engine.profiler_for(cmd, callstack)
+            if profiling is not None:
+                profiler, path = profiling
+                return self.threads().submit(
+                    profiler.run, path, cmd, *args, engine=self.engine, **kwargs
+                )
+            return self.threads().submit(cmd, *args, engine=self.engine, **kwargs)
+        if cmd.execution == "process":
+            return self.run_in_process(cmd, callstack, args, kwargs)
+
+        future: "Future[Any]" = Future()
+        try:
+            future.set_result(self.engine.call_profiled(cmd, callstack, args, kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def run_in_process(
+        self,
+        cmd: Command,
+        callstack: Sequence[Command],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> "Future[Any]":
+        """
+        Submits a command to a process worker. Its arguments are checked and converted,
+        and its limits and result cache applied, in this process, since every worker
+        has its own copy of the limit stores and caches.
+        """
+        engine_path = self.resolve_engine_path(cmd)
+        key = None
+        future: "Future[Any]"
+        try:
+            if cmd.plan is not None:
+                cmd.plan.check(cmd.name, args, kwargs)
+            if cmd.converters is not None:
+                args = cmd.converters(args)
+            if cmd.limits:
+                check_limits(cmd.name, cmd.limits, kwargs)
+            cache = cmd.result_cache
+            if cache is not None:
+                key = cache_key(args, kwargs, self.engine.cache_token if cmd.injects_engine else None)
+                result = MISSING if key is None else cache.get(key)
+                if result is not MISSING:
+                    future = Future()
+                    future.set_result(result)
+                    return future
+            future = self.processes().submit(
+                run_in_worker,
+                engine_path,
+                tuple(parent.name for parent in callstack),
+                args,
+                kwargs,
+            )
+        except Exception as error:
+            future = Future()
+            future.set_exception(error)
+            return future
+
+        if key is not None:
+
+            def store(done: "Future[Any]") -> None:
+                if not done.cancelled() and done.exception() is None:
+                    cache.put(key, done.result())  # type: ignore[union-attr]
+
+            future.add_done_callback(store)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down the pools that were started."""
+        with self.lock:
+            thread_pool, self.thread_pool = self.thread_pool, None
+            process_pool, self.process_pool = self.process_pool, None
+        if thread_pool is not None:
+            thread_pool.shutdown(wait)
+        if process_pool is not None:
+            process_pool.shutdown(wait)
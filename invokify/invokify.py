@@ -3,11 +3,46 @@ Invokify
 
 Allows the creation of parsible commands using decorators.
 """
-__all__ = ["CommandAlreadyExists", "EngineRequired", "meta", "Command", "InvokeEngine"]
+__all__ = [
+    "CommandAlreadyExists",
+    "EngineRequired",
+    "EngineFrozen",
+    "CommandNotFound",
+    "meta",
+    "Command",
+    "InvokeEngine",
+    "DispatchNode",
+    "InvokeResult",
+]
 
+import copy
 import functools
-from dataclasses import dataclass, field
-from typing import Any, Callable, Optional, Union
+import importlib
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Mapping, NoReturn, Optional, Sequence, Union
+
+from invokify.caching import MISSING, ResultCache, cache_key
+from invokify.callplan import CallPlan, build_plan
+from invokify.checks import SPECIAL_REQUIREMENTS, CheckFailed, CheckPlan, check_plan, run_checks
+from invokify.coercion import Converters, build_converters
+from invokify.completion import Completer, Completion
+from invokify.limits import DEFAULT_STORE, Limit, LimitStore, check_limits
+from invokify.metrics import UNRESOLVED, Metrics
+from invokify.overlay import CommandLayer, CommandOverlay
+from invokify.parser import string_to_args
+from invokify.pipeline import PIPE, Chain, Link, split_chain, string_to_chain
+from invokify.profiling import Profiler
+from invokify.resolution import NameIndex, build_index
+
+
+EXECUTION_POLICIES = ("inline", "thread", "process")
+
+LOAD_LOCK = threading.RLock()  # Held while lazy commands are imported, which may load others.
+LOADING = threading.local()  # Whether this thread is importing the module of a lazy command.
 
 
 class CommandAlreadyExists(Exception):
@@ -23,6 +58,37 @@ class EngineRequired(Exception):
     """
 
 
+class CommandNotFound(Exception):
+    """
+    Will be raised when invoking input that doesn't resolve to a command.
+    """
+
+
+class EngineFrozen(Exception):
+    """
+    Will be raised when attempting to register a command
+    on an engine (or one of its commands) after it was frozen.
+    """
+
+
+class FrozenDict(dict[Any, Any]):
+    """A dict that refuses any changes, used once an engine was frozen or compacted."""
+
+    __slots__ = ()
+
+    def _frozen(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise EngineFrozen(
+            "Commands cannot be changed after the engine was frozen, and compacted containers are shared."
+        )
+
+    __setitem__ = __delitem__ = __ior__ = _frozen  # type: ignore
+    setdefault = update = pop = popitem = clear = _frozen  # type: ignore
+
+
+EMPTY = FrozenDict()  # Shared by the empty containers of compacted commands, see `InvokeEngine.compact`.
+FROZEN_EMPTY = FrozenDict()  # Shared by the empty subcommands of frozen engines.
+
+
 @dataclass(slots=True)
 class meta:
     """Define requirements for a command, such as injecting itself into the function."""
@@ -31,6 +97,11 @@ class meta:
     injections: dict[str, Any] = field(default_factory=dict)
     func: Optional[Callable[..., Any]] = None
     helptext: str = ""
+    coercion: bool = False
+    execution: str = "inline"
+    profiler: Optional[Profiler] = None
+    result_cache: Optional[ResultCache] = None
+    limits: tuple[Limit, ...] = ()
 
     @staticmethod
     def require(
@@ -56,6 +127,7 @@ class meta:
                     helptext="",
                 )
             func.requires = {"engine": engine, "command": command, **kwargs}
+            func.prepare()
             return func
 
         return wrapper
@@ -95,6 +167,129 @@ class meta:
 
         return wrapper
 
+    @staticmethod
+    def coerce() -> Callable[[Callable[..., Any] | "meta"], "meta|Command"]:
+        """
+        Converts the positional arguments of a command to the types in its annotations before every call.
+        Supports `int`, `float`, `str`, `bool`, `list[...]`, enums, `Literal` and `Optional`/unions.
+        """
+
+        def wrapper(func: Callable[..., Any] | "meta") -> "meta|Command":
+            if isinstance(func, Command):
+                func.coercion = True
+                func.prepare()
+                return func
+            if not isinstance(func, meta):
+                return meta(requires={}, injections={}, func=func, helptext="", coercion=True)
+            func.coercion = True
+            return func
+
+        return wrapper
+
+    @staticmethod
+    def executor(
+        policy: str,
+    ) -> Callable[[Callable[..., Any] | "meta"], "meta|Command"]:
+        """
+        Sets where a `CommandDispatcher` runs the command:
+        "inline" (the default), "thread" for blocking I/O or "process" for CPU-heavy work.
+        """
+        if policy not in EXECUTION_POLICIES:
+            raise ValueError(f"Unknown execution policy {policy!r}.")
+
+        def wrapper(func: Callable[..., Any] | "meta") -> "meta|Command":
+            if isinstance(func, Command):
+                func.execution = policy
+                return func
+            if not isinstance(func, meta):
+                return meta(requires={}, injections={}, func=func, helptext="", execution=policy)
+            func.execution = policy
+            return func
+
+        return wrapper
+
+    @staticmethod
+    def profile(
+        profiler: Optional[Profiler] = None,
+    ) -> Callable[[Callable[..., Any] | "meta"], "meta|Command"]:
+        """
+        Samples the command whenever it's invoked through an engine, into `profiler` or a new one.
+        The profiler is available as the command's `profiler` property.
+        """
+
+        def wrapper(func: Callable[..., Any] | "meta") -> "meta|Command":
+            target = Profiler() if profiler is None else profiler
+            if isinstance(func, Command):
+                func.profiler = target
+                return func
+            if not isinstance(func, meta):
+                return meta(requires={}, injections={}, func=func, helptext="", profiler=target)
+            func.profiler = target
+            return func
+
+        return wrapper
+
+    @staticmethod
+    def cache(
+        maxsize: Optional[int] = 128, ttl: Optional[float] = None
+    ) -> Callable[[Callable[..., Any] | "meta"], "meta|Command"]:
+        """
+        Memoizes the command's results per arguments, keeping up to `maxsize` results for `ttl` seconds.
+        Only use it for commands whose result depends on nothing but their arguments.
+        The cache is available as the command's `result_cache` property, see `Command.invalidate`.
+        """
+
+        def wrapper(func: Callable[..., Any] | "meta") -> "meta|Command":
+            target = ResultCache(maxsize, ttl)
+            if isinstance(func, Command):
+                func.result_cache = target
+                return func
+            if not isinstance(func, meta):
+                return meta(requires={}, injections={}, func=func, helptext="", result_cache=target)
+            func.result_cache = target
+            return func
+
+        return wrapper
+
+    @staticmethod
+    def rate_limit(
+        calls: int,
+        per: float,
+        key: Optional[str] = None,
+        store: Optional[LimitStore] = None,
+        name: Optional[str] = None,
+    ) -> Callable[[Callable[..., Any] | "meta"], "meta|Command"]:
+        """
+        Allows the command to be called `calls` times every `per` seconds, in bursts or spread out.
+        `key` names the keyword argument that identifies the caller, such as "user" for
+        `cmd(engine=engine, user=user_id)`, to limit every caller on their own.
+        The function receives that argument too. Calls over the limit raise `RateLimited` before the function runs.
+        Every limit counts on its own, unless limits are given the same `name` to share their calls,
+        such as across engines or processes sharing a store.
+        """
+
+        def wrapper(func: Callable[..., Any] | "meta") -> "meta|Command":
+            limit = Limit(calls, per, key, name, DEFAULT_STORE if store is None else store)
+            if isinstance(func, Command):
+                func.limits = (*func.limits, limit)
+                return func
+            if not isinstance(func, meta):
+                return meta(requires={}, injections={}, func=func, helptext="", limits=(limit,))
+            func.limits = (*func.limits, limit)
+            return func
+
+        return wrapper
+
+    @staticmethod
+    def cooldown(
+        seconds: float,
+        key: Optional[str] = None,
+        store: Optional[LimitStore] = None,
+        name: Optional[str] = None,
+    ) -> Callable[[Callable[..., Any] | "meta"], "meta|Command"]:
+        """Allows the command to be called once every `seconds`, see `rate_limit`."""
+        return meta.rate_limit(1, seconds, key, store, name)
+
 
 @dataclass(slots=True)
 class Command:
@@ -112,22 +307,141 @@ class Command:
         str, Any
     ]  # Objects that will be injected into the command as kwargs.
     children: dict[str, "Command"] = field(
-        default_factory=dict
+        default_factory=CommandLayer
     )  # Similar to engine.commands; Lists the subcommands attached to a command.
     helptext: Optional[str] = None
+    coercion: bool = False  # Whether arguments are converted to the function's annotations.
+    execution: str = "inline"  # Where a `CommandDispatcher` runs the command.
+    profiler: Optional[Profiler] = field(
+        default=None, repr=False, compare=False
+    )  # Samples the command whenever it's invoked through an engine.
+    result_cache: Optional[ResultCache] = field(
+        default=None, repr=False, compare=False
+    )  # Memoizes the command's results, see `meta.cache`.
+    limits: tuple[Limit, ...] = field(
+        default=(), repr=False, compare=False
+    )  # Checked before every call, see `meta.rate_limit`.
+    checks: tuple[str, ...] = field(
+        default=(), init=False, repr=False, compare=False
+    )  # Set by `prepare`; The requirements engines look up checks for, see `InvokeEngine.check`.
+    plan: Optional[CallPlan] = field(
+        default=None, init=False, repr=False, compare=False
+    )  # Set by `prepare`; How the function can be called, None if it has no signature.
+    needs_engine: bool = field(
+        default=False, init=False, repr=False, compare=False
+    )  # Set by `prepare`; Whether the caller must supply an engine.
+    injects_engine: bool = field(
+        default=False, init=False, repr=False, compare=False
+    )  # Set by `prepare`; Whether the caller's engine is passed to the function.
+    static_kwargs: dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )  # Set by `prepare`; The kwargs that are the same for every call.
+    converters: Optional[Converters] = field(
+        default=None, init=False, repr=False, compare=False
+    )  # Set by `prepare`; Converts the arguments when `coercion` is enabled.
+    index: Optional[NameIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )  # The index of the subcommands' names, see `InvokeEngine.index_for`.
+    source: Optional[str] = field(
+        default=None, compare=False
+    )  # The "module:attribute" path a lazy command's function is imported from.
+    loaded: bool = field(
+        default=True, compare=False
+    )  # False until a lazy command's function was imported, see `load`.
+
+    def __post_init__(self) -> None:
+        if self.loaded:
+            self.prepare()
+
+    def prepare(self) -> None:
+        """
+        Builds the command's call plan and precomputes what gets injected on every call.
+        Injections the function doesn't accept are left out.
+        Must be called again after changing `requires` or `injections` by hand.
+        """
+        static_kwargs = dict(self.injections)
+        if self.requires.get("command"):
+            static_kwargs["command"] = self
+        self.needs_engine = bool(self.requires.get("engine"))
+        self.checks = tuple(
+            name for name, value in self.requires.items() if value and name not in SPECIAL_REQUIREMENTS
+        )
+
+        injected = [*static_kwargs, "engine"] if self.needs_engine else static_kwargs
+        self.plan = plan = build_plan(self.func, injected)
+        if plan is None:
+            self.injects_engine = self.needs_engine
+        else:
+            static_kwargs = {
+                name: value for name, value in static_kwargs.items() if name in plan.injects
+            }
+            self.injects_engine = self.needs_engine and "engine" in plan.injects
+        self.static_kwargs = static_kwargs
+        self.converters = (
+            build_converters(self.func, plan) if self.coercion and plan is not None else None
+        )
 
     def __call__(
         self, *args: Any, engine: Optional["InvokeEngine"] = None, **kwargs: Any
     ) -> Any:
-        if self.requires.get("engine"):
+        # Per-call values only ever go into this call's own kwargs, so commands
+        # can be shared between engines and threads.
+        if self.needs_engine:
             if engine is None:
                 raise EngineRequired
-            self.injections["engine"] = engine
+            if self.injects_engine:
+                kwargs["engine"] = engine
 
-        if self.requires.get("command"):
-            self.injections["command"] = self
+        plan = self.plan
+        if plan is not None and (
+            not plan.min_args <= len(args) <= plan.max_args or plan.required_keywords
+        ):
+            plan.check(self.name, args, kwargs)
+        if self.converters is not None:
+            args = self.converters(args)
+        if self.limits:
+            check_limits(self.name, self.limits, kwargs)
+        if self.result_cache is not None:
+            return self.call_cached(args, kwargs, engine)
+
+        if self.static_kwargs:
+            if kwargs:
+                return self.func(*args, **self.static_kwargs, **kwargs)
+            return self.func(*args, **self.static_kwargs)
+        if kwargs:
+            return self.func(*args, **kwargs)
+        return self.func(*args)
+
+    def call_cached(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any], engine: Optional["InvokeEngine"]
+    ) -> Any:
+        # Injections are the same for every call, except for the engine, which is part of the key.
+        cache: ResultCache = self.result_cache  # type: ignore
+        key = cache_key(args, kwargs, engine.cache_token if self.injects_engine else None)  # type: ignore[union-attr]
+        if key is not None:
+            result = cache.get(key)
+            if result is not MISSING:
+                return result
+        result = self.func(*args, **self.static_kwargs, **kwargs)
+        if key is not None:
+            cache.put(key, result)
+        return result
 
-        return self.func(*args, **self.injections, **kwargs)
+    def invalidate(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Drops the cached result of a call with these arguments, for every engine,
+        or all of the command's cached results when none are given.
+        """
+        if self.result_cache is None:
+            return
+        if not args and not kwargs:
+            self.result_cache.invalidate()
+            return
+        if self.converters is not None:
+            args = self.converters(args)
+        key = cache_key(args, kwargs)
+        if key is not None:
+            self.result_cache.invalidate(key, scoped=self.injects_engine)
 
     def __repr__(self) -> str:
         return f"Command(func={self.func.__name__}, aliases={self.aliases})"
@@ -143,7 +457,8 @@ class Command:
         aliases: Optional[list[str]] = None,
     ) -> "Command":
         """A decorator that turns a function into a subcommand"""
-
+        if self.children is EMPTY:
+            self.children = CommandLayer()
         return create_command(
             func=func,
             commanddict=self.children,
@@ -151,6 +466,76 @@ class Command:
             aliases=aliases,
         )
 
+    def lazy_subcommand(
+        self,
+        source: str,
+        name: Optional[str] = None,
+        aliases: Optional[list[str]] = None,
+        helptext: Optional[str] = None,
+    ) -> "Command":
+        """Registers a subcommand whose function is imported from `source` the first time it's parsed."""
+        if self.children is EMPTY:
+            self.children = CommandLayer()
+        return create_lazy_command(source, self.children, name, aliases, helptext)
+
+    def load(self) -> None:
+        """
+        Imports the function of a lazy command, which `InvokeEngine.parse` does when it resolves to it.
+        Decorators in the imported module that register the same name fill in this command
+        instead of raising `CommandAlreadyExists`; otherwise the attribute in `source` is used.
+        In frozen engines, the names the module registers that weren't declared are skipped.
+        """
+        if self.loaded:
+            return
+        with LOAD_LOCK:
+            if self.loaded or self.source is None:
+                return
+            module, _, attribute = self.source.partition(":")
+            loading = getattr(LOADING, "active", False)
+            LOADING.active = True
+            try:
+                importlib.import_module(module)
+            finally:
+                LOADING.active = loading
+            if not self.loaded:
+                self.fill(import_object(self.source) if attribute else self.func)
+
+    def fill(self, value: Union[Callable[..., Any], "Command", meta]) -> None:
+        """Fills in a lazy command from the function, meta or command it was declared for."""
+        if isinstance(value, meta):
+            value = Command(
+                func=value.func,  # type: ignore
+                name=self.name,
+                aliases=[],
+                requires=value.requires,
+                injections=value.injections,
+                helptext=value.helptext,
+                coercion=value.coercion,
+                execution=value.execution,
+                profiler=value.profiler,
+                result_cache=value.result_cache,
+                limits=value.limits,
+            )
+        if isinstance(value, Command):
+            self.func = value.func
+            self.requires = value.requires
+            self.injections = value.injections
+            self.helptext = self.helptext or value.helptext
+            self.coercion = value.coercion
+            self.execution = value.execution
+            self.profiler = value.profiler
+            self.result_cache = value.result_cache
+            self.limits = value.limits
+            if value.children and self.children is EMPTY:
+                self.children = CommandLayer()
+            for name, child in value.children.items():
+                if name not in self.children:
+                    self.children[name] = child
+        else:
+            self.func = value
+        self.prepare()
+        self.loaded = True
+
 
 def create_command(
     func: Optional[Callable[..., Any] | meta],
@@ -170,15 +555,49 @@ def create_command(
         requires = {}
         inject = {}
         helptext = None
+        coercion = False
+        execution = "inline"
+        profiler = None
+        result_cache = None
+        limits: tuple[Limit, ...] = ()
         if isinstance(func, meta):
             requires = func.requires
             inject = func.injections
             helptext = func.helptext
+            coercion = func.coercion
+            execution = func.execution
+            profiler = func.profiler
+            result_cache = func.result_cache
+            limits = func.limits
             func = func.func  # type: ignore
 
         if name is None:
             name = func.__name__  # type: ignore
 
+        lazy = commanddict.get(name)  # type: ignore
+        if lazy is not None and not lazy.loaded:
+            # The module of a lazy command is being imported, so its declaration is filled in.
+            lazy.fill(
+                meta(
+                    requires, inject, func, helptext or "", coercion, execution, profiler, result_cache, limits  # type: ignore
+                )
+                if not isinstance(func, Command)
+                else func
+            )
+            for alias in aliases:  # type: ignore
+                if commanddict.get(alias) is not lazy:
+                    if alias in commanddict:
+                        raise CommandAlreadyExists
+                    if isinstance(commanddict, FrozenDict) and getattr(LOADING, "active", False):
+                        continue
+                    commanddict[alias] = lazy
+                    lazy.aliases.append(alias)  # type: ignore
+            return lazy
+
+        frozen = isinstance(commanddict, FrozenDict)
+        if frozen and not getattr(LOADING, "active", False):
+            raise EngineFrozen("Commands cannot be registered after the engine was frozen.")
+
         command = func
         if not isinstance(func, Command):
             command = Command(
@@ -188,8 +607,16 @@ def create_command(
                 requires=requires,
                 injections=inject,
                 helptext=helptext,
+                coercion=coercion,
+                execution=execution,
+                profiler=profiler,
+                result_cache=result_cache,
+                limits=limits,
             )
 
+        if frozen:  # Undeclared by a lazy command's module, so it's left out of the frozen tree.
+            return command  # type: ignore
+
         aliases.append(name)  # type: ignore
         for name in aliases:  # type: ignore
             if commanddict.get(name):
@@ -204,37 +631,703 @@ def create_command(
     return wrapper  # type: ignore
 
 
+def create_lazy_command(
+    source: str,
+    commanddict: dict[str, Command],
+    name: Optional[str],
+    aliases: Optional[list[str]],
+    helptext: Optional[str],
+) -> Command:
+    """Creates a command whose function is imported from `source` ("module:attribute") once it's parsed."""
+    if isinstance(commanddict, FrozenDict):
+        raise EngineFrozen("Commands cannot be registered after the engine was frozen.")
+    if name is None:
+        name = source.rpartition(":")[2].rpartition(".")[2]
+    aliases = [*(aliases or []), name]
+
+    def unloaded(*args: Any, **kwargs: Any) -> Any:
+        # Only reached when a lazy command is called before it was parsed.
+        command.load()
+        return command(*args, **kwargs)
+
+    unloaded.__name__ = unloaded.__qualname__ = name
+    command = Command(
+        func=unloaded,
+        name=name,
+        aliases=aliases,
+        requires={},
+        injections={},
+        helptext=helptext,
+        source=source,
+        loaded=False,
+    )
+    for alias in aliases:
+        if commanddict.get(alias):
+            raise CommandAlreadyExists
+        commanddict[alias] = command
+    return command
+
+
+def share(value: Any, shared: dict[Any, Any]) -> Any:
+    """Returns the shared equal value, or makes `value` the shared one. Unhashable values aren't shared."""
+    try:
+        return shared.setdefault(value, value)
+    except TypeError:
+        return value
+
+
+def share_dict(value: dict[str, Any], shared: dict[Any, Any]) -> dict[str, Any]:
+    """
+    Returns a read-only copy of `value`, shared with the other dicts holding the very same values.
+    Equal values aren't enough, since a handler injected with `True` shouldn't get `1` instead.
+    """
+    if not value:
+        return EMPTY
+    key = (FrozenDict, *((name, id(item)) for name, item in value.items()))
+    if key not in shared:
+        shared[key] = FrozenDict(value)
+    return shared[key]  # type: ignore
+
+
+def compact_commands(
+    commands: dict[str, Command], shared: dict[Any, Any], seen: set[int]
+) -> dict[str, Command]:
+    """Compacts a level of the command tree and the levels below it, see `InvokeEngine.compact`."""
+    compacted = commands
+    if not isinstance(commands, CommandOverlay):  # Its names are those of its base and its own commands.
+        compacted = {
+            sys.intern(name) if isinstance(name, str) else name: command
+            for name, command in commands.items()
+        }
+        if isinstance(commands, CommandLayer):  # Overlays and indexes are linked to these commands.
+            dict.clear(commands)
+            dict.update(commands, compacted)
+            compacted = commands
+    for command in compacted.values():
+        if id(command) in seen:
+            continue
+        seen.add(id(command))
+        command.name = sys.intern(command.name)
+        if command.aliases:
+            command.aliases[:] = [sys.intern(alias) for alias in command.aliases]
+        command.requires = share_dict(command.requires, shared)
+        command.injections = share_dict(command.injections, shared)
+        command.static_kwargs = share_dict(command.static_kwargs, shared)
+        command.plan = share(command.plan, shared)
+        command.checks = share(command.checks, shared)
+        command.converters = share(command.converters, shared)
+        if command.children:
+            command.children = compact_commands(command.children, shared, seen)
+        elif command.children is not FROZEN_EMPTY:
+            command.children = EMPTY
+    return FrozenDict(compacted) if isinstance(commands, FrozenDict) else compacted
+
+
+def copy_command(command: Command) -> Command:
+    """
+    A copy of a command, with its own aliases and subcommand names, an empty result cache
+    and its own count of calls for limits without a name.
+    """
+    copied = copy.copy(command)
+    copied.children = CommandLayer(command.children)
+    copied.aliases = None if command.aliases is None else list(command.aliases)
+    copied.index = None
+    if command.result_cache is not None:
+        copied.result_cache = ResultCache(command.result_cache.maxsize, command.result_cache.ttl)
+    copied.limits = tuple(replace(limit) for limit in command.limits)
+    if copied.loaded:
+        copied.prepare()  # Commands that require themselves get the copy injected.
+    return copied
+
+
+def import_object(path: str) -> Any:
+    """Imports the object at a "module:attribute" path, where the attribute may be dotted."""
+    module, _, attribute = path.partition(":")
+    value: Any = importlib.import_module(module)
+    for name in attribute.split("."):
+        value = getattr(value, name)
+    return value
+
+
+def register_entries(
+    entries: Iterable[Mapping[str, Any]], commanddict: dict[str, Command]
+) -> list[Command]:
+    """Registers the lazy commands of manifest entries, and their subcommands."""
+    commands = []
+    for entry in entries:
+        command = create_lazy_command(
+            entry["source"], commanddict, entry.get("name"), entry.get("aliases"), entry.get("help")
+        )
+        # Kept until the module is imported, such as for exporting the manifest again. Checks and injections
+        # only apply once `fill` replaced them with the decorated function's own and prepared the command.
+        command.requires = dict(entry.get("requires", {}))
+        command.coercion = entry.get("coercion", False)
+        command.execution = entry.get("execution", "inline")
+        register_entries(entry.get("children", ()), command.children)
+        commands.append(command)
+    return commands
+
+
+class DispatchNode(FrozenDict):
+    """
+    A node of a frozen engine's dispatch trie, mapping tokens to child nodes.
+    Every path through the command tree gets its own node, with its callstack precomputed.
+    """
+
+    __slots__ = ("command", "callstack", "index")
+
+    def __init__(
+        self,
+        command: Optional[Command],
+        callstack: tuple[Command, ...],
+        children: dict[str, "DispatchNode"],
+    ) -> None:
+        super().__init__(children)
+        self.command = command
+        self.callstack = callstack
+        self.index: Optional[NameIndex] = None
+
+    def __repr__(self) -> str:
+        return f"DispatchNode(command={self.command!r}, children={list(self)})"
+
+
+def compile_dispatch(
+    commands: Mapping[str, Command],
+    command: Optional[Command] = None,
+    callstack: tuple[Command, ...] = (),
+) -> DispatchNode:
+    """Compiles a command tree into a dispatch trie with interned keys."""
+    children = {}
+    nodes: dict[int, DispatchNode] = {}  # Aliases share the node of their command.
+    for name, child in commands.items():
+        if any(child is parent for parent in callstack):
+            raise ValueError(f"Cannot freeze the recursive subcommand {name!r}.")
+        node = nodes.get(id(child))
+        if node is None:
+            node = nodes[id(child)] = compile_dispatch(
+                child.children, child, (*callstack, child)
+            )
+        children[sys.intern(name) if isinstance(name, str) else name] = node
+    return DispatchNode(command, callstack, children)
+
+
+def shareable(values: Iterable[Any]) -> bool:
+    """Whether parsed arguments can be passed to several calls, which only hashable, immutable ones can."""
+    try:
+        for value in values:
+            hash(value)
+    except (TypeError, ValueError):  # Memoryviews raise ValueError.
+        return False
+    return True
+
+
+def command_path(callstack: Sequence[Command]) -> str:
+    """The names of a callstack's commands, separated by spaces."""
+    return " ".join(command.name for command in callstack)
+
+
+@dataclass(slots=True, frozen=True)
+class InvokeResult:
+    """The outcome of one input of `InvokeEngine.invoke_many`."""
+
+    index: int  # The position of the input.
+    input: Union[str, Sequence[Any]]
+    command: Optional[Command]  # The resolved command, None if the input didn't resolve.
+    value: Any = None  # What the command returned.
+    error: Optional[Exception] = None  # The exception raised while parsing, resolving or running.
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 @dataclass(slots=True)
 class InvokeEngine:
     """A container for commands."""
 
-    commands: dict[str, Command] = field(default_factory=dict)
+    commands: dict[str, Command] = field(default_factory=CommandLayer)
+    dispatch: Optional[DispatchNode] = field(
+        default=None, init=False, repr=False
+    )  # The compiled dispatch trie, set once the engine is frozen.
+    metrics: Optional[Metrics] = field(
+        default=None, repr=False
+    )  # Records invocations when set, see `instrument`.
+    profiler: Optional[Profiler] = field(
+        default=None, repr=False
+    )  # Samples every command invoked through the engine when set, see `profile`.
+    prefix_matching: bool = False  # Whether unambiguous prefixes resolve to commands, such as "bu" to "buy".
+    index: Optional[NameIndex] = field(
+        default=None, init=False, repr=False
+    )  # The index of the commands' names, see `index_for`.
+    completer: Optional[Completer] = field(
+        default=None, init=False, repr=False
+    )  # Used by `complete`, created on first use.
+    checks: dict[str, Callable[[Any], Any]] = field(
+        default_factory=dict, repr=False
+    )  # The check of every requirement name, in the order they run, see `check`.
+    cache_token: object = field(
+        default_factory=object, init=False, repr=False, compare=False
+    )  # Scopes cached results to the engine, without keeping it alive like the engine itself would.
+    check_plans: dict[tuple[str, ...], CheckPlan] = field(
+        default_factory=dict, init=False, repr=False
+    )  # The checks to run per set of requirements, see `checks_for`.
 
-    def parse(
+    @property
+    def frozen(self) -> bool:
+        return self.dispatch is not None
+
+    def freeze(self) -> None:
+        """
+        Compiles the command tree into an immutable dispatch trie, which `parse` will use from now on.
+        Registering new commands or subcommands anywhere in the tree will raise `EngineFrozen`.
+        """
+        if self.dispatch is not None:
+            return
+        dispatch = compile_dispatch(self.commands)
+
+        pending = list(self.commands.values())
+        seen = set()
+        while pending:
+            command = pending.pop()
+            if id(command) in seen:
+                continue
+            seen.add(id(command))
+            if not command.children:
+                command.children = FROZEN_EMPTY
+            elif not isinstance(command.children, FrozenDict):
+                command.children = FrozenDict(command.children)
+            pending.extend(command.children.values())
+
+        self.commands = FrozenDict(self.commands)
+        self.dispatch = dispatch
+
+    def compact(self) -> None:
+        """
+        Saves memory in very large command trees by sharing the empty and identical containers
+        and call plans of every command, and interning their names.
+        Shared containers are read-only, so assign new ones instead of changing them, then call `prepare`.
+        Call it again after registering more commands.
+        """
+        self.commands = compact_commands(self.commands, {}, set())
+
+    def overlay(self) -> "InvokeEngine":
+        """
+        Creates an engine that shares this engine's commands, such as for one tenant of many.
+        It can add, override, hide and edit commands without changing this engine,
+        and takes on the commands registered here later, unless it overrides or hides their names.
+        Overlays can have overlays themselves.
+
+        Freeze the base before creating overlays, if at all; freezing an overlay freezes
+        the subcommands it shares with its base, and stops it from taking on changes.
+        """
+        if not isinstance(self.commands, (CommandLayer, FrozenDict)):
+            self.commands = CommandLayer(self.commands)
+        return InvokeEngine(
+            CommandOverlay(self.commands), prefix_matching=self.prefix_matching, checks=dict(self.checks)
+        )
+
+    def hide(self, *names: str) -> None:
+        """Removes the commands registered under `names`, with all of their aliases. Overlays leave their base unchanged."""
+        for name in names:
+            command = self.commands.get(name)
+            if command is None:
+                continue
+            for alias in {name, command.name, *(command.aliases or ())}:
+                if self.commands.get(alias) is command:
+                    del self.commands[alias]
+        self.index = None
+
+    def override(
         self,
-        command_list: list[Any],
-        _command: Optional[Command] = None,
-        _callstack: Optional[list[Command]] = None,
+        func: Optional[Union[Callable[..., Any], Command, meta]] = None,
+        name: Optional[str] = None,
+        aliases: Optional[list[str]] = None,
+    ) -> Command:
+        """A decorator like `command`, which replaces the commands with the same names instead of raising `CommandAlreadyExists`."""
+
+        def wrapper(func: Union[Callable[..., Any], Command, meta]) -> Command:
+            target = func.func if isinstance(func, meta) else func
+            self.hide(name or target.__name__, *(aliases or ()))  # type: ignore
+            return create_command(func, self.commands, name, aliases)
+
+        if func:
+            return wrapper(func)
+        return wrapper  # type: ignore
+
+    def edit(self, *path: str) -> Command:
+        """
+        Returns the command at a path of names, such as `edit("buy", "all")`, to change it or register subcommands on it.
+        Overlays copy the commands they share with their base first, along with every command above them,
+        so the base is left unchanged.
+        """
+        level = self.commands
+        base: Optional[Mapping[str, Command]] = (
+            level.base if isinstance(level, CommandOverlay) else None
+        )
+        command = None
+        for depth, name in enumerate(path):
+            current = level.get(name)
+            if current is None:
+                raise CommandNotFound(path[: depth + 1])
+            shared = base.get(name) if base is not None else None
+            if current is shared:
+                current = copy_command(shared)
+                for alias in {name, shared.name, *(shared.aliases or ())}:
+                    if level.get(alias) is shared:
+                        level[alias] = current
+                (self if command is None else command).index = None
+            base = shared.children if shared is not None else None
+            level = current.children
+            command = current
+        if command is None:
+            raise ValueError("edit needs the name of a command.")
+        return command
+
+    def parse(
+        self, command_list: Sequence[Any]
     ) -> tuple[Command, tuple[Any, ...], tuple[Command, ...]]:
         """Parses a list to find the lowest level subcommand, and passes the rest of the arguments back."""
-        if _callstack is None:
-            _callstack = []
-        else:
-            _callstack.append(_command)  # type: ignore
+        node = self.dispatch
+        if node is not None:
+            index = 0
+            for token in command_list:
+                try:
+                    next_node = node.get(token)
+                except TypeError:
+                    break
+                if next_node is None:
+                    if not (self.prefix_matching and isinstance(token, str)):
+                        break
+                    next_node = self.index_for(node).unique_prefix(token)
+                    if next_node is None:
+                        break
+                node = next_node
+                index += 1
+            if node.command is not None and not node.command.loaded:
+                node.command.load()
+            return (node.command, command_list[index:] if index else command_list, node.callstack)  # type: ignore
 
-        if len(command_list) == 0:
-            return (_command, command_list, tuple(_callstack))  # type: ignore
+        command = None
+        callstack: list[Command] = []
+        children = self.commands
+        index = 0
+        for token in command_list:
+            try:
+                child = children.get(token)
+            except TypeError:  # Unhashable arguments, like lists, are never commands.
+                break
+            if child is None:
+                child = self.resolve_missing(command, token)
+                if child is None:
+                    break
+            command = child
+            callstack.append(child)
+            children = child.children
+            index += 1
 
-        if _command is None:
-            command = self.commands.get(command_list[0])
-        else:
-            command = _command.children.get(command_list[0])
+        if command is not None and not command.loaded:
+            command.load()
+        # The remaining arguments are sliced once, or passed back untouched if nothing matched.
+        return (command, command_list[index:] if index else command_list, tuple(callstack))  # type: ignore
 
-        if command is None:
-            return (_command, command_list, tuple(_callstack))  # type: ignore
+    def resolve_missing(self, command: Optional[Command], token: Any) -> Optional[Command]:
+        """
+        Resolves a token that isn't one of the names below `command`, by loading `command`
+        if it's lazy, since its module may register subcommands, and then by prefix.
+        """
+        if command is not None and not command.loaded:
+            command.load()
+            child = command.children.get(token)
+            if child is not None:
+                return child
+        if self.prefix_matching and isinstance(token, str):
+            return self.index_for(command).unique_prefix(token)
+        return None
+
+    def index_for(self, level: Union[Command, DispatchNode, None]) -> NameIndex:
+        """
+        Returns the name index of a command's subcommands, of a dispatch node's children
+        or, for None, of the engine's commands.
+        Indexes are built on first use and rebuilt once any name changed since,
+        or for plain dicts of commands, once their size changed.
+        """
+        if isinstance(level, DispatchNode):
+            if level.index is None:
+                level.index = build_index(level)
+            return level.index
+        holder = self if level is None else level
+        names = self.commands if level is None else level.children
+        index = holder.index
+        version = names.version if isinstance(names, CommandLayer) else None
+        if index is None or (
+            index.size != len(names) if version is None else index.version != version
+        ):
+            index = holder.index = build_index(names, version)
+        return index
+
+    def suggest(
+        self,
+        command: Union[str, Sequence[Any]],
+        limit: int = 5,
+        max_distance: int = 2,
+        parser: Callable[[str], Sequence[Any]] = string_to_args,
+    ) -> list[str]:
+        """
+        Suggests commands for input that didn't resolve, for "did you mean" messages.
+        Commands starting with the first unresolved word come first, then those within `max_distance` edits of it.
+        Returns full command paths such as "buy all", one per command.
+        """
+        command_list = parser(command) if isinstance(command, str) else command
+        cmd, _, callstack = self.parse(command_list)
+        if len(callstack) >= len(command_list) or not isinstance(command_list[len(callstack)], str):
+            return []
+        word = command_list[len(callstack)]
+        index = self.index_for(cmd)
+        names = self.commands if cmd is None else cmd.children
+        parent = command_path(callstack)
+
+        def candidates() -> Iterator[str]:
+            # Names that start with the word are enough for most suggestions, so they're looked at lazily.
+            low, high = index.prefix_range(word)
+            for position in range(low, high):
+                yield index.names[position]
+            for _, name in index.similar(word, max_distance):
+                yield name
+
+        suggestions: list[str] = []
+        seen = set()
+        for name in candidates():
+            if len(suggestions) >= limit:
+                break
+            if id(names[name]) in seen:
+                continue
+            seen.add(id(names[name]))
+            suggestions.append(f"{parent} {name}" if parent else name)
+        return suggestions
+
+    def complete(self, line: str, cursor: Optional[int] = None) -> Completion:
+        """
+        Completes the command, subcommand or alias being typed before `cursor`, the end of the line by default.
+        Consecutive calls share their work when the line was extended, like while typing.
+        Each session, such as a shell or console connection, should use its own `Completer(engine)` instead.
+        """
+        if self.completer is None:
+            self.completer = Completer(self)
+        return self.completer.complete(line, cursor)
+
+    def check(self, name: str) -> Callable[[Callable[[Any], Any]], Callable[[Any], Any]]:
+        """
+        A decorator that registers the check for commands with the `name` requirement, such as `meta.require(admin=True)`.
+        Checks are called with the context passed to `invoke_many`, `invoke_chain`, `AsyncInvokeEngine.invoke`
+        or `CommandDispatcher.submit`, and a falsy result raises `CheckFailed` instead of running the command.
+        They run in the order they were registered and each runs once per request.
+        Once an engine has checks, requirements without one fail, so a misspelled requirement doesn't let everyone in.
+        Commands called directly skip checks, and async checks need `AsyncInvokeEngine.invoke`.
+        """
+
+        def wrapper(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+            self.checks[name] = func
+            self.check_plans.clear()
+            return func
+
+        return wrapper
+
+    def checks_for(self, command: Command) -> CheckPlan:
+        """The checks to run for a command's requirements, worked out once per set of requirements."""
+        plan = self.check_plans.get(command.checks)
+        if plan is None:
+            plan = self.check_plans[command.checks] = check_plan(self.checks, command.checks)
+        return plan
+
+    def invoke_many(
+        self,
+        commands: Iterable[Union[str, Sequence[Any]]],
+        *args: Any,
+        parser: Callable[[str], Sequence[Any]] = string_to_args,
+        cache_size: int = 4096,
+        context: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[InvokeResult]:
+        """
+        Parses, resolves and runs many commands, yielding an `InvokeResult` per input, in input order.
+        Errors are captured in their result instead of stopping the batch.
+
+        Duplicate strings reuse their parsed command and arguments (up to `cache_size` distinct strings),
+        unless an argument isn't hashable, like lists and arrays a command could change.
+        `args` are passed before the parsed arguments of every command,
+        and `context` to the checks of their requirements, see `check`.
+        """
+        metrics = self.metrics
+        results: dict[str, bool] = {}
+        resolved: dict[str, tuple[Command, tuple[Any, ...], tuple[Command, ...]]] = {}
+        for index, line in enumerate(commands):
+            cmd = None
+            callstack: tuple[Command, ...] = ()
+            marks = [perf_counter()] if metrics is not None else None
+            try:
+                entry = resolved.get(line) if isinstance(line, str) else None
+                if entry is None:
+                    command_list = parser(line) if isinstance(line, str) else line
+                    if marks is not None:
+                        marks.append(perf_counter())
+                    cmd, remaining, callstack = self.parse(command_list)
+                    if marks is not None:
+                        marks.append(perf_counter())
+                    if cmd is None:
+                        raise CommandNotFound(line)
+                    cmd_args = tuple(remaining)
+                    if (
+                        isinstance(line, str)
+                        and len(resolved) < cache_size
+                        and shareable(cmd_args)
+                    ):
+                        resolved[line] = (cmd, cmd_args, callstack)
+                else:
+                    cmd, cmd_args, callstack = entry
+                    if marks is not None:
+                        marks *= 3
+                if cmd.checks:
+                    run_checks(self.checks_for(cmd), cmd, context, results)
+                if self.profiler is None and cmd.profiler is None:
+                    value = cmd(*args, *cmd_args, engine=self, **kwargs)
+                else:
+                    value = self.call_profiled(cmd, callstack, (*args, *cmd_args), kwargs)
+            except Exception as error:
+                if marks is not None:
+                    self.record_invocation(marks, cmd, callstack, True)
+                yield InvokeResult(index, line, cmd, error=error)
+            else:
+                if marks is not None:
+                    self.record_invocation(marks, cmd, callstack, False)
+                yield InvokeResult(index, line, cmd, value)
+
+    def chain(
+        self,
+        line: Union[str, Sequence[Any]],
+        parser: Callable[[str], Sequence[Any]] = string_to_chain,
+    ) -> Chain:
+        """
+        Resolves every command of a chain such as "buy 10 && sell 5 | log" once, see `invoke_chain`.
+        Raises `CommandNotFound` for a command that doesn't resolve, before any of them ran.
+        """
+        command_list = parser(line) if isinstance(line, str) else line
+        links = []
+        for operator, words in split_chain(command_list):
+            cmd, remaining, callstack = self.parse(words)
+            if cmd is None:
+                raise CommandNotFound(words)
+            links.append(Link(operator, cmd, tuple(remaining), callstack))
+        return Chain(tuple(links))
+
+    def invoke_chain(
+        self, chain: Union[str, Sequence[Any], Chain], *args: Any, context: Any = None, **kwargs: Any
+    ) -> list[Any]:
+        """
+        Runs the commands of a chain in order and returns their results.
+        `&&` runs the next command once the previous one returned, `|` also passes it the previous result
+        as its last argument. An exception stops the chain and is raised as it is.
+
+        Strings are resolved with `chain` first; keep the `Chain` to run the same input again.
+        `args` are passed before the arguments of every command, and `context` to their checks, see `check`.
+        """
+        if not isinstance(chain, Chain):
+            chain = self.chain(chain)
+        plain = self.metrics is None and self.profiler is None
+        results: list[Any] = []
+        checked: dict[str, bool] = {}
+        for link in chain.links:
+            cmd = link.command
+            if cmd.checks:
+                try:
+                    run_checks(self.checks_for(cmd), cmd, context, checked)
+                except CheckFailed:
+                    self.record_invocation([perf_counter()] * 3, cmd, link.callstack, True)
+                    raise
+            call_args = (*args, *link.args, results[-1]) if link.operator is PIPE else (*args, *link.args)
+            if plain and cmd.profiler is None:
+                results.append(cmd(*call_args, engine=self, **kwargs))
+                continue
+            marks = [perf_counter()] * 3
+            try:
+                results.append(self.call_profiled(cmd, link.callstack, call_args, kwargs))
+            except Exception:
+                self.record_invocation(marks, cmd, link.callstack, True)
+                raise
+            self.record_invocation(marks, cmd, link.callstack, False)
+        return results
+
+    @contextmanager
+    def profile(self, *paths: str, interval: float = 0.001) -> Iterator[Profiler]:
+        """
+        Samples the commands invoked through the engine until the block ends.
+        Only the given command paths ("buy all") and their subcommands are profiled, or all if none are given.
+
+        ```
+        with engine.profile("buy") as profiler:
+            ...
+        profiler.write(open("buy.folded", "w"))
+        ```
+        """
+        profiler = Profiler(interval, frozenset(paths) or None)
+        previous, self.profiler = self.profiler, profiler
+        try:
+            with profiler:
+                yield profiler
+        finally:
+            self.profiler = previous
+
+    def profiler_for(self, command: Command, callstack: Sequence[Command]) -> Optional[tuple[Profiler, str]]:
+        """The profiler that samples a command and the path it's sampled under, None if it isn't profiled."""
+        profiler = command.profiler if command.profiler is not None else self.profiler
+        if profiler is None:
+            return None
+        path = command_path(callstack) or command.name
+        return (profiler, path) if profiler.wants(path) else None
+
+    def call_profiled(
+        self,
+        command: Command,
+        callstack: Sequence[Command],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        profiling = self.profiler_for(command, callstack)
+        if profiling is None:
+            return command(*args, engine=self, **kwargs)
+        profiler, path = profiling
+        return profiler.run(path, command, *args, engine=self, **kwargs)
+
+    def instrument(self, metrics: Optional[Metrics] = None) -> Metrics:
+        """
+        Starts recording metrics for commands invoked through the engine and returns them.
+        Set `engine.metrics` back to None to stop.
+        """
+        if metrics is None:
+            metrics = self.metrics if isinstance(self.metrics, Metrics) else Metrics()
+        self.metrics = metrics
+        return metrics
 
-        return self.parse(
-            command_list=command_list[1:], _command=command, _callstack=_callstack
+    def record_invocation(
+        self,
+        marks: list[float],
+        command: Optional[Command],
+        callstack: Sequence[Command],
+        error: bool,
+    ) -> None:
+        """
+        Records an invocation in the engine's metrics.
+        `marks` holds the times it started, was tokenized and was resolved, as far as it got.
+        """
+        if self.metrics is None:
+            return
+        now = perf_counter()
+        marks = [*marks, now, now][:3]
+        self.metrics.record(
+            command_path(callstack) if command is not None else UNRESOLVED,
+            parse=marks[1] - marks[0],
+            resolve=marks[2] - marks[1],
+            execute=now - marks[2] if command is not None else None,
+            error=error,
         )
 
     def command(
@@ -248,3 +1341,33 @@ class InvokeEngine:
         return create_command(
             func=func, commanddict=self.commands, name=name, aliases=aliases
         )
+
+    def lazy_command(
+        self,
+        source: str,
+        name: Optional[str] = None,
+        aliases: Optional[list[str]] = None,
+        helptext: Optional[str] = None,
+    ) -> Command:
+        """
+        Registers a command whose module is only imported the first time `parse` resolves to it.
+        `source` is the "module:attribute" path of its function; the name defaults to the attribute.
+        """
+        return create_lazy_command(source, self.commands, name, aliases, helptext)
+
+    def register_manifest(self, manifest: Iterable[Mapping[str, Any]]) -> list[Command]:
+        """
+        Registers lazy commands from a manifest, such as a parsed JSON file: a list of
+        `{"name", "source", "aliases", "help", "requires", "coercion", "execution", "children"}` entries,
+        where only `source` is required and `children` is a list of entries for subcommands.
+        """
+        return register_entries(manifest, self.commands)
+
+    def register_entry_points(self, group: str = "invokify.commands") -> list[Command]:
+        """Registers a lazy command for every entry point in `group`, named after the entry point."""
+        import importlib.metadata  # Slow to import, and only needed here.
+
+        return [
+            self.lazy_command(entry_point.value, entry_point.name)
+            for entry_point in importlib.metadata.entry_points(group=group)
+        ]
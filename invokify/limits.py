@@ -0,0 +1,159 @@
+"""
+Limits
+
+Cooldowns and rate limits for commands, declared with `meta.cooldown` and `meta.rate_limit`
+and checked before the command's function runs.
+
+Limits are token buckets tracked with the generic cell rate algorithm, which keeps a single
+timestamp per command and caller. Timestamps in the past mean a full bucket, so they are
+evicted as time passes and idle callers take no memory.
+"""
+__all__ = ["RateLimited", "Limit", "LimitStore", "MemoryStore"]
+
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Callable, Hashable, Mapping, Optional
+
+
+class RateLimited(Exception):
+    """Will be raised when a command is called more often than its limits allow."""
+
+    def __init__(self, command: str, retry_after: float) -> None:
+        super().__init__(f"{command!r} is rate limited, try again in {retry_after:.2f} seconds.")
+        self.command = command
+        self.retry_after = retry_after  # Seconds until the call would be allowed.
+
+
+class LimitStore(ABC):
+    """
+    Where the state of limits is kept. Subclass it to share limits between processes,
+    such as with a key-value store that can run `acquire` atomically.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def acquire(self, key: Hashable, interval: float, tolerance: float) -> float:
+        """
+        Counts a call for `key` and returns 0 if it's allowed, otherwise the seconds until it will be.
+        Calls are spaced `interval` seconds apart, with bursts of up to `tolerance` seconds worth of calls.
+        """
+
+    @abstractmethod
+    def refund(self, key: Hashable, interval: float) -> None:
+        """Takes back a call `acquire` allowed, such as when another limit of the command rejected it."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forgets every limit's calls."""
+
+
+@dataclass(slots=True)
+class MemoryStore(LimitStore):
+    """
+    Keeps the state of limits in the process, which is the default.
+    Engines sharing a store share its limits, so one store can stand in for a shared backend in tests.
+    """
+
+    maxsize: Optional[int] = None  # The most keys to keep; the oldest are dropped beyond it, letting them through.
+    clock: Callable[[], float] = monotonic
+    entries: dict[Hashable, float] = field(
+        default_factory=dict, init=False, repr=False
+    )  # When every key's bucket is full again.
+    sweep_at: int = field(default=1024, init=False, repr=False)  # The amount of keys that triggers eviction.
+    lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.sweep(0.0)
+
+    def acquire(self, key: Hashable, interval: float, tolerance: float) -> float:
+        with self.lock:
+            now = self.clock()
+            # Moved to the end on every use, so `sweep` drops the least recently used keys.
+            last = self.entries.pop(key, now)
+            full = max(last, now)
+            wait = full - tolerance - now
+            if wait > 0:
+                self.entries[key] = last
+                return wait
+            self.entries[key] = full + interval
+            if len(self.entries) >= self.sweep_at:
+                self.sweep(now)
+            return 0.0
+
+    def refund(self, key: Hashable, interval: float) -> None:
+        with self.lock:
+            full = self.entries.get(key)
+            if full is not None:
+                self.entries[key] = full - interval
+
+    def sweep(self, now: float) -> None:
+        """
+        Drops the keys whose buckets are full again and, past `maxsize`, the least recently used ones down to three quarters of it.
+        Runs once the amount of keys doubled since the last sweep (or reached `maxsize`), so it's amortized over those calls.
+        """
+        entries = {key: full for key, full in self.entries.items() if full > now}
+        if self.maxsize is not None and len(entries) >= self.maxsize:
+            keys = list(entries)[len(entries) - self.maxsize * 3 // 4 :]
+            entries = {key: entries[key] for key in keys}
+        self.entries = entries
+        self.sweep_at = max(1024, 2 * len(entries))
+        if self.maxsize is not None:
+            self.sweep_at = min(self.sweep_at, self.maxsize + 1)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.sweep(0.0)
+
+
+DEFAULT_STORE = MemoryStore()
+LIMIT_IDS = itertools.count()  # Numbers the buckets of unnamed limits.
+
+
+@dataclass(slots=True, frozen=True)
+class Limit:
+    """Allows `calls` calls every `per` seconds, per value of the `key` keyword argument."""
+
+    calls: int
+    per: float
+    key: Optional[str] = None  # The keyword argument identifying the caller, such as "user". None limits all callers together.
+    name: Optional[str] = None  # Limits with the same name and store share their state. None gives the limit its own.
+    store: LimitStore = field(default_factory=lambda: DEFAULT_STORE, compare=False)
+    bucket: str = field(init=False)  # Identifies the limit in its store.
+
+    def __post_init__(self) -> None:
+        if self.calls < 1 or self.per <= 0:
+            raise ValueError("Limits need at least one call in a positive amount of seconds.")
+        bucket = self.name if self.name is not None else f"#{next(LIMIT_IDS)}"
+        object.__setattr__(self, "bucket", bucket)
+
+    def check(self, command: str, kwargs: Mapping[str, Any]) -> None:
+        """Counts a call, raising `RateLimited` if it's over the limit."""
+        interval = self.per / self.calls
+        caller = kwargs.get(self.key) if self.key is not None else None
+        wait = self.store.acquire((self.bucket, caller), interval, self.per - interval)
+        if wait:
+            raise RateLimited(command, wait)
+
+    def refund(self, kwargs: Mapping[str, Any]) -> None:
+        """Takes back a call `check` counted."""
+        caller = kwargs.get(self.key) if self.key is not None else None
+        self.store.refund((self.bucket, caller), self.per / self.calls)
+
+
+def check_limits(command: str, limits: tuple[Limit, ...], kwargs: Mapping[str, Any]) -> None:
+    """
+    Counts a call against every limit, raising `RateLimited` if one is over it.
+    The limits that counted it before are refunded then, so a rejected call doesn't count against the others.
+    """
+    for position, limit in enumerate(limits):
+        try:
+            limit.check(command, kwargs)
+        except RateLimited:
+            for counted in limits[:position]:
+                counted.refund(kwargs)
+            raise
@@ -0,0 +1,143 @@
+"""
+Manifests
+
+Exports an engine's command tree, with the import path of every function, so new processes
+can rebuild it from a JSON or binary file as lazy commands instead of importing and decorating everything.
+"""
+__all__ = ["ManifestError", "export_manifest", "write_manifest", "read_manifest", "load_manifest"]
+
+import json
+import marshal
+import mmap
+import os
+from typing import Any, Mapping, Optional, Union
+
+from invokify.invokify import Command, InvokeEngine
+
+MANIFEST_VERSION = 1
+MAGIC = b"INVOKIFY"  # Starts binary manifests, followed by a version byte and marshalled data.
+
+
+class ManifestError(ValueError):
+    """
+    Will be raised when a command can't be exported, such as one defined inside a function,
+    or when a manifest can't be read.
+    """
+
+
+def source_of(command: Command) -> str:
+    if command.source is not None:
+        return command.source
+    module = getattr(command.func, "__module__", None)
+    qualname = getattr(command.func, "__qualname__", "")
+    if not module or module == "__main__" or "<" in qualname:
+        raise ManifestError(f"{command.name!r} can't be exported, its function has no import path.")
+    return f"{module}:{qualname}"
+
+
+def export_entries(commands: Mapping[str, Command], sources: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    The manifest entries of a level of the command tree. `sources` has the function of every import path
+    found so far, so two functions with the same path, such as two subcommands named `all`
+    defined in one module, raise `ManifestError` instead of loading the same function.
+    """
+    names: dict[int, list[str]] = {}
+    unique: list[Command] = []
+    for name, command in commands.items():
+        if id(command) not in names:
+            names[id(command)] = []
+            unique.append(command)
+        names[id(command)].append(name)
+
+    entries = []
+    for command in unique:
+        aliases = names[id(command)]
+        name = command.name if command.name in aliases else aliases[0]
+        source = source_of(command)
+        if command.source is None and sources.setdefault(source, command.func) is not command.func:
+            raise ManifestError(
+                f"{command.name!r} can't be exported, another function has the same import path {source!r}."
+            )
+        entry: dict[str, Any] = {"name": name, "source": source}
+        if len(aliases) > 1:
+            entry["aliases"] = [alias for alias in aliases if alias != name]
+        if command.helptext:
+            entry["help"] = command.helptext
+        if any(command.requires.values()):
+            entry["requires"] = dict(command.requires)
+        if command.coercion:
+            entry["coercion"] = True
+        if command.execution != "inline":
+            entry["execution"] = command.execution
+        if command.children:
+            entry["children"] = export_entries(command.children, sources)
+        entries.append(entry)
+    return entries
+
+
+def export_manifest(engine: InvokeEngine) -> dict[str, Any]:
+    """
+    Exports an engine's command tree as plain data, which `load_manifest` turns back into an engine.
+    Injections aren't exported, they're set when a command's module is imported.
+    """
+    return {
+        "version": MANIFEST_VERSION,
+        "frozen": engine.frozen,
+        "prefix_matching": engine.prefix_matching,
+        "commands": export_entries(engine.commands, {}),
+    }
+
+
+def write_manifest(engine: InvokeEngine, path: Union[str, os.PathLike[str]]) -> None:
+    """
+    Writes an engine's manifest to a file, as JSON if its name ends with ".json"
+    and otherwise in a compact binary format, which only the same Python version can read.
+    """
+    manifest = export_manifest(engine)
+    if os.fspath(path).endswith(".json"):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, separators=(",", ":"))
+        return
+    with open(path, "wb") as file:
+        file.write(MAGIC + bytes([MANIFEST_VERSION]) + marshal.dumps(manifest))
+
+
+def read_manifest(path: Union[str, os.PathLike[str]]) -> dict[str, Any]:
+    """Reads a manifest written by `write_manifest`. Binary manifests are read through a memory map."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            file.seek(0)
+            manifest = json.load(file)
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if mapped[len(MAGIC)] != MANIFEST_VERSION:
+                    raise ManifestError(f"Unsupported manifest version {mapped[len(MAGIC)]}.")
+                try:
+                    with memoryview(mapped)[len(MAGIC) + 1 :] as data:
+                        manifest = marshal.loads(data)
+                except (EOFError, ValueError, TypeError) as error:
+                    raise ManifestError(f"Cannot read the manifest {os.fspath(path)!r}.") from error
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        raise ManifestError(f"Unsupported manifest {os.fspath(path)!r}.")
+    return manifest
+
+
+def load_manifest(
+    manifest: Union[Mapping[str, Any], str, os.PathLike[str]],
+    engine: Optional[InvokeEngine] = None,
+) -> InvokeEngine:
+    """
+    Registers the commands of a manifest, or of the manifest file at a path, as lazy commands
+    on `engine` or a new engine. Engines that were frozen when exported are frozen again.
+
+    For fork-based process pools, load the manifest before the pool starts so workers inherit the engine.
+    """
+    if not isinstance(manifest, Mapping):
+        manifest = read_manifest(manifest)
+    if engine is None:
+        engine = InvokeEngine()
+    engine.prefix_matching = engine.prefix_matching or manifest.get("prefix_matching", False)
+    engine.register_manifest(manifest["commands"])
+    if manifest.get("frozen"):
+        engine.freeze()
+    return engine
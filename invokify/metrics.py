@@ -0,0 +1,166 @@
+"""
+Metrics
+
+Opt-in call counts, error counts and latency histograms per command path,
+split into parse (tokenizing), resolve (`engine.parse`) and execute time.
+"""
+__all__ = ["DEFAULT_BUCKETS", "PHASES", "UNRESOLVED", "Histogram", "CommandMetrics", "Metrics"]
+
+import bisect
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+DEFAULT_BUCKETS = (
+    0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005,
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)  # fmt: skip
+
+PHASES = ("parse", "resolve", "execute")
+
+UNRESOLVED = "<unresolved>"  # The path recorded for input that didn't resolve to a command.
+
+
+@dataclass(slots=True)
+class Histogram:
+    """A latency histogram in seconds, with one count per bucket and one for anything larger."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> list[int]:
+        """The counts of every bucket including the ones below it, the last being +Inf."""
+        counts = []
+        running = 0
+        for count in self.counts:
+            running += count
+            counts.append(running)
+        return counts
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": self.total,
+            "count": self.count,
+        }
+
+
+@dataclass(slots=True)
+class CommandMetrics:
+    """The metrics of a single command path."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    calls: int = 0
+    errors: int = 0
+    parse: Histogram = field(init=False)
+    resolve: Histogram = field(init=False)
+    execute: Histogram = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.parse = Histogram(self.buckets)
+        self.resolve = Histogram(self.buckets)
+        self.execute = Histogram(self.buckets)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "parse": self.parse.snapshot(),
+            "resolve": self.resolve.snapshot(),
+            "execute": self.execute.snapshot(),
+        }
+
+
+@dataclass(slots=True)
+class Metrics:
+    """
+    Collects metrics for an engine, keyed by command path ("buy all").
+    Enable it with `engine.instrument()`; engines without metrics skip all timing.
+
+    Anything with the same `record` method can be used as an engine's metrics instead.
+    """
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    commands: dict[str, CommandMetrics] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(
+        self,
+        path: str,
+        parse: float,
+        resolve: float,
+        execute: Optional[float],
+        error: bool,
+    ) -> None:
+        """
+        Records one invocation. `execute` is None when the command never ran,
+        such as when the input didn't resolve.
+        """
+        with self.lock:
+            metrics = self.commands.get(path)
+            if metrics is None:
+                metrics = self.commands[path] = CommandMetrics(self.buckets)
+            metrics.calls += 1
+            if error:
+                metrics.errors += 1
+            metrics.parse.observe(parse)
+            metrics.resolve.observe(resolve)
+            if execute is not None:
+                metrics.execute.observe(execute)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.commands.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Returns a copy of every command's metrics as plain dicts."""
+        with self.lock:
+            return {path: metrics.snapshot() for path, metrics in self.commands.items()}
+
+    def prometheus(self, prefix: str = "invokify") -> str:
+        """Exports the metrics in the Prometheus text format."""
+        with self.lock:
+            commands = list(self.commands.items())
+
+        lines = [
+            f"# HELP {prefix}_command_calls_total Commands invoked through the engine.",
+            f"# TYPE {prefix}_command_calls_total counter",
+        ]
+        lines.extend(
+            f'{prefix}_command_calls_total{{command="{escape(path)}"}} {metrics.calls}'
+            for path, metrics in commands
+        )
+        lines.append(f"# HELP {prefix}_command_errors_total Invocations that raised.")
+        lines.append(f"# TYPE {prefix}_command_errors_total counter")
+        lines.extend(
+            f'{prefix}_command_errors_total{{command="{escape(path)}"}} {metrics.errors}'
+            for path, metrics in commands
+        )
+        lines.append(f"# HELP {prefix}_command_seconds Time spent per invocation phase.")
+        lines.append(f"# TYPE {prefix}_command_seconds histogram")
+        for path, metrics in commands:
+            for phase in PHASES:
+                histogram: Histogram = getattr(metrics, phase)
+                labels = f'command="{escape(path)}",phase="{phase}"'
+                bounds: Iterable[str] = [*map(repr, histogram.buckets), "+Inf"]
+                for bound, count in zip(bounds, histogram.cumulative()):
+                    lines.append(f'{prefix}_command_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{prefix}_command_seconds_sum{{{labels}}} {histogram.total!r}")
+                lines.append(f"{prefix}_command_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
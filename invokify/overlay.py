@@ -0,0 +1,180 @@
+"""
+Overlay
+
+Lets engines share one command tree, such as a base set of commands that thousands of tenants
+change slightly. An overlay only stores the names it changes; other names are looked up in its base
+and remembered until the overlay or its base changes, so an overlay costs memory for the names
+it changes and uses, not for every name of its base. See `InvokeEngine.overlay`.
+"""
+__all__ = ["CommandLayer", "CommandOverlay"]
+
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Mapping, Optional
+
+if TYPE_CHECKING:
+    from invokify.invokify import Command
+
+
+class CommandLayer(dict[str, "Command"]):
+    """
+    The commands of an engine or the subcommands of a command, which counts its changes
+    so overlays and name indexes can notice them.
+    """
+
+    __slots__ = ("changes",)
+
+    def __init__(self, commands: Iterable[Any] = ()) -> None:
+        dict.__init__(self, commands)
+        self.changes = 0
+
+    @property
+    def version(self) -> int:
+        """Grows with every change, such as for noticing that an index of the names is stale."""
+        return self.changes
+
+    def __reduce__(self) -> Any:
+        return CommandLayer, (dict(self.items()),)
+
+    def __setitem__(self, name: str, command: "Command") -> None:
+        dict.__setitem__(self, name, command)
+        self.changes += 1
+
+    def __delitem__(self, name: str) -> None:
+        dict.__delitem__(self, name)
+        self.changes += 1
+
+    def setdefault(self, name: str, command: "Command") -> "Command":  # type: ignore[override]
+        if name not in self:
+            self[name] = command
+        return self[name]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for name, command in dict(*args, **kwargs).items():
+            self[name] = command
+
+    def pop(self, name: str, *default: Any) -> Any:
+        if name not in self:
+            return dict.pop(self, name, *default)
+        command = self[name]
+        del self[name]
+        return command
+
+    def popitem(self) -> tuple[str, "Command"]:
+        for name in reversed(self):
+            return name, self.pop(name)
+        raise KeyError("popitem(): no commands")
+
+    def clear(self) -> None:
+        for name in list(self):
+            del self[name]
+
+
+class CommandOverlay(CommandLayer):
+    """
+    The commands of an overlay engine: every command of its base, except for the names it hides,
+    and its own commands, which take precedence.
+    Registering or removing commands only changes the overlay, the base's commands are never touched.
+
+    The dict itself only remembers the names that were looked up, every other method goes through
+    the overlay and its base.
+    """
+
+    __slots__ = ("base", "own", "hidden", "seen")
+
+    def __init__(self, base: Mapping[str, "Command"]) -> None:
+        CommandLayer.__init__(self)
+        self.base = base
+        self.own: dict[str, "Command"] = {}  # Commands registered on the overlay, by name.
+        self.hidden: set[str] = set()  # Names of the base that were removed from the overlay.
+        self.seen = self.version  # The version the remembered names belong to.
+
+    @property
+    def version(self) -> int:
+        """Grows with every change of the overlay or of its base."""
+        if isinstance(self.base, CommandLayer):
+            return self.changes + self.base.version
+        return self.changes
+
+    def lookup(self, name: str) -> Optional["Command"]:
+        command = self.own.get(name)
+        if command is None and name not in self.hidden:
+            command = self.base.get(name)
+        return command
+
+    def get(self, name: str, default: Any = None) -> Any:
+        version = self.version
+        if self.seen != version:
+            dict.clear(self)
+            self.seen = version
+        command = dict.get(self, name)
+        if command is None:
+            command = self.lookup(name)
+            if command is None:
+                return default
+            dict.__setitem__(self, name, command)
+        return command
+
+    def __getitem__(self, name: str) -> "Command":
+        command = self.get(name)
+        if command is None:
+            raise KeyError(name)
+        return command
+
+    def __contains__(self, name: object) -> bool:
+        return self.get(name) is not None  # type: ignore[arg-type]
+
+    def items(self) -> Iterator[tuple[str, "Command"]]:  # type: ignore[override]
+        """The names and commands, without remembering them."""
+        own, hidden = self.own, self.hidden
+        for name, command in self.base.items():
+            if name not in hidden:
+                yield name, own.get(name, command)
+        for name, command in own.items():
+            if name not in self.base:
+                yield name, command
+
+    def keys(self) -> Iterator[str]:  # type: ignore[override]
+        return iter(self)
+
+    def values(self) -> Iterator["Command"]:  # type: ignore[override]
+        return (command for _, command in self.items())
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self.items())
+
+    def __reversed__(self) -> Iterator[str]:
+        return reversed(list(self))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+    def __bool__(self) -> bool:
+        return next(self.items(), None) is not None
+
+    def __eq__(self, other: object) -> bool:
+        return dict(self.items()) == other
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def copy(self) -> dict[str, "Command"]:
+        return dict(self.items())
+
+    def __setitem__(self, name: str, command: "Command") -> None:
+        self.own[name] = command
+        self.hidden.discard(name)
+        self.changes += 1
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+        self.own.pop(name, None)
+        if name in self.base:
+            self.hidden.add(name)
+        self.changes += 1
+
+    def restore(self, *names: str) -> None:
+        """Drops the overlay's own commands and hidden names, so the base's commands show through again."""
+        for name in names:
+            self.own.pop(name, None)
+            self.hidden.discard(name)
+        self.changes += 1
@@ -1,8 +1,32 @@
-from typing import Any
-from tokenstream import Token, TokenStream
+"""
+Parser
+
+Turns a string into a list of arguments that can be passed to `InvokeEngine.parse`.
+
+The default backend is a single-pass scanner that dispatches on the current
+character and only uses patterns compiled once at import time.
+The original `tokenstream` pipeline is kept as an optional backend.
+"""
+__all__ = ["InvalidArgumentSyntax", "ArgParser", "CacheInfo", "StringView", "string_to_args", "BACKENDS"]
+
 import re
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
+
+try:
+    from tokenstream import Token, TokenStream
+except ImportError:  # pragma: no cover - tokenstream is an optional dependency
+    Token = TokenStream = None  # type: ignore
+
+
+class InvalidArgumentSyntax(ValueError):
+    """
+    Will be raised when a string cannot be turned into arguments,
+    such as an unclosed list or an unknown escape sequence.
+    """
 
-__all__ = ["string_to_args"]
 
 ESCAPE_REGEX = re.compile(r"\\.")
 
@@ -12,12 +36,255 @@ ESCAPE_SEQUENCES = {
     r"\\": "\\",
 }
 
+# Patterns used by the native scanner. They mirror the token rules of the
+# tokenstream backend so both backends agree on every input.
+DECIMAL = r"-?\d*\.\d+|-?\d+\.\d*"
+TOP_NUMBER_REGEX = re.compile(rf"({DECIMAL})|(-?\d+)")
+LIST_NUMBER_REGEX = re.compile(rf"({DECIMAL})|(\d+)")
+WORD_REGEX = re.compile(r'[^"\[\]\s]+')
+ENTRY_REGEX = re.compile(r'[^"\[\],]+')
+STRING_REGEX = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+COMMA_REGEX = re.compile(r",\s*")
+LIST_END_REGEX = re.compile(r"(?:[ \t\n]|\r\n)*\]")
+NUMBERS_REGEX = re.compile(r"\[([-.,\d\s]*)")  # The span a list of only numbers can take up.
+# The items of a chunk of a list the native scanner reads as ints only, or as floats only.
+INTEGER_ITEMS_REGEX = re.compile(r"\s*\d+(?:,\s*\d+)*")
+DECIMAL_ITEMS_REGEX = re.compile(rf"\s*(?:{DECIMAL})(?:,\s*(?:{DECIMAL}))*")
+
+ARRAY_THRESHOLD = 64  # The fewest numbers in a list the views backend returns as an array.
+ARRAY_CHUNK = 65536  # The characters of a list converted at once.
+VIEW_THRESHOLD = 1024  # The shortest quoted string the views backend returns as a `StringView`.
+
+
+class StringView:
+    """
+    A quoted string of the input, returned by the views backend instead of copying it out.
+    `str(view)` copies it, and comparisons, hashing and indexing work like they do on the string.
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source: str, start: int, end: int) -> None:
+        self.source = source  # The whole input.
+        self.start = start
+        self.end = end
+
+    def __str__(self) -> str:
+        return self.source[self.start : self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __getitem__(self, key: Any) -> str:
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("StringView index out of range")
+            return self.source[self.start + key]
+        return str(self)[key]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, StringView)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f"StringView({len(self)} characters)"
+
+    def encode(self, encoding: str = "utf-8", errors: str = "strict") -> bytes:
+        return str(self).encode(encoding, errors)
+
+
+def scan_numbers(string: str, pos: int) -> Optional[tuple[Any, int]]:
+    """
+    Reads the list starting at `pos` if it only holds numbers of one type, returning it as an array
+    once it has `ARRAY_THRESHOLD` of them, or None if it's another kind of list.
+    """
+    match = NUMBERS_REGEX.match(string, pos)
+    if match is None:
+        return None
+    start, stop = match.span(1)
+    while stop > start and string[stop - 1].isspace():
+        stop -= 1
+    closing = LIST_END_REGEX.match(string, stop)
+    if closing is None or start == stop or string[start].isspace() or string[stop - 1] == ",":
+        return None
+
+    # Validated in chunks too, since matching a repeated group keeps state for every item.
+    chunks = []
+    while start < stop:
+        cut = string.find(",", min(start + ARRAY_CHUNK, stop), stop)
+        if cut == -1:
+            cut = stop
+        chunks.append((start, cut))
+        start = cut + 1
+    begin, end = chunks[0]
+    items = INTEGER_ITEMS_REGEX
+    convert: Callable[[str], Any] = int
+    typecode = "q"
+    if not items.fullmatch(string, begin, end):
+        items = DECIMAL_ITEMS_REGEX
+        convert = float
+        typecode = "d"
+        if not items.fullmatch(string, begin, end):
+            return None
+    if not all(items.fullmatch(string, first, last) for first, last in chunks[1:]):
+        return None
+
+    if string.count(",", begin, stop) + 1 < ARRAY_THRESHOLD:
+        return list(map(convert, string[begin:stop].split(","))), closing.end()
+    numbers = array(typecode)
+    try:
+        for first, last in chunks:  # So only a few of the number strings exist at once.
+            numbers.extend(map(convert, string[first:last].split(",")))
+    except OverflowError:  # Ints beyond 64 bits stay a list.
+        return list(map(convert, string[begin:stop].split(","))), closing.end()
+    return numbers, closing.end()
+
+
+def unquote(value: str) -> str:
+    """Strips the quotes from a string literal and resolves its escape sequences."""
+    if "\\" not in value:
+        return value[1:-1]
+    try:
+        return ESCAPE_REGEX.sub(
+            lambda match: ESCAPE_SEQUENCES[match[0]], value[1:-1]
+        )
+    except KeyError as error:
+        raise InvalidArgumentSyntax(
+            f"Unknown escape sequence {error.args[0]!r} in {value}."
+        ) from None
+
+
+def scan_list(string: str, pos: int, nested: bool) -> tuple[list[Any], int]:
+    """
+    Scans the items of a list whose opening brace ends right before `pos`.
+
+    Top-level lists look for their closing brace past whitespace,
+    nested lists look for it past commas.
+    """
+    items: list[Any] = []
+    end = len(string)
+    while True:
+        peek = pos
+        if nested:
+            while peek < end and string[peek] == ",":
+                peek = COMMA_REGEX.match(string, peek).end()  # type: ignore
+        else:
+            while peek < end:
+                char = string[peek]
+                if char == " " or char == "\t" or char == "\n":
+                    peek += 1
+                elif char == "\r" and string.startswith("\n", peek + 1):
+                    peek += 2
+                else:
+                    break
+
+        if peek >= end:
+            raise InvalidArgumentSyntax("Expected ']' but reached end of input.")
+        if string[peek] == "]":
+            return items, peek + 1
+
+        while pos < end and string[pos] == ",":
+            pos = COMMA_REGEX.match(string, pos).end()  # type: ignore
+        if pos >= end:
+            raise InvalidArgumentSyntax("Expected a list item but reached end of input.")
+
+        item: Any
+        char = string[pos]
+        if char == "[":
+            item, pos = scan_list(string, pos + 1, True)
+        elif char == '"':
+            match = STRING_REGEX.match(string, pos)
+            if match is None:
+                raise InvalidArgumentSyntax(f"Unterminated string at position {pos}.")
+            item = unquote(match[0])
+            pos = match.end()
+        elif char == "]":
+            raise InvalidArgumentSyntax(f"Expected a list item at position {pos}.")
+        else:
+            match = LIST_NUMBER_REGEX.match(string, pos)
+            if match is None:
+                match = ENTRY_REGEX.match(string, pos)
+                item = match[0]  # type: ignore
+            elif match.lastindex == 1:
+                item = float(match[0])
+            else:
+                item = int(match[0])
+            pos = match.end()  # type: ignore
+        items.append(item)
 
-def unquote_string(token: Token) -> str:
+
+def scan(
+    string: str, operators: Optional[Mapping[str, Any]] = None, views: bool = False
+) -> list[Any]:
+    """
+    The native backend.
+
+    Scanning stops silently at a stray closing brace or at a token that
+    cannot be read, keeping everything before it.
+    Unquoted words found in `operators` are replaced with their value, see `string_to_chain`.
+    `views` returns large lists of numbers as arrays and large strings as views, see `scan_views`.
+    """
+    args: list[Any] = []
+    pos = 0
+    end = len(string)
+    while pos < end:
+        char = string[pos]
+        if char == " " or char == "\t" or char == "\n":
+            pos += 1
+            continue
+        if char == "\r":
+            if not string.startswith("\n", pos + 1):
+                break
+            pos += 2
+            continue
+
+        value: Any
+        if char == "[":
+            numbers = scan_numbers(string, pos) if views else None
+            if numbers is None:
+                value, pos = scan_list(string, pos + 1, False)
+            else:
+                value, pos = numbers
+        elif char == '"':
+            match = STRING_REGEX.match(string, pos)
+            if match is None:
+                break
+            start, pos = match.span()
+            if views and pos - start - 2 >= VIEW_THRESHOLD and string.find("\\", start, pos) == -1:
+                value = StringView(string, start + 1, pos - 1)
+            else:
+                value = unquote(match[0])
+        elif char == "]":
+            break
+        else:
+            match = TOP_NUMBER_REGEX.match(string, pos)
+            if match is None:
+                match = WORD_REGEX.match(string, pos)
+                if match is None:
+                    break
+                value = match[0]
+                if operators is not None and value in operators:
+                    value = operators[value]
+            elif match.lastindex == 1:
+                value = float(match[0])
+            else:
+                value = int(match[0])
+            pos = match.end()
+        args.append(value)
+    return args
+
+
+def unquote_string(token: "Token") -> str:
     return ESCAPE_REGEX.sub(lambda match: ESCAPE_SEQUENCES[match[0]], token.value[1:-1])
 
 
-def parse_list(stream: TokenStream) -> list[Any] | int | float | str | None:
+def parse_list(stream: "TokenStream") -> list[Any] | int | float | str | None:
     with stream.syntax(
         comma=r",\s*",
         decimal=r"-?\d*\.\d+|-?\d+\.\d*",
@@ -41,7 +308,7 @@ def parse_list(stream: TokenStream) -> list[Any] | int | float | str | None:
                 return None
 
 
-def parse_token(token: Token, stream: TokenStream):
+def parse_token(token: "Token", stream: "TokenStream"):
     match token:
         case Token(type="brace"):
             return [(parse_list(stream)) for _ in stream.peek_until(("brace", "]"))]
@@ -57,7 +324,13 @@ def parse_token(token: Token, stream: TokenStream):
             return None
 
 
-def string_to_args(string: str):
+def tokenstream_to_args(string: str) -> list[Any]:
+    """The tokenstream backend. Requires the optional `tokenstream` package."""
+    if TokenStream is None:
+        raise ImportError(
+            "The tokenstream backend requires the tokenstream package: "
+            "pip install invokify[tokenstream]"
+        )
     stream = TokenStream(string)
     with stream.syntax(
         brace=r"\[|\]",
@@ -72,3 +345,127 @@ def string_to_args(string: str):
                 ("brace", "["), "integer", "decimal", "word", "string"
             )
         ]
+
+
+def scan_views(string: str) -> list[Any]:
+    """
+    The views backend, the native backend for huge arguments.
+    Top-level lists of at least `ARRAY_THRESHOLD` ints or decimals become `array.array`s,
+    and quoted strings of at least `VIEW_THRESHOLD` characters without escape sequences become `StringView`s.
+    """
+    return scan(string, None, True)
+
+
+BACKENDS: dict[str, Callable[[str], list[Any]]] = {
+    "native": scan,
+    "views": scan_views,
+    "tokenstream": tokenstream_to_args,
+}
+
+
+def get_backend(backend: str) -> Callable[[str], list[Any]]:
+    parser = BACKENDS.get(backend)
+    if parser is None:
+        raise ValueError(f"Unknown parser backend {backend!r}.")
+    return parser
+
+
+def string_to_args(string: str, backend: str = "native") -> list[Any]:
+    """
+    Turns a string into a list of arguments.
+    Words are kept as strings, numbers are converted and quoted strings and lists are kept intact.
+    """
+    return get_backend(backend)(string)
+
+
+def freeze(args: list[Any]) -> tuple[Any, ...]:
+    """Recursively turns parsed lists into tuples, and arrays into read-only memoryviews."""
+    return tuple(
+        freeze(arg) if isinstance(arg, list) else memoryview(arg).toreadonly() if isinstance(arg, array) else arg
+        for arg in args
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class CacheInfo:
+    """A snapshot of the counters of an `ArgParser` cache or a `ResultCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: Optional[int]
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups that were served from the cache, 0 before the first one."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(slots=True)
+class ArgParser:
+    """
+    A reusable parser with an optional bounded LRU cache keyed by the input string.
+
+    Results are always tuples (nested lists become tuples too),
+    so callers can't corrupt cached entries.
+    """
+
+    backend: str = "native"
+    cache_size: Optional[int] = None  # The maximum amount of cached inputs. None disables the cache.
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    _parser: Callable[[str], list[Any]] = field(init=False, repr=False)
+    _cache: "OrderedDict[str, tuple[Any, ...]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.cache_size is not None and self.cache_size < 0:
+            raise ValueError("cache_size cannot be negative.")
+        self._parser = get_backend(self.backend)
+
+    def parse(self, string: str) -> tuple[Any, ...]:
+        """Turns a string into a tuple of arguments, reusing a cached result when possible."""
+        if not self.cache_size:
+            return freeze(self._parser(string))
+
+        cache = self._cache
+        result = cache.get(string)
+        if result is not None:
+            self.hits += 1
+            try:
+                cache.move_to_end(string)
+            except KeyError:  # Evicted by another thread in the meantime.
+                pass
+            return result
+
+        self.misses += 1
+        result = freeze(self._parser(string))
+        cache[string] = result
+        if len(cache) > self.cache_size:
+            try:
+                cache.popitem(last=False)
+                self.evictions += 1
+            except KeyError:
+                pass
+        return result
+
+    __call__ = parse
+
+    def cache_info(self) -> CacheInfo:
+        """Returns the current cache counters."""
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._cache),
+            maxsize=self.cache_size,
+        )
+
+    def cache_clear(self) -> None:
+        """Empties the cache and resets its counters."""
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
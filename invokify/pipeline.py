@@ -0,0 +1,75 @@
+"""
+Pipeline
+
+Chains several commands in one input, such as "buy 10 && sell 5 | log".
+`&&` runs the next command once the previous one returned, and `|` also passes
+the previous command's result to the next one as its last argument.
+Chains are resolved once into a `Chain` and then run in a loop, see `InvokeEngine.invoke_chain`.
+"""
+__all__ = ["Operator", "AND", "PIPE", "Link", "Chain", "string_to_chain", "split_chain"]
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from invokify.parser import InvalidArgumentSyntax, scan
+
+if TYPE_CHECKING:
+    from invokify.invokify import Command
+
+
+class Operator(str):
+    """An operator between two commands of a chain, which is never passed to a command."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return f"Operator({str(self)!r})"
+
+
+AND = Operator("&&")
+PIPE = Operator("|")
+OPERATORS: dict[str, Operator] = {AND: AND, PIPE: PIPE}
+
+
+@dataclass(slots=True)
+class Link:
+    """A resolved command of a chain."""
+
+    operator: Optional[Operator]  # The operator before the command, None for the first one.
+    command: "Command"
+    args: tuple[Any, ...]
+    callstack: tuple["Command", ...]
+
+
+@dataclass(slots=True, frozen=True)
+class Chain:
+    """The resolved commands of a chain, which can be run any number of times."""
+
+    links: tuple[Link, ...]
+
+
+def string_to_chain(string: str) -> list[Any]:
+    """
+    Turns a string into a list of arguments like `string_to_args`,
+    where unquoted "&&" and "|" words become `AND` and `PIPE`.
+    Operators must be separated from their commands by whitespace, and quoted ones stay arguments.
+    """
+    return scan(string, OPERATORS)
+
+
+def split_chain(command_list: Sequence[Any]) -> list[tuple[Optional[Operator], Sequence[Any]]]:
+    """Splits arguments at their operators, into the operator before every command and its words."""
+    segments: list[tuple[Optional[Operator], Sequence[Any]]] = []
+    operator = None
+    start = 0
+    for position, arg in enumerate(command_list):
+        if type(arg) is Operator:
+            if position == start:
+                raise InvalidArgumentSyntax(f"Expected a command before {str(arg)!r}.")
+            segments.append((operator, command_list[start:position]))
+            operator = arg
+            start = position + 1
+    if operator is not None and start == len(command_list):
+        raise InvalidArgumentSyntax(f"Expected a command after {str(operator)!r}.")
+    segments.append((operator, command_list[start:]))
+    return segments
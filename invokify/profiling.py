@@ -0,0 +1,166 @@
+"""
+Profiling
+
+A sampling profiler for command handlers. While a profiled command runs, a background thread
+samples its stack every `interval` seconds and counts the stacks per command path,
+which can be written out in the collapsed-stack format used by flame graph tools.
+"""
+__all__ = ["Profiler"]
+
+import inspect
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import IO, Any, Callable, Optional
+
+HIDDEN_MODULES = frozenset({"invokify.invokify", "invokify.profiling"})  # Left out of sampled stacks.
+
+
+def frame_label(code: CodeType, module: str) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({module}:{code.co_firstlineno})"
+
+
+@dataclass(slots=True)
+class Profiler:
+    """
+    Samples the stacks of the commands it profiles, see `InvokeEngine.profile` and `meta.profile`.
+    Samples are taken on wall-clock time, so handlers waiting on I/O show up too.
+
+    The sampler thread starts with the first profiled command and idles while none are running.
+    Commands run in process workers are not sampled.
+    """
+
+    interval: float = 0.001  # Seconds between samples.
+    paths: Optional[frozenset[str]] = None  # The command paths to profile, including their subcommands. None is all.
+    stacks: Counter[str] = field(default_factory=Counter)  # Samples per collapsed stack.
+    samples: int = 0
+    active: dict[int, dict[FrameType, str]] = field(
+        default_factory=dict, init=False, repr=False
+    )  # The frames profiled commands run under and their paths, per thread.
+    labels: dict[CodeType, Optional[str]] = field(default_factory=dict, init=False, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    wakeup: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    stopped: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.stopped.clear()
+            self.thread = threading.Thread(
+                target=self.sample_loop, name="invokify-profiler", daemon=True
+            )
+            self.thread.start()
+
+    def stop(self) -> None:
+        """Stops the sampler thread. It starts again with the next profiled command."""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.stopped.set()
+            self.wakeup.set()
+            thread.join()
+
+    def wants(self, path: str) -> bool:
+        """Whether the command at `path` should be profiled."""
+        if self.paths is None:
+            return True
+        return any(path == wanted or path.startswith(wanted + " ") for wanted in self.paths)
+
+    def enter(self, frame: FrameType, path: str) -> None:
+        if self.thread is None:
+            self.start()
+        with self.lock:
+            self.active.setdefault(threading.get_ident(), {})[frame] = path
+        self.wakeup.set()
+
+    def exit(self, frame: FrameType) -> None:
+        thread_id = threading.get_ident()
+        with self.lock:
+            frames = self.active[thread_id]
+            del frames[frame]
+            if not frames:
+                del self.active[thread_id]
+
+    def run(self, path: str, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Calls `func`, sampling it under `path`."""
+        frame = sys._getframe()
+        self.enter(frame, path)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.exit(frame)
+
+    async def run_async(
+        self, path: str, func: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Any:
+        """Calls `func` and awaits its result if it's awaitable, sampling it under `path`."""
+        frame = sys._getframe()
+        self.enter(frame, path)
+        try:
+            result = func(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            self.exit(frame)
+
+    def sample_loop(self) -> None:
+        while not self.stopped.is_set():
+            if not self.active:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def sample(self) -> None:
+        """Samples the stack of every thread that is running a profiled command."""
+        with self.lock:
+            active = [(thread_id, dict(frames)) for thread_id, frames in self.active.items()]
+        current = sys._current_frames()
+        for thread_id, anchors in active:
+            frame: Optional[FrameType] = current.get(thread_id)
+            labels = []
+            while frame is not None and frame not in anchors:
+                label = self.label(frame)
+                if label is not None:
+                    labels.append(label)
+                frame = frame.f_back
+            if frame is None:  # The thread is outside of the command, such as a suspended coroutine.
+                continue
+            labels.extend(reversed(anchors[frame].split(" ")))
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def label(self, frame: FrameType) -> Optional[str]:
+        code = frame.f_code
+        try:
+            return self.labels[code]
+        except KeyError:
+            module = frame.f_globals.get("__name__", "?")
+            label = None if module in HIDDEN_MODULES else frame_label(code, module)
+            self.labels[code] = label
+            return label
+
+    def collapsed(self) -> str:
+        """The samples in the collapsed-stack format, one "path;frame;frame count" line per stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def write(self, file: IO[str]) -> None:
+        file.write(self.collapsed())
+
+    def clear(self) -> None:
+        self.stacks.clear()
+        self.samples = 0
@@ -0,0 +1,200 @@
+"""
+Reader
+
+Reads commands incrementally from files, pipes, sockets, memory-mapped logs or stdin,
+keeping memory bounded by the longest command instead of the whole input.
+"""
+__all__ = ["CommandTooLong", "CommandSplitter", "iter_chunks", "read_commands"]
+
+import codecs
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from invokify.invokify import Command, InvokeEngine
+from invokify.parser import string_to_args
+
+UNQUOTED_REGEX = re.compile(r'["\n]')
+QUOTED_REGEX = re.compile(r'["\\]')
+
+
+class CommandTooLong(ValueError):
+    """
+    Will be raised when a single command grows past the reader's `max_length`,
+    such as after an unterminated quote.
+    """
+
+
+@dataclass(slots=True)
+class CommandSplitter:
+    """
+    Splits text fed in chunks into commands, one per line.
+    Newlines inside quoted strings don't end a command, so quoted strings can span lines.
+
+    Commands longer than `max_length`, such as after an unterminated quote, are passed to `on_error`
+    with a `CommandTooLong` error, or raise it if it isn't given. Either way, only their first line is dropped
+    and splitting resumes after it, so one bad line doesn't take the rest of the input with it.
+    """
+
+    max_length: int = 1 << 20  # The most characters a single command can buffer.
+    on_error: Optional[Callable[[str, Exception], None]] = None
+    buffer: list[str] = field(default_factory=list, init=False, repr=False)
+    buffered: int = field(default=0, init=False)
+    quoted: bool = field(default=False, init=False)
+    escaped: bool = field(default=False, init=False)  # A backslash ended the previous chunk.
+    skipping: bool = field(default=False, init=False)  # Dropping the rest of a line that was too long.
+
+    def feed(self, chunk: str) -> list[str]:
+        """Adds a chunk of text and returns the commands it completed."""
+        commands: list[str] = []
+        rest: Optional[str] = chunk
+        while rest is not None:
+            rest = self.split(rest, commands)
+        return [command for command in commands if command and not command.isspace()]
+
+    def split(self, chunk: str, commands: list[str]) -> Optional[str]:
+        """
+        Adds the commands a chunk completes to `commands`.
+        Returns the text to split again after a command was too long, None once the chunk is done.
+        """
+        start = pos = 0
+        if self.skipping:
+            pos = chunk.find("\n") + 1
+            if not pos:
+                return None
+            start = pos
+            self.skipping = False
+        elif self.escaped and chunk:
+            self.escaped = False
+            pos = 1
+
+        while True:
+            if self.quoted:
+                match = QUOTED_REGEX.search(chunk, pos)
+                if match is None:
+                    break
+                if match[0] == "\\":
+                    pos = match.end() + 1
+                    if pos > len(chunk):
+                        self.escaped = True
+                        break
+                else:
+                    self.quoted = False
+                    pos = match.end()
+            else:
+                match = UNQUOTED_REGEX.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match[0] == '"':
+                    self.quoted = True
+                    continue
+                self.buffer.append(chunk[start : match.start()])
+                command = self.pop()
+                if len(command) > self.max_length:
+                    line, newline, remainder = command.partition("\n")
+                    self.drop(line)
+                    return remainder + "\n" + chunk[pos:] if newline else chunk[pos:]
+                commands.append(command)
+                start = pos
+
+        if start < len(chunk):
+            self.buffer.append(chunk[start:])
+            self.buffered += len(chunk) - start
+            if self.buffered > self.max_length:
+                line, newline, remainder = self.pop().partition("\n")
+                self.skipping = not newline
+                self.drop(line)
+                return remainder if newline else None
+        return None
+
+    def drop(self, line: str) -> None:
+        """Drops the first line of a command that was too long, which leaves the rest of it unquoted."""
+        self.quoted = self.escaped = False
+        error = CommandTooLong(f"A command is longer than {self.max_length} characters.")
+        if self.on_error is None:
+            raise error
+        self.on_error(line, error)
+
+    def flush(self) -> list[str]:
+        """Returns the last command if the input didn't end with a newline."""
+        command = self.pop()
+        self.quoted = self.escaped = self.skipping = False
+        return [command] if command and not command.isspace() else []
+
+    def pop(self) -> str:
+        command = "".join(self.buffer)
+        self.buffer.clear()
+        self.buffered = 0
+        return command[:-1] if command.endswith("\r") else command
+
+
+def iter_chunks(source: Any, chunk_size: int = 1 << 16, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Reads text from a text or binary stream (anything with `read`, including mmaps)
+    or a socket (anything with `recv`), decoding bytes incrementally.
+
+    Buffered binary streams are read with `read1`, which returns as soon as data is available,
+    so pass `sys.stdin.buffer` rather than `sys.stdin` for live input.
+    """
+    if hasattr(source, "recv"):
+        read = source.recv
+    elif hasattr(source, "read1"):
+        read = source.read1
+    else:
+        read = source.read
+    decoder = None
+    while chunk := read(chunk_size):
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(encoding)()
+        yield decoder.decode(chunk)
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
+
+
+def read_commands(
+    engine: InvokeEngine,
+    source: Any,
+    parser: Callable[[str], Sequence[Any]] = string_to_args,
+    chunk_size: int = 1 << 16,
+    max_length: int = 1 << 20,
+    encoding: str = "utf-8",
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+) -> Iterator[tuple[Optional[Command], Sequence[Any], tuple[Command, ...]]]:
+    """
+    Reads commands from a stream, or any iterable of text chunks, and yields what `engine.parse`
+    returns for each of them.
+
+    Commands that fail to parse or are longer than `max_length` are passed to `on_error` and skipped,
+    or raise if it isn't given.
+    """
+    splitter = CommandSplitter(max_length, on_error)
+    chunks: Iterable[str] = (
+        iter_chunks(source, chunk_size, encoding)
+        if hasattr(source, "read") or hasattr(source, "recv")
+        else source
+    )
+    for chunk in chunks:
+        for command in splitter.feed(chunk):
+            yield from parse_command(engine, parser, command, on_error)
+    for command in splitter.flush():
+        yield from parse_command(engine, parser, command, on_error)
+
+
+def parse_command(
+    engine: InvokeEngine,
+    parser: Callable[[str], Sequence[Any]],
+    command: str,
+    on_error: Optional[Callable[[str, Exception], None]],
+) -> Iterator[tuple[Optional[Command], Sequence[Any], tuple[Command, ...]]]:
+    try:
+        command_list = parser(command)
+    except Exception as error:
+        if on_error is None:
+            raise
+        on_error(command, error)
+        return
+    yield engine.parse(command_list)
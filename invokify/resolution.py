@@ -0,0 +1,165 @@
+"""
+Resolution
+
+Indexes the names of one level of the command tree for unique-prefix matching
+and "did you mean" suggestions, without scanning every name on each lookup.
+"""
+__all__ = ["NameIndex", "build_index", "edit_distance"]
+
+import bisect
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Mapping, Optional
+
+LAST_CHARACTER = "\U0010ffff"
+
+
+def grams(name: str) -> list[str]:
+    """The bigrams of a name, padded so the first and last characters get their own."""
+    padded = f"\0{name}\0"
+    return [padded[index : index + 2] for index in range(len(padded) - 1)]
+
+
+def pattern_masks(pattern: str) -> dict[str, int]:
+    """A bit mask per character of `pattern`, with the bits of the positions it appears at."""
+    masks: dict[str, int] = {}
+    for position, character in enumerate(pattern):
+        masks[character] = masks.get(character, 0) | 1 << position
+    return masks
+
+
+def edit_distance(
+    first: str, second: str, limit: int, masks: Optional[dict[str, int]] = None
+) -> int:
+    """
+    The Levenshtein distance between two strings, or `limit + 1` once it's known to be larger.
+    Uses Myers' bit-parallel algorithm, with the `pattern_masks` of `first` if they're given.
+    """
+    length = len(first)
+    if abs(length - len(second)) > limit:
+        return limit + 1
+    if not length:
+        return len(second)
+    if masks is None:
+        masks = pattern_masks(first)
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative = full, 0
+    distance = length
+    remaining = len(second)
+    for character in second:
+        equal = masks.get(character, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+        remaining -= 1
+        if distance - remaining > limit:  # Every remaining character lowers it by one at most.
+            return limit + 1
+    return distance
+
+
+@dataclass(slots=True, frozen=True)
+class NameIndex:
+    """
+    The names of a mapping of commands (or dispatch nodes), sorted for prefix lookups
+    and with a bigram index for finding similar names.
+    """
+
+    names: tuple[str, ...]  # Sorted.
+    values: tuple[Any, ...]  # The value of every name.
+    runs: tuple[int, ...]  # For every name, the index of the last name after it with the same value.
+    postings: Mapping[str, tuple[int, ...]]  # The names each bigram appears in.
+    size: int  # The length of the mapping the index was built from.
+    version: Optional[int] = None  # The version of the `CommandLayer` it was built from, if it was.
+
+    def prefix_range(self, prefix: str, low: int = 0, high: Optional[int] = None) -> tuple[int, int]:
+        """
+        The positions of the names starting with `prefix`, searching between `low` and `high`,
+        such as the range of a shorter prefix.
+        """
+        high = len(self.names) if high is None else high
+        low = bisect.bisect_left(self.names, prefix, low, high)
+        return low, bisect.bisect_left(self.names, prefix + LAST_CHARACTER, low, high)
+
+    def unique_prefix(self, prefix: str) -> Optional[Any]:
+        """Returns the value every name starting with `prefix` belongs to, None if there's none or several."""
+        low, high = self.prefix_range(prefix)
+        if low == high or self.runs[low] < high - 1:
+            return None
+        return self.values[low]
+
+    def starting_with(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        """The names starting with `prefix`, sorted, or the first `limit` of them."""
+        low, high = self.prefix_range(prefix)
+        if limit is not None:
+            high = min(high, low + limit)
+        return list(self.names[low:high])
+
+    def similar(self, name: str, max_distance: int = 2) -> list[tuple[int, str]]:
+        """
+        The names within `max_distance` edits of `name`, as (distance, name) pairs sorted by distance.
+        The distance is limited to half the distinct bigrams of `name`, so short names don't match everything.
+        """
+        # An edit adds two bigrams at most, so a name within `max_distance` edits has all
+        # but `2 * max_distance` of the bigrams of `name`. Counting the rarest bigrams is enough to find
+        # the candidates, common ones are only counted while they're cheaper than the ones counted so far.
+        postings = sorted((self.postings.get(gram, ()) for gram in set(grams(name))), key=len)
+        max_distance = min(max_distance, (len(postings) - 1) // 2)
+        counted = 2 * max_distance + 1
+        cost = sum(len(positions) for positions in postings[:counted])
+        while counted < len(postings) and len(postings[counted]) <= cost:
+            cost += len(postings[counted])
+            counted += 1
+        needed = counted - 2 * max_distance
+        counts = Counter(chain.from_iterable(postings[:counted]))
+
+        masks = pattern_masks(name)
+        matches = []
+        for position, count in counts.items():
+            if count < needed:
+                continue
+            candidate = self.names[position]
+            distance = edit_distance(name, candidate, max_distance, masks)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+        matches.sort()
+        return matches
+
+
+def build_index(mapping: Mapping[Any, Any], version: Optional[int] = None) -> NameIndex:
+    """Indexes the string keys of a mapping, at `version` if it's a `CommandLayer`."""
+    items = sorted((name, value) for name, value in mapping.items() if isinstance(name, str))
+    names = tuple(name for name, _ in items)
+    values = tuple(value for _, value in items)
+
+    runs = [0] * len(values)
+    end = len(values) - 1
+    for position in range(len(values) - 1, -1, -1):
+        if position < len(values) - 1 and values[position] is not values[position + 1]:
+            end = position
+        runs[position] = end
+
+    postings: dict[str, list[int]] = {}
+    for position, name in enumerate(names):
+        for gram in set(grams(name)):
+            postings.setdefault(gram, []).append(position)
+
+    return NameIndex(
+        names,
+        values,
+        tuple(runs),
+        {gram: tuple(positions) for gram, positions in postings.items()},
+        len(mapping),
+        version,
+    )
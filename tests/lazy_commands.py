@@ -0,0 +1,31 @@
+"""Commands that tests/test_lazy.py registers lazily, so this module must only be imported by `parse`."""
+from invokify import Command, meta
+from tests.lazy_registry import engine
+
+
+@engine.command(aliases=["purchase"])
+@meta.require(engine=True)
+def buy(amount: int, engine):
+    return ("buy", amount)
+
+
+@buy.subcommand
+def all():
+    return "all"
+
+
+@engine.command(aliases=["s"])
+def sell(amount: int):
+    return ("sell", amount)
+
+
+def plain(text: str):
+    return text.upper()
+
+
+@meta.coerce()
+def coerced(amount: int):
+    return amount
+
+
+other = Command(func=lambda: "other", name="other", aliases=[], requires={}, injections={})
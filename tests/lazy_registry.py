@@ -0,0 +1,4 @@
+"""The engine tests/lazy_commands.py registers its commands on, replaced by every test in test_lazy.py."""
+from invokify import InvokeEngine
+
+engine = InvokeEngine()
@@ -0,0 +1,91 @@
+import asyncio
+from invokify import AsyncInvokeEngine, CommandNotFound, meta
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return AsyncInvokeEngine()
+
+
+def test_invoke_sync_and_async(engine: AsyncInvokeEngine):
+    @engine.command
+    def balance():
+        return 100
+
+    @engine.command
+    async def buy(amount: int):
+        await asyncio.sleep(0)
+        return amount
+
+    async def main():
+        return await engine.invoke("balance"), await engine.invoke("buy 10")
+
+    assert asyncio.run(main()) == (100, 10)
+
+
+def test_invoke_injects_engine(engine: AsyncInvokeEngine):
+    @engine.command
+    @meta.require(engine=True)
+    async def thing(engine: AsyncInvokeEngine):
+        return engine
+
+    assert asyncio.run(engine.invoke(["thing"])) is engine
+
+
+def test_invoke_unknown_command(engine: AsyncInvokeEngine):
+    with pytest.raises(CommandNotFound):
+        asyncio.run(engine.invoke("missing"))
+
+
+def test_invoke_timeout():
+    engine = AsyncInvokeEngine(timeout=0.01)
+
+    @engine.command
+    async def slow():
+        await asyncio.sleep(1)
+
+    @engine.command
+    async def fast():
+        return "done"
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(engine.invoke("slow"))
+
+    assert asyncio.run(engine.invoke("fast")) == "done"
+    assert asyncio.run(engine.invoke("fast", timeout=None)) == "done"
+
+
+def test_invoke_concurrency_limit():
+    engine = AsyncInvokeEngine(concurrency=2)
+    running = 0
+    peak = 0
+
+    @engine.command
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def main():
+        await asyncio.gather(*(engine.invoke("work") for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak == 2
+
+
+def test_concurrency_limit_across_event_loops():
+    engine = AsyncInvokeEngine(concurrency=1)
+
+    @engine.command
+    async def work():
+        await asyncio.sleep(0.001)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(engine.invoke("work") for _ in range(3)))
+
+    assert asyncio.run(main()) == ["done"] * 3
+    assert asyncio.run(main()) == ["done"] * 3
@@ -0,0 +1,77 @@
+import random
+from typing import Any, Callable
+
+from invokify import string_to_args
+from invokify.parser import scan, tokenstream_to_args
+import pytest
+
+pytest.importorskip("tokenstream")
+
+
+SAMPLES = [
+    "",
+    "   ",
+    "balance",
+    "buy 10",
+    'single words "multiple words" [words, of, list] [words, "with, comma, but, [in, quotes]"] "[list, in quotes]"',
+    "1 2 -54.6 -3 [.6, 6., 98]",
+    "[[1, 2], [3, [4, 5]], 6]",
+    "[]",
+    "[[]]",
+    "[ a]",
+    "[1 , 2]",
+    "[-3, -3.5, 12ab]",
+    "[[1 ]]",
+    "[[1,]]",
+    "123abc abc123 1.2.3 . - -.5 5.",
+    'say "escaped \\"quote\\" and \\\\ and \\n"',
+    'a"b""',
+    "a ] b",
+    'a "unterminated',
+    "line\r\nbreak\nand\ttab",
+    "lone\rreturn",
+]
+
+BROKEN = [
+    "[a",
+    "[a,]",
+    "[1, ]",
+    '[a, "b]',
+    '"bad \\t escape"',
+]
+
+
+def outcome(parser: Callable[[str], list[Any]], string: str) -> str:
+    try:
+        # repr keeps ints and floats apart, unlike ==
+        return repr(parser(string))
+    except Exception:
+        return "error"
+
+
+@pytest.mark.parametrize("string", SAMPLES)
+def test_backends_agree(string: str):
+    assert repr(scan(string)) == repr(tokenstream_to_args(string))
+
+
+@pytest.mark.parametrize("string", BROKEN)
+def test_backends_both_fail(string: str):
+    assert outcome(scan, string) == "error"
+    assert outcome(tokenstream_to_args, string) == "error"
+
+
+def test_backends_agree_on_random_input():
+    alphabet = [
+        "a", "b", "n", "1", "2", "0", "-", ".", ",", ", ", " ", "\t",
+        "\n", "\r", "[", "]", '"', "\\", "é", "\x0b", "٣",
+    ]  # fmt: skip
+    rng = random.Random(1234)
+    for _ in range(3000):
+        string = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        assert outcome(scan, string) == outcome(tokenstream_to_args, string), string
+
+
+def test_backend_selection():
+    assert string_to_args("buy 10", backend="tokenstream") == ["buy", 10]
+    with pytest.raises(ValueError):
+        string_to_args("buy 10", backend="missing")
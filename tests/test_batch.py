@@ -0,0 +1,112 @@
+from functools import partial
+
+from invokify import InvokeEngine, CommandNotFound, InvalidArgumentSyntax, string_to_args
+from invokify.parser import ARRAY_THRESHOLD
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return InvokeEngine()
+
+
+def test_invoke_many_in_order(engine: InvokeEngine):
+    money = 0
+
+    @engine.command
+    def buy(amount: int):
+        nonlocal money
+        money -= amount
+        return money
+
+    @engine.command
+    def sell(amount: int):
+        nonlocal money
+        money += amount
+        return money
+
+    results = list(engine.invoke_many(["sell 10", "buy 3", "sell 10", ["buy", 1]]))
+
+    assert [result.value for result in results] == [10, 7, 17, 16]
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert all(result.ok for result in results)
+    assert results[1].command is buy
+
+
+def test_invoke_many_captures_errors(engine: InvokeEngine):
+    @engine.command
+    def divide(amount: int):
+        return 10 / amount
+
+    results = list(engine.invoke_many(["divide 2", "divide 0", "missing", "divide [1", "divide 5"]))
+
+    assert results[0].value == 5
+    assert isinstance(results[1].error, ZeroDivisionError)
+    assert results[1].command is divide
+    assert isinstance(results[2].error, CommandNotFound)
+    assert results[2].command is None
+    assert isinstance(results[3].error, InvalidArgumentSyntax)
+    assert results[4].value == 2
+
+
+def test_invoke_many_reuses_duplicate_lines(engine: InvokeEngine):
+    parsed = []
+
+    def parser(line: str):
+        parsed.append(line)
+        return line.split()
+
+    @engine.command
+    def thing(*args: str):
+        return args
+
+    results = engine.invoke_many(["thing a", "thing a", "thing b", "thing a"], parser=parser)
+
+    assert [result.value for result in results] == [("a",), ("a",), ("b",), ("a",)]
+    assert parsed == ["thing a", "thing b"]
+
+
+def test_invoke_many_does_not_share_lists(engine: InvokeEngine):
+    @engine.command
+    def grow(items: list):
+        items.append(0)
+        return len(items)
+
+    results = engine.invoke_many(["grow [1]", "grow [1]"])
+
+    assert [result.value for result in results] == [2, 2]
+
+    @engine.command
+    def grow_all(items: tuple):
+        items[0].append(0)
+        return len(items[0])
+
+    results = engine.invoke_many(["grow_all x", "grow_all x"], parser=lambda line: ["grow_all", ([1],)])
+
+    assert [result.value for result in results] == [2, 2]
+
+
+def test_invoke_many_does_not_share_arrays(engine: InvokeEngine):
+    @engine.command
+    def grow(items):
+        items.append(0)
+        return len(items)
+
+    line = "grow [" + ", ".join(["1"] * ARRAY_THRESHOLD) + "]"
+    parser = partial(string_to_args, backend="views")
+    results = engine.invoke_many([line, line], parser=parser)
+
+    assert [result.value for result in results] == [ARRAY_THRESHOLD + 1] * 2
+
+
+def test_invoke_many_is_lazy(engine: InvokeEngine):
+    calls = []
+
+    @engine.command
+    def thing(value: int):
+        calls.append(value)
+
+    results = engine.invoke_many(f"thing {index}" for index in range(100))
+    next(results)
+
+    assert calls == [0]
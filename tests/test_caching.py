@@ -0,0 +1,133 @@
+import time
+
+from invokify import Command, InvokeEngine, ResultCache, meta, string_to_args
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return InvokeEngine()
+
+
+def test_cache_results_per_arguments(engine: InvokeEngine):
+    calls = []
+
+    @engine.command
+    @meta.cache()
+    def quote(item: str, amount: int = 1):
+        calls.append((item, amount))
+        return f"{amount} {item}"
+
+    assert quote("hats", 2) == quote("hats", 2) == "2 hats"
+    assert quote("hats") == "1 hats"
+    assert calls == [("hats", 2), ("hats", 1)]
+
+    info = quote.result_cache.cache_info()
+    assert (info.hits, info.misses, info.size) == (1, 2, 2)
+    assert info.hit_rate == pytest.approx(1 / 3)
+
+
+def test_unhashable_arguments(engine: InvokeEngine):
+    calls = []
+
+    @engine.command
+    @meta.cache()
+    def total(ids: list, options: dict):
+        calls.append(ids)
+        return sum(ids)
+
+    cmd, args, _ = engine.parse(string_to_args("total [1, 2, [3]] 0"))
+    args = (args[0][:2], {"fast": [True]})
+    assert cmd(*args) == cmd([1, 2], {"fast": [True]}) == 3
+    assert cmd((1, 2), {"fast": [True]}) == 3  # Tuples and lists are kept apart.
+    assert len(calls) == 2
+
+
+def test_maxsize_and_ttl():
+    cache = ResultCache(maxsize=2, ttl=0.05)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert list(cache.entries) == ["b", "c"]
+    assert cache.get("c") == "C"
+    time.sleep(0.06)
+    assert cache.get("c") != "C"
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (1, 1, 1, 1)
+
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=-1)
+
+
+def test_invalidate(engine: InvokeEngine):
+    calls = []
+
+    @engine.command
+    @meta.cache()
+    @meta.coerce()
+    def price(amount: int):
+        calls.append(amount)
+        return amount * 2
+
+    price("3"), price(4)
+    price.invalidate(3)
+    price(3), price(4)
+    assert calls == [3, 4, 3]
+
+    price.invalidate("4")  # Converted like the arguments of a call.
+    price.invalidate()
+    price(3), price(4)
+    assert calls == [3, 4, 3, 3, 4]
+    assert price.result_cache.cache_info().hits == 1
+
+
+def test_equal_values_of_other_types(engine: InvokeEngine):
+    @engine.command
+    @meta.cache()
+    def kind(value, options=None):
+        return type(value).__name__
+
+    assert [kind(True), kind(1), kind(1.0)] == ["bool", "int", "float"]
+    assert [kind([1, (True,)]), kind([1, (1,)])] == ["list", "list"]
+    assert kind.result_cache.cache_info().size == 5
+    assert kind(1, options={"fast": True}) == kind(1, options={"fast": 1}) == "int"
+    assert kind.result_cache.cache_info().hits == 0
+
+
+def test_injections_are_safe(engine: InvokeEngine):
+    other = InvokeEngine()
+
+    @engine.command
+    @meta.cache()
+    @meta.require(engine=True, command=True)
+    def where(name: str, engine: InvokeEngine, command: Command):
+        assert command is where
+        return engine, name
+
+    assert where("a", engine=engine) == (engine, "a")
+    assert where("a", engine=other) == (other, "a")
+    assert where("a", engine=engine) == (engine, "a")
+    assert where.result_cache.cache_info().hits == 1
+
+    del other
+    fresh = InvokeEngine()  # Never gets the results of a collected engine, even at the same address.
+    assert where("a", engine=fresh) == (fresh, "a")
+
+    where.invalidate("a")
+    assert where.result_cache.cache_info().size == 0
+
+
+def test_errors_are_not_cached(engine: InvokeEngine):
+    calls = []
+
+    @engine.command
+    @meta.cache(maxsize=None)
+    def flaky(value: int):
+        calls.append(value)
+        if len(calls) == 1:
+            raise RuntimeError
+        return value
+
+    with pytest.raises(RuntimeError):
+        flaky(1)
+    assert flaky(1) == flaky(1) == 1
+    assert calls == [1, 1]
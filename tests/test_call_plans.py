@@ -0,0 +1,117 @@
+from typing import Any
+from invokify import InvokeEngine, InvalidArgumentCount, meta
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return InvokeEngine()
+
+
+def test_plan_arity(engine: InvokeEngine):
+    calls = []
+
+    @engine.command
+    def buy(amount: int, currency: str = "gold"):
+        calls.append(amount)
+        return amount, currency
+
+    assert buy.plan is not None
+    assert (buy.plan.min_args, buy.plan.max_args) == (1, 2)
+    assert buy(10) == (10, "gold")
+
+    with pytest.raises(InvalidArgumentCount):
+        buy()
+    with pytest.raises(InvalidArgumentCount):
+        buy(1, "gold", "extra")
+    assert calls == [10]
+
+
+def test_plan_positional_by_keyword(engine: InvokeEngine):
+    @engine.command
+    def buy(amount: int, user: int, /, *, note: str = ""):
+        return amount, user
+
+    @engine.command
+    def sell(amount: int, user: int):
+        return amount, user
+
+    assert sell(10, user=5) == (10, 5)
+    assert sell(amount=10, user=5) == (10, 5)
+
+    with pytest.raises(InvalidArgumentCount):
+        sell(user=5)
+    with pytest.raises(InvalidArgumentCount):
+        buy(10, user=5)
+
+
+def test_plan_varargs(engine: InvokeEngine):
+    @engine.command
+    def total(first: int, *rest: int):
+        return first + sum(rest)
+
+    assert total.plan is not None
+    assert total.plan.varargs
+    assert total(1, 2, 3) == 6
+
+    with pytest.raises(InvalidArgumentCount):
+        total()
+
+
+def test_plan_injections(engine: InvokeEngine):
+    @engine.command
+    @meta.inject(var=10, unused=20)
+    @meta.require(engine=True, command=True)
+    def thing(amount: int, var: Any, engine: InvokeEngine):
+        return amount, var, engine
+
+    assert thing.plan is not None
+    assert thing.plan.injects == {"var", "engine"}
+    assert thing.static_kwargs == {"var": 10}
+    assert thing(1, engine=engine) == (1, 10, engine)
+
+    with pytest.raises(InvalidArgumentCount):
+        thing(1, 2, engine=engine)
+
+
+def test_plan_accepts_any_injection_with_kwargs(engine: InvokeEngine):
+    @engine.command
+    @meta.inject(var=10)
+    @meta.require(command=True)
+    def thing(**kwargs: Any):
+        return kwargs
+
+    assert thing() == {"var": 10, "command": thing}
+
+
+def test_plan_keyword_only(engine: InvokeEngine):
+    @engine.command
+    def thing(*args: Any, target: str, loud: bool = False):
+        return args, target, loud
+
+    assert thing.plan is not None
+    assert thing.plan.keyword_only == ("target", "loud")
+    assert thing(1, target="me") == ((1,), "me", False)
+
+    with pytest.raises(InvalidArgumentCount):
+        thing(1)
+
+
+def test_plan_method(engine: InvokeEngine):
+    class Guy:
+        @engine.command
+        def sell(self, amount: int):
+            return amount
+
+    assert Guy.sell.plan is not None
+    assert Guy.sell(Guy(), 10) == 10
+
+    with pytest.raises(InvalidArgumentCount):
+        Guy.sell(Guy())
+
+
+def test_no_plan_without_signature(engine: InvokeEngine):
+    command = engine.command(max, name="highest")
+
+    assert command.plan is None
+    assert command(1, 5, 3) == 5
@@ -0,0 +1,152 @@
+import asyncio
+
+from invokify import (
+    AsyncInvokeEngine,
+    CheckFailed,
+    CommandDispatcher,
+    InvokeEngine,
+    meta,
+)
+import pytest
+
+ADMINS = {"ann"}
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def engine(calls: list[str]):
+    engine = AsyncInvokeEngine()
+
+    @engine.check("registered")
+    def registered(user):
+        calls.append("registered")
+        return user is not None
+
+    @engine.check("admin")
+    def admin(user):
+        calls.append("admin")
+        return user in ADMINS
+
+    @engine.command
+    @meta.require(admin=True, registered=True)
+    def ban(name: str):
+        return f"banned {name}"
+
+    @engine.command
+    @meta.require(registered=True, engine=True)
+    def balance(engine: InvokeEngine):
+        return 100
+
+    @engine.command
+    def ping():
+        return "pong"
+
+    return engine
+
+
+def test_checks_run_in_registration_order(engine: AsyncInvokeEngine, calls: list[str]):
+    [result] = engine.invoke_many(["ban bob"], context=None)
+    assert isinstance(result.error, CheckFailed)
+    assert result.error.requirement == "registered"
+    assert calls == ["registered"]  # Short-circuited before "admin".
+
+    [result] = engine.invoke_many(["ban bob"], context="bob")
+    assert result.error.requirement == "admin" and result.error.command == "ban"
+    [result] = engine.invoke_many(["ban bob"], context="ann")
+    assert result.value == "banned bob"
+
+
+def test_results_are_cached_per_request(engine: AsyncInvokeEngine, calls: list[str]):
+    results = list(engine.invoke_many(["ban a", "balance", "ban b", "ping"], context="ann"))
+    assert [result.value for result in results] == ["banned a", 100, "banned b", "pong"]
+    assert calls == ["registered", "admin"]
+
+    assert engine.invoke_chain("balance && ban c", context="ann") == [100, "banned c"]
+    assert calls == ["registered", "admin"] * 2
+
+
+def test_commands_without_requirements_skip_checks(engine: AsyncInvokeEngine, calls: list[str]):
+    assert engine.commands["ping"].checks == ()
+    assert engine.commands["balance"].checks == ("registered",)
+    assert [result.value for result in engine.invoke_many(["ping"])] == ["pong"]
+    assert engine.invoke_chain("ping") == ["pong"]
+    assert calls == []
+
+
+def test_chain_stops_at_failed_check(engine: AsyncInvokeEngine):
+    metrics = engine.instrument()
+    with pytest.raises(CheckFailed):
+        engine.invoke_chain("ping && ban a && ping", context="bob")
+    assert metrics.snapshot()["ban"]["errors"] == 1
+
+
+def test_requirements_without_checks_fail(engine: AsyncInvokeEngine):
+    @engine.command
+    @meta.require(admn=True)
+    def kick(name: str):
+        return f"kicked {name}"
+
+    [result] = engine.invoke_many(["kick bob"], context="ann")
+    assert isinstance(result.error, CheckFailed) and result.error.requirement == "admn"
+
+    plain = InvokeEngine()  # Without any checks, requirements are only descriptions.
+    plain.command(kick.func, name="kick")
+    assert [result.value for result in plain.invoke_many(["kick bob"])] == ["kicked bob"]
+
+
+def test_async_checks_fail_outside_asyncio(engine: AsyncInvokeEngine):
+    @engine.check("admin")
+    async def admin(user):
+        return user in ADMINS
+
+    [result] = engine.invoke_many(["ban bob"], context="eve")
+    assert isinstance(result.error, TypeError)
+    with pytest.raises(TypeError):
+        engine.invoke_chain("ban bob", context="eve")
+    with CommandDispatcher(engine) as dispatcher:
+        with pytest.raises(TypeError):
+            dispatcher.submit("ban bob", context="eve")
+
+
+def test_async_checks(engine: AsyncInvokeEngine):
+    @engine.check("async")
+    async def slow(user):
+        await asyncio.sleep(0)
+        return user == "ann"
+
+    @engine.command
+    @meta.require(**{"async": True})
+    async def secret():
+        return "secret"
+
+    async def main():
+        assert await engine.invoke("secret", context="ann") == "secret"
+        with pytest.raises(CheckFailed):
+            await engine.invoke("secret", context="bob")
+        engine.instrument()
+        with pytest.raises(CheckFailed):
+            await engine.invoke("ban a", context="bob")
+
+    asyncio.run(main())
+
+
+def test_dispatcher_checks(engine: AsyncInvokeEngine):
+    with CommandDispatcher(engine) as dispatcher:
+        assert dispatcher.submit("ban a", context="ann").result() == "banned a"
+        with pytest.raises(CheckFailed):
+            dispatcher.submit("ban a", context="bob")
+
+
+def test_overlays_copy_checks(engine: AsyncInvokeEngine):
+    tenant = engine.overlay()
+
+    @tenant.check("admin")
+    def everyone(user):
+        return True
+
+    assert [result.value for result in tenant.invoke_many(["ban a"], context="bob")] == ["banned a"]
+    assert engine.checks["admin"] is not everyone
@@ -0,0 +1,83 @@
+import enum
+from typing import Literal, Optional
+from invokify import InvokeEngine, ArgumentConversionError, meta, string_to_args
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return InvokeEngine()
+
+
+class Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+def test_coerce_simple_types(engine: InvokeEngine):
+    @engine.command
+    @meta.coerce()
+    def thing(amount: int, price: float, name: str, loud: bool):
+        return amount, price, name, loud
+
+    cmd, args, _ = engine.parse(string_to_args('thing "10" 5 42 yes'))
+
+    assert cmd(*args) == (10, 5.0, "42", True)
+    assert type(cmd(*args)[1]) is float
+
+
+def test_coerce_containers(engine: InvokeEngine):
+    @engine.command
+    @meta.coerce()
+    def thing(ids: list[int], color: Color, mode: Literal["fast", "slow"], limit: Optional[int] = None):
+        return ids, color, mode, limit
+
+    cmd, args, _ = engine.parse(string_to_args("thing [1, 2., 3] RED slow"))
+    assert cmd(*args) == ([1, 2, 3], Color.RED, "slow", None)
+
+    cmd, args, _ = engine.parse(string_to_args("thing [] blue fast 5"))
+    assert cmd(*args) == ([], Color.BLUE, "fast", 5)
+
+
+def test_coerce_varargs(engine: InvokeEngine):
+    @engine.command
+    @meta.coerce()
+    def total(*amounts: float):
+        return sum(amounts)
+
+    assert total(1, "2.5", 3) == 6.5
+
+
+def test_coerce_error_position(engine: InvokeEngine):
+    @engine.command
+    @meta.coerce()
+    def buy(item: str, amount: int):
+        return item, amount
+
+    with pytest.raises(ArgumentConversionError) as error:
+        buy("apple", "lots")
+
+    assert error.value.position == 1
+    assert error.value.name == "amount"
+    assert error.value.value == "lots"
+    assert error.value.expected is int
+
+
+def test_coerce_is_opt_in(engine: InvokeEngine):
+    @engine.command
+    def thing(amount: int):
+        return amount
+
+    assert thing.converters is None
+    assert thing("10") == "10"
+
+
+def test_coerce_with_injections(engine: InvokeEngine):
+    @engine.command
+    @meta.coerce()
+    @meta.inject(bonus=5)
+    @meta.require(engine=True)
+    def thing(amount: int, bonus: int, engine: InvokeEngine):
+        return amount + bonus
+
+    assert thing("10", engine=engine) == 15
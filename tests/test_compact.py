@@ -0,0 +1,104 @@
+from invokify import EngineFrozen, InvokeEngine, meta
+import pytest
+
+
+def build() -> InvokeEngine:
+    engine = InvokeEngine()
+    for name in ("buy", "sell"):
+
+        def command(amount: int, item: str = "all"):
+            return amount, item
+
+        parent = engine.command(command, name=name, aliases=[f"{name}_alias"])
+        parent.subcommand(lambda amount: amount, name="one")
+        parent.subcommand(lambda amount: amount, name="two")
+    return engine
+
+
+def test_compact_shares_containers_and_plans():
+    engine = build()
+    engine.compact()
+    buy, sell = engine.commands["buy"], engine.commands["sell"]
+    one, two = buy.children["one"], sell.children["two"]
+
+    assert buy.plan is sell.plan
+    assert one.plan is two.plan
+    assert one.children is two.children is buy.injections is sell.static_kwargs
+    assert buy.requires is one.requires
+
+    cmd, args, callstack = engine.parse(["sell_alias", "two", 3])
+    assert cmd is two and callstack == (sell, two)
+    assert cmd(*args) == 3
+    assert engine.parse(["buy", 2, "hats"])[0](2, "hats") == (2, "hats")
+
+
+def test_compact_keeps_injected_values():
+    engine = InvokeEngine()
+    marker = object()
+
+    @engine.command
+    @meta.inject(flag=True, marker=marker)
+    def buy(flag, marker):
+        return flag, marker
+
+    @engine.command
+    @meta.inject(flag=1, marker=marker)
+    def sell(flag, marker):
+        return flag, marker
+
+    @engine.command
+    @meta.inject(flag=True, marker=marker)
+    def trade(flag, marker):
+        return flag, marker
+
+    engine.compact()
+
+    assert buy() == (True, marker) and sell() == (1, marker)
+    assert type(sell()[0]) is int
+    assert buy.injections is trade.injections is not sell.injections
+
+
+def test_shared_containers_are_read_only():
+    engine = build()
+    engine.compact()
+    one = engine.commands["buy"].children["one"]
+
+    with pytest.raises(EngineFrozen):
+        one.injections["engine"] = engine
+    one.injections = {"engine": engine}
+    one.prepare()
+    assert engine.commands["buy"].children["two"].injections == {}
+
+
+def test_register_after_compact():
+    engine = build()
+    engine.compact()
+    one = engine.commands["buy"].children["one"]
+
+    @one.subcommand
+    def deep(amount: int):
+        return amount
+
+    @engine.command
+    @meta.require(engine=True)
+    def trade():
+        return "trade"
+
+    assert engine.parse(["buy", "one", "deep", 1])[0] is deep
+    assert engine.commands["sell"].children["one"].children == {}
+    engine.compact()
+    assert engine.parse(["trade"])[0] is trade
+    assert trade.requires["engine"] is True
+
+
+def test_compact_frozen_engine():
+    engine = build()
+    engine.freeze()
+    engine.compact()
+    sell = engine.commands["sell"]
+
+    assert list(engine.parse(["sell", "one", 4])[1]) == [4]
+    with pytest.raises(EngineFrozen):
+        sell.subcommand(lambda: None, name="three")
+    with pytest.raises(EngineFrozen):
+        sell.children["one"].subcommand(lambda: None, name="deep")
@@ -0,0 +1,101 @@
+from invokify import Completer, InvokeEngine
+import pytest
+
+
+@pytest.fixture
+def engine():
+    engine = InvokeEngine()
+
+    @engine.command(aliases=["purchase"])
+    def buy(amount: int):
+        pass
+
+    @buy.subcommand
+    def all():
+        pass
+
+    @buy.subcommand
+    def any():
+        pass
+
+    @engine.command
+    def balance():
+        pass
+
+    return engine
+
+
+def test_complete_commands(engine: InvokeEngine):
+    assert engine.complete("").candidates == ("balance", "buy", "purchase")
+    assert engine.complete("b").candidates == ("balance", "buy")
+    assert engine.complete("bu").candidates == ("buy",)
+    assert engine.complete("  pu").start == 2
+    assert engine.complete("x").candidates == ()
+
+
+def test_complete_subcommands(engine: InvokeEngine):
+    completion = engine.complete("buy a")
+    assert completion.candidates == ("all", "any")
+    assert completion.start == 4 and completion.word == "a"
+    assert engine.complete("purchase al").candidates == ("all",)
+    assert engine.complete("buy ").candidates == ("all", "any")
+    assert engine.complete("buy all ").candidates == ()
+
+
+def test_arguments_are_not_completed(engine: InvokeEngine):
+    assert engine.complete("balance 10 b").candidates == ()
+    assert engine.complete('buy "a').candidates == ()
+    assert engine.complete("buy [a").candidates == ()
+
+
+def test_cursor(engine: InvokeEngine):
+    completion = engine.complete("buy al 10", cursor=6)
+    assert completion.candidates == ("all",)
+    assert completion.start == 4
+
+
+def test_incremental_typing(engine: InvokeEngine):
+    completer = Completer(engine)
+    line = "purchase any"
+    for end in range(len(line) + 1):
+        expected = Completer(engine).complete(line[:end])
+        assert completer.complete(line[:end]) == expected
+
+    # Deleting characters and editing earlier words starts over.
+    assert completer.complete("bu").candidates == ("buy",)
+    assert completer.complete("balance a").candidates == ()
+    assert completer.complete("buy a").candidates == ("all", "any")
+
+
+def test_new_commands_are_completed(engine: InvokeEngine):
+    completer = Completer(engine)
+    assert completer.complete("buy al").candidates == ("all",)
+
+    @engine.commands["buy"].subcommand
+    def allow():
+        pass
+
+    assert completer.complete("buy al").candidates == ("all", "allow")
+    assert completer.complete("bal").candidates == ("balance",)
+    assert completer.complete("sell a").candidates == ()
+
+    @engine.command
+    def sell():
+        pass
+
+    @sell.subcommand
+    def apples():
+        pass
+
+    assert completer.complete("sell a").candidates == ("apples",)
+
+
+def test_prefix_matching_words(engine: InvokeEngine):
+    assert engine.complete("pur a").candidates == ()
+    engine.prefix_matching = True
+    assert Completer(engine).complete("pur a").candidates == ("all", "any")
+
+
+def test_frozen_engine(engine: InvokeEngine):
+    engine.freeze()
+    assert engine.complete("buy a").candidates == ("all", "any")
@@ -0,0 +1,89 @@
+import os
+import threading
+from invokify import CommandDispatcher, InvokeEngine, Command, RateLimited, meta
+import pytest
+
+engine = InvokeEngine()
+
+
+@engine.command
+@meta.executor("process")
+@meta.require(engine=True, command=True)
+def pid(engine: InvokeEngine, command: Command):
+    return os.getpid(), engine.commands["pid"] is command
+
+
+@engine.command
+@meta.executor("thread")
+@meta.require(engine=True)
+def thread(engine: InvokeEngine):
+    return threading.current_thread().name, engine
+
+
+@engine.command
+@meta.executor("process")
+@meta.rate_limit(2, 60, key="user")
+@meta.cache()
+def square(amount: int, *, user: int):
+    return amount * amount, os.getpid()
+
+
+@engine.command
+def inline(amount: int):
+    if amount < 0:
+        raise ValueError(amount)
+    return threading.current_thread().name
+
+
+@pytest.fixture
+def dispatcher():
+    with CommandDispatcher(engine, max_threads=2, max_processes=1) as dispatcher:
+        yield dispatcher
+
+
+def test_dispatch_inline(dispatcher: CommandDispatcher):
+    future = dispatcher.submit("inline 1")
+    assert future.done()
+    assert future.result() == threading.current_thread().name
+
+    assert isinstance(dispatcher.submit("inline -1").exception(), ValueError)
+
+
+def test_dispatch_thread(dispatcher: CommandDispatcher):
+    name, injected = dispatcher.submit(["thread"]).result(timeout=5)
+
+    assert name.startswith("invokify")
+    assert injected is engine
+
+
+def test_dispatch_process(dispatcher: CommandDispatcher):
+    worker_pid, injected = dispatcher.submit("pid").result(timeout=30)
+
+    assert worker_pid != os.getpid()
+    assert injected
+
+
+def test_process_limits_and_cache(dispatcher: CommandDispatcher):
+    square = engine.commands["square"]
+
+    future = dispatcher.submit("square 3", user=1)
+    stored = threading.Event()
+    future.add_done_callback(lambda done: stored.set())  # After the result was cached.
+    value, worker_pid = future.result(timeout=30)
+    assert stored.wait(5)
+    assert value == 9 and worker_pid != os.getpid()
+
+    # Limits and results are kept by this process, not by each worker.
+    cached = dispatcher.submit("square 3", user=1)
+    assert cached.done() and cached.result() == (9, worker_pid)
+    assert square.result_cache.cache_info().hits == 1
+    assert isinstance(dispatcher.submit("square 4", user=1).exception(timeout=0), RateLimited)
+    assert dispatcher.submit("square 4", user=2).result(timeout=30)[0] == 16
+
+
+def test_executor_policy():
+    with pytest.raises(ValueError):
+        meta.executor("gpu")
+
+    assert engine.commands["pid"].execution == "process"
+    assert engine.commands["inline"].execution == "inline"
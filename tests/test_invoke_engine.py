@@ -1,4 +1,4 @@
-from invokify import InvokeEngine
+from invokify import InvokeEngine, EngineFrozen
 import pytest
 
 
@@ -18,3 +18,62 @@ def test_create_command(engine: InvokeEngine):
 
     assert engine.commands["thing"]
     assert thing() == "hello"
+
+
+def test_freeze(engine: InvokeEngine):
+    @engine.command(aliases=["t"])
+    def thing():
+        return "thing"
+
+    @thing.subcommand(aliases=["m"])
+    def more():
+        return "more"
+
+    engine.freeze()
+    assert engine.frozen
+
+    cmd, args, callstack = engine.parse(["t", "m", 10, [1]])
+    assert cmd() == "more"
+    assert args == [10, [1]]
+    assert callstack == (thing, more)
+
+    command_list = ["missing"]
+    cmd, args, callstack = engine.parse(command_list)
+    assert (cmd, args, callstack) == (None, command_list, ())
+
+    # Callstacks are precomputed once per path.
+    assert engine.parse(["thing", "more"])[2] is engine.parse(["t", "m"])[2]
+
+
+def test_register_after_freeze(engine: InvokeEngine):
+    @engine.command
+    def thing():
+        return "thing"
+
+    engine.freeze()
+
+    with pytest.raises(EngineFrozen):
+
+        @engine.command
+        def other():  # type: ignore
+            ...
+
+    with pytest.raises(EngineFrozen):
+
+        @thing.subcommand
+        def more():  # type: ignore
+            ...
+
+    with pytest.raises(EngineFrozen):
+        engine.commands["other"] = thing
+
+
+def test_freeze_recursive_tree(engine: InvokeEngine):
+    @engine.command
+    def thing():
+        ...
+
+    thing.subcommand(thing, name="again")
+
+    with pytest.raises(ValueError):
+        engine.freeze()
@@ -0,0 +1,110 @@
+import json
+import sys
+
+from invokify import EngineFrozen, InvokeEngine
+from tests import lazy_registry
+import pytest
+
+MODULE = "tests.lazy_commands"
+
+
+@pytest.fixture
+def engine():
+    sys.modules.pop(MODULE, None)
+    lazy_registry.engine = InvokeEngine()
+    yield lazy_registry.engine
+    sys.modules.pop(MODULE, None)
+
+
+def test_import_on_first_parse(engine: InvokeEngine):
+    buy = engine.lazy_command(f"{MODULE}:buy", aliases=["purchase"], helptext="Buys things.")
+
+    assert MODULE not in sys.modules
+    assert not buy.loaded
+    assert engine.commands["purchase"] is buy
+    assert buy.helptext == "Buys things."
+
+    cmd, args, callstack = engine.parse(["purchase", 10])
+    assert MODULE in sys.modules
+    assert cmd is buy and buy.loaded
+    assert cmd(*args, engine=engine) == ("buy", 10)
+    assert callstack == (buy,)
+
+
+def test_decorators_fill_in_declarations(engine: InvokeEngine):
+    engine.register_manifest(
+        [
+            {"name": "buy", "source": f"{MODULE}:buy", "aliases": ["purchase"]},
+            {"name": "sell", "source": f"{MODULE}:sell"},
+        ]
+    )
+
+    cmd, args, _ = engine.parse(["buy", "all"])
+    assert cmd.name == "all" and cmd() == "all"
+    # Importing the module for one command filled in the rest.
+    assert engine.commands["sell"].loaded
+    assert engine.commands["s"] is engine.commands["sell"]
+    assert engine.commands["sell"].aliases == ["sell", "s"]
+    assert engine.commands["buy"].requires == {"engine": True, "command": False}
+
+
+def test_plain_functions(engine: InvokeEngine):
+    engine.register_manifest(
+        [
+            {"source": f"{MODULE}:plain", "aliases": ["p"]},
+            {"source": f"{MODULE}:coerced"},
+            {"source": f"{MODULE}:other", "name": "another"},
+        ]
+    )
+
+    cmd, args, _ = engine.parse(["p", "hi"])
+    assert cmd.name == "plain" and cmd(*args) == "HI"
+    cmd, args, _ = engine.parse(["coerced", "5"])
+    assert cmd(*args) == 5
+    cmd, _, _ = engine.parse(["another"])
+    assert cmd() == "other"
+
+
+def test_manifest_subcommands(engine: InvokeEngine):
+    manifest = json.loads(
+        json.dumps(
+            [
+                {
+                    "name": "shop",
+                    "source": f"{MODULE}:plain",
+                    "children": [{"name": "sell", "source": f"{MODULE}:sell"}],
+                }
+            ]
+        )
+    )
+    (shop,) = engine.register_manifest(manifest)
+
+    assert not shop.children["sell"].loaded
+    cmd, args, callstack = engine.parse(["shop", "sell", 3])
+    assert cmd(*args) == ("sell", 3)
+    assert [command.name for command in callstack] == ["shop", "sell"]
+    assert not shop.loaded  # Only the resolved command is loaded.
+
+
+def test_call_before_parse(engine: InvokeEngine):
+    plain = engine.lazy_command(f"{MODULE}:plain")
+
+    assert plain("direct") == "DIRECT"
+    assert plain.loaded
+
+
+def test_frozen_engine(engine: InvokeEngine):
+    engine.register_manifest([{"source": f"{MODULE}:buy", "children": [{"source": f"{MODULE}:all"}]}])
+    engine.freeze()
+
+    with pytest.raises(EngineFrozen):
+        engine.lazy_command(f"{MODULE}:plain")
+
+    # The module also registers sell, which wasn't declared, so it's skipped.
+    cmd, args, _ = engine.parse(["buy", 10])
+    assert cmd(*args, engine=engine) == ("buy", 10)
+    assert engine.parse(["buy", "all"])[0]() == "all"
+    assert engine.parse(["sell", 1])[0] is None
+    assert "sell" not in engine.commands
+    with pytest.raises(EngineFrozen):
+        engine.command(lambda: None, name="later")
@@ -0,0 +1,161 @@
+from invokify import InvokeEngine, MemoryStore, RateLimited, meta
+import pytest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(clock: Clock):
+    return MemoryStore(clock=clock)
+
+
+def test_cooldown_per_caller(clock: Clock, store: MemoryStore):
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.cooldown(5, key="user", store=store)
+    def daily(*, user: str):
+        return user
+
+    cmd, args, _ = engine.parse(["daily"])
+    assert cmd(engine=engine, user="ann") == "ann"
+    assert cmd(engine=engine, user="bob") == "bob"
+    with pytest.raises(RateLimited) as error:
+        cmd(engine=engine, user="ann")
+    assert error.value.retry_after == 5
+    assert error.value.command == "daily"
+
+    clock.now = 4.5
+    with pytest.raises(RateLimited) as error:
+        daily(user="ann")
+    assert error.value.retry_after == pytest.approx(0.5)
+    clock.now = 5
+    assert daily(user="ann") == "ann"
+
+
+def test_rate_limit_bursts(clock: Clock, store: MemoryStore):
+    @meta.rate_limit(3, 1, store=store)
+    def ping():
+        return "pong"
+
+    engine = InvokeEngine()
+    ping = engine.command(ping)
+    assert [ping() for _ in range(3)] == ["pong"] * 3
+    with pytest.raises(RateLimited):
+        ping()
+    clock.now = 1 / 3
+    assert ping() == "pong"
+    with pytest.raises(RateLimited):
+        ping()
+
+
+def test_limits_are_per_command(store: MemoryStore):
+    engine = InvokeEngine()
+
+    def register(name: str):
+        @engine.command(name=name)
+        @meta.cooldown(60, store=store)
+        def buy():
+            return name
+
+        return buy
+
+    first, second = register("first"), register("second")
+    assert first() == "first" and second() == "second"
+    with pytest.raises(RateLimited):
+        first()
+
+    tenant = engine.overlay()
+    assert tenant.edit("first")() == "first"  # Copies count on their own.
+    with pytest.raises(RateLimited):
+        tenant.edit("first")()
+
+
+def test_stacked_limits_and_shared_store(clock: Clock, store: MemoryStore):
+    first, second = InvokeEngine(), InvokeEngine()
+
+    def register(engine: InvokeEngine):
+        @engine.command
+        @meta.rate_limit(10, 60, store=store)
+        @meta.cooldown(1, key="user", store=store, name="buy")
+        def buy(*, user: str):
+            return user
+
+        return buy
+
+    buy_first, buy_second = register(first), register(second)
+    assert buy_first.limits[0].bucket == buy_second.limits[0].bucket == "buy"
+    assert buy_first.limits[1].bucket != buy_second.limits[1].bucket
+    assert buy_first(user="ann") == "ann"
+    with pytest.raises(RateLimited):
+        buy_second(user="ann")  # The store and name are shared, like a shared backend would be.
+    assert buy_second(user="bob") == "bob"
+
+
+def test_results_of_invoke_many(store: MemoryStore):
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.cooldown(60, store=store)
+    def launch():
+        return "launched"
+
+    results = list(engine.invoke_many(["launch", "launch"]))
+    assert results[0].value == "launched"
+    assert isinstance(results[1].error, RateLimited)
+
+
+def test_store_evicts_idle_callers(clock: Clock):
+    store = MemoryStore(clock=clock)
+    for caller in range(5000):
+        clock.now += 0.001
+        store.acquire(caller, 1, 0)
+    assert len(store.entries) < 2100  # Only the last second's callers are kept.
+
+    bounded = MemoryStore(maxsize=100, clock=clock)
+    for caller in range(1000):
+        assert bounded.acquire(caller, 1000, 0) == 0
+        assert len(bounded.entries) <= 100
+    assert bounded.acquire(999, 1000, 0) > 0
+
+    assert bounded.acquire("active", 1000, 0) == 0
+    for caller in range(1000, 2000):
+        bounded.acquire(caller, 1000, 0)
+        assert bounded.acquire("active", 1000, 0) > 0  # Kept while it's used, even when rejected.
+
+
+def test_rejected_calls_are_refunded(store: MemoryStore):
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.cooldown(86400, key="user", store=store)
+    @meta.rate_limit(3, 60, store=store)
+    def daily(user: int):
+        return user
+
+    assert daily(user=1) == 1
+    for _ in range(5):
+        with pytest.raises(RateLimited):
+            daily(user=1)  # Rejected by the cooldown, so the rate limit doesn't count them.
+    assert daily(user=2) == 2
+    assert daily(user=3) == 3
+    with pytest.raises(RateLimited):
+        daily(user=4)
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        meta.rate_limit(0, 1)(lambda: None)
+    with pytest.raises(ValueError):
+        meta.cooldown(0)(lambda: None)
@@ -0,0 +1,124 @@
+import importlib
+import sys
+
+from invokify import InvokeEngine, ManifestError, export_manifest, load_manifest, read_manifest, write_manifest
+from tests import lazy_registry
+import pytest
+
+MODULE = "tests.lazy_commands"
+
+
+@pytest.fixture
+def engine():
+    sys.modules.pop(MODULE, None)
+    lazy_registry.engine = InvokeEngine()
+    importlib.import_module(MODULE)
+    yield lazy_registry.engine
+    sys.modules.pop(MODULE, None)
+
+
+def fresh_engine() -> InvokeEngine:
+    sys.modules.pop(MODULE, None)
+    lazy_registry.engine = InvokeEngine()
+    return lazy_registry.engine
+
+
+def test_export(engine: InvokeEngine):
+    assert export_manifest(engine) == {
+        "version": 1,
+        "frozen": False,
+        "prefix_matching": False,
+        "commands": [
+            {
+                "name": "buy",
+                "source": f"{MODULE}:buy",
+                "aliases": ["purchase"],
+                "requires": {"engine": True, "command": False},
+                "children": [{"name": "all", "source": f"{MODULE}:all"}],
+            },
+            {"name": "sell", "source": f"{MODULE}:sell", "aliases": ["s"]},
+        ],
+    }
+
+
+def test_unexportable_commands():
+    engine = InvokeEngine()
+
+    @engine.command
+    def local():
+        pass
+
+    with pytest.raises(ManifestError):
+        export_manifest(engine)
+
+
+def first():
+    pass
+
+
+def second():
+    pass
+
+
+def test_functions_with_the_same_path():
+    engine = InvokeEngine()
+    engine.command(first, name="buy").subcommand(first, name="all")
+    engine.command(second, name="sell").subcommand(second, name="all")
+    assert [entry["source"] for entry in export_manifest(engine)["commands"]] == [
+        f"{__name__}:first",
+        f"{__name__}:second",
+    ]
+
+    second.__qualname__ = "first"  # Like two subcommands defined as `def all` in one module.
+    try:
+        with pytest.raises(ManifestError):
+            export_manifest(engine)
+    finally:
+        second.__qualname__ = "second"
+
+
+@pytest.mark.parametrize("filename", ["manifest.json", "manifest.bin"])
+def test_round_trip(engine: InvokeEngine, tmp_path, filename: str):
+    engine.freeze()
+    path = tmp_path / filename
+    write_manifest(engine, path)
+    manifest = read_manifest(path)
+    assert manifest == export_manifest(engine)
+
+    loaded = load_manifest(path, fresh_engine())
+    assert loaded.frozen
+    assert MODULE not in sys.modules
+    assert loaded.commands["buy"].requires == {"engine": True, "command": False}
+    assert loaded.commands["purchase"] is loaded.commands["buy"]
+
+    cmd, args, callstack = loaded.parse(["purchase", "all"])
+    assert MODULE in sys.modules
+    assert cmd() == "all"
+    cmd, args, _ = loaded.parse(["s", 4])
+    assert cmd(*args) == ("sell", 4)
+    assert export_manifest(loaded) == manifest
+
+
+def test_load_into_new_engine(engine: InvokeEngine):
+    manifest = export_manifest(engine)
+    loaded = load_manifest(manifest)
+
+    # The module registers on its own engine, so the lazy commands import their attributes.
+    cmd, args, _ = loaded.parse(["buy", 2])
+    assert cmd(*args, engine=loaded) == ("buy", 2)
+    assert loaded.parse(["buy", "all"])[0]() == "all"
+
+
+def test_invalid_manifests(tmp_path):
+    path = tmp_path / "manifest.bin"
+    path.write_bytes(b"INVOKIFY\x01not marshal")
+    with pytest.raises(ManifestError):
+        read_manifest(path)
+
+    path.write_bytes(b"INVOKIFY\x09")
+    with pytest.raises(ManifestError):
+        read_manifest(path)
+
+    path.write_text('{"version": 99, "commands": []}')
+    with pytest.raises(ManifestError):
+        read_manifest(path)
@@ -1,3 +1,5 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from invokify import InvokeEngine, meta, Command
 import pytest
@@ -72,3 +74,39 @@ def test_empty_help_text(engine: InvokeEngine):
     cmd, *_ = engine.parse(["thing"])
 
     assert cmd.helptext == None
+
+
+def test_injections_are_not_mutated(engine: InvokeEngine):
+    @engine.command
+    @meta.inject(var=10)
+    @meta.require(engine=True, command=True)
+    def thing(var: Any, engine: InvokeEngine, command: Command):
+        return var, engine, command
+
+    assert thing(engine=engine) == (10, engine, thing)
+    assert thing.injections == {"var": 10}
+
+
+def test_shared_command_between_threads():
+    engines = [InvokeEngine() for _ in range(8)]
+    barrier = threading.Barrier(len(engines))
+
+    @meta.require(engine=True, command=True)
+    def thing(index: int, engine: InvokeEngine, command: Command):
+        return index, engine, command
+
+    command = engines[0].command(thing)
+    for other in engines[1:]:
+        other.command(command)
+
+    def run(index: int) -> bool:
+        engine = engines[index]
+        barrier.wait()
+        for _ in range(2000):
+            cmd, *_ = engine.parse(["thing"])
+            if cmd(index, engine=engine) != (index, engine, command):
+                return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+        assert all(executor.map(run, range(len(engines))))
@@ -0,0 +1,112 @@
+import asyncio
+
+from invokify import AsyncInvokeEngine, CommandDispatcher, InvokeEngine, Metrics, meta
+from invokify.metrics import UNRESOLVED
+import pytest
+
+
+@pytest.fixture
+def engine():
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy(amount: int):
+        return 10 / amount
+
+    @buy.subcommand
+    def all():
+        return "everything"
+
+    return engine
+
+
+def test_disabled_by_default(engine: InvokeEngine):
+    assert engine.metrics is None
+    assert [result.value for result in engine.invoke_many(["buy 2"])] == [5]
+
+
+def test_invoke_many_records_phases(engine: InvokeEngine):
+    metrics = engine.instrument()
+
+    list(engine.invoke_many(["buy 2", "buy 0", "buy all", "buy 2", "missing"]))
+    snapshot = metrics.snapshot()
+
+    assert snapshot["buy"]["calls"] == 3
+    assert snapshot["buy"]["errors"] == 1
+    assert snapshot["buy all"]["calls"] == 1
+    assert snapshot["buy all"]["errors"] == 0
+    assert snapshot[UNRESOLVED] == {**snapshot[UNRESOLVED], "calls": 1, "errors": 1}
+    assert snapshot[UNRESOLVED]["execute"]["count"] == 0
+    for phase in ("parse", "resolve", "execute"):
+        assert snapshot["buy"][phase]["count"] == 3
+        assert sum(snapshot["buy"][phase]["counts"]) == 3
+
+
+def test_instrument_keeps_metrics(engine: InvokeEngine):
+    metrics = engine.instrument()
+    assert engine.instrument() is metrics
+
+    engine.metrics = None
+    list(engine.invoke_many(["buy 2"]))
+    assert metrics.snapshot() == {}
+
+    shared = Metrics()
+    assert engine.instrument(shared) is shared
+    list(engine.invoke_many(["buy 2"]))
+    assert shared.snapshot()["buy"]["calls"] == 1
+    shared.reset()
+    assert shared.snapshot() == {}
+
+
+def test_prometheus_format(engine: InvokeEngine):
+    metrics = engine.instrument(Metrics(buckets=(0.5, 1.0)))
+
+    list(engine.invoke_many(["buy 2", "buy 0"]))
+    text = metrics.prometheus()
+
+    assert 'invokify_command_calls_total{command="buy"} 2' in text
+    assert 'invokify_command_errors_total{command="buy"} 1' in text
+    assert 'invokify_command_seconds_bucket{command="buy",phase="execute",le="+Inf"} 2' in text
+    assert 'invokify_command_seconds_count{command="buy",phase="parse"} 2' in text
+    assert "# TYPE invokify_command_seconds histogram" in text
+    assert text.endswith("\n")
+
+
+def test_prometheus_escapes_labels():
+    metrics = Metrics()
+    metrics.record('say "hi"', 0.0, 0.0, 0.0, False)
+
+    assert 'command="say \\"hi\\""' in metrics.prometheus(prefix="bot")
+
+
+def test_async_invoke_records():
+    engine = AsyncInvokeEngine()
+    metrics = engine.instrument()
+
+    @engine.command
+    async def wait(seconds: float):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    assert asyncio.run(engine.invoke("wait 0.01")) == 0.01
+    snapshot = metrics.snapshot()["wait"]
+    assert snapshot["calls"] == 1
+    assert snapshot["execute"]["sum"] >= 0.01
+
+
+def test_dispatcher_records_on_completion():
+    engine = InvokeEngine()
+    metrics = engine.instrument()
+
+    @engine.command
+    @meta.executor("thread")
+    def fail():
+        raise RuntimeError("failed")
+
+    with CommandDispatcher(engine) as dispatcher:
+        future = dispatcher.submit("fail")
+        with pytest.raises(RuntimeError):
+            future.result()
+
+    snapshot = metrics.snapshot()["fail"]
+    assert snapshot == {**snapshot, "calls": 1, "errors": 1}
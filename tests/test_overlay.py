@@ -0,0 +1,188 @@
+from invokify import CommandAlreadyExists, CommandNotFound, CommandOverlay, InvokeEngine, meta
+import pytest
+
+
+@pytest.fixture
+def base():
+    engine = InvokeEngine()
+
+    @engine.command(aliases=["purchase"])
+    def buy(amount: int):
+        return ("buy", amount)
+
+    @buy.subcommand
+    def all():
+        return "all"
+
+    @engine.command
+    def sell(amount: int):
+        return ("sell", amount)
+
+    return engine
+
+
+def test_overlay_inherits_base(base: InvokeEngine):
+    tenant = base.overlay()
+    assert isinstance(tenant.commands, CommandOverlay)
+    assert tenant.commands["buy"] is base.commands["buy"]
+    assert tenant.parse(["purchase", "all"])[0] is base.commands["buy"].children["all"]
+
+    @base.command
+    def later():
+        return "later"
+
+    assert tenant.parse(["later"])[0] is later
+
+
+def test_add_override_hide(base: InvokeEngine):
+    tenant = base.overlay()
+
+    @tenant.command
+    def trade():
+        return "trade"
+
+    with pytest.raises(CommandAlreadyExists):
+        tenant.command(lambda: None, name="sell")
+
+    @tenant.override
+    @meta.help("Sells twice.")
+    def sell(amount: int):
+        return ("sell", amount * 2)
+
+    tenant.hide("purchase")
+
+    assert tenant.parse(["sell", 2])[0](2) == ("sell", 4)
+    assert tenant.parse(["purchase"])[0] is None
+    assert tenant.parse(["buy"])[0] is None
+    assert tenant.parse(["trade"])[0] is trade
+
+    assert set(base.commands) == {"buy", "purchase", "sell"}
+    assert base.parse(["sell", 2])[0](2) == ("sell", 2)
+
+    @base.command
+    def trade_all():
+        return "all"
+
+    base.commands["buy"].subcommand(lambda: None, name="some")
+    assert "buy" not in tenant.commands  # Hidden names stay hidden.
+
+    tenant.commands.restore("buy", "purchase", "sell")
+    assert tenant.commands["sell"] is base.commands["sell"]
+    assert tenant.commands["purchase"] is base.commands["buy"]
+
+
+def test_edit_copies_on_write(base: InvokeEngine):
+    tenant = base.overlay()
+    all = tenant.edit("buy", "all")
+
+    @all.subcommand
+    def deep():
+        return "deep"
+
+    buy = tenant.commands["buy"]
+    assert buy is not base.commands["buy"]
+    assert tenant.commands["purchase"] is buy
+    assert tenant.parse(["purchase", "all", "deep"])[0] is deep
+    assert base.parse(["buy", "all", "deep"])[0] is base.commands["buy"].children["all"]
+    assert not base.commands["buy"].children["all"].children
+
+    assert tenant.edit("buy", "all") is all  # Copied once.
+    assert base.edit("buy") is base.commands["buy"]
+    with pytest.raises(CommandNotFound):
+        tenant.edit("buy", "missing")
+
+
+def test_prefixes_follow_same_size_changes(base: InvokeEngine):
+    tenant = base.overlay()
+    tenant.prefix_matching = True
+    assert tenant.parse(["se"])[0] is base.commands["sell"]
+
+    base.hide("sell")
+
+    @base.command
+    def trade():
+        return "trade"
+
+    assert tenant.parse(["se"])[0] is None
+    assert tenant.parse(["tr"])[0] is trade
+    assert tenant.suggest("trqde") == ["trade"]
+    assert tenant.suggest("sel") == []
+    assert tenant.complete("t").candidates == ("trade",)
+
+
+def test_prefixes_follow_restore(base: InvokeEngine):
+    tenant = base.overlay()
+    tenant.prefix_matching = True
+
+    @tenant.override
+    def buy(amount: int):
+        return ("tenant", amount)
+
+    assert tenant.parse(["bu"])[0] is buy
+    tenant.commands.restore("buy")
+    assert tenant.parse(["buy"])[0] is base.commands["buy"]
+    assert tenant.parse(["bu"])[0] is base.commands["buy"]
+
+
+def test_nested_overlays(base: InvokeEngine):
+    guild = base.overlay()
+    user = guild.overlay()
+
+    guild.hide("sell")
+
+    @base.command
+    def trade():
+        return "trade"
+
+    @guild.override(name="buy")
+    def guild_buy():
+        return "guild"
+
+    assert user.parse(["trade"])[0] is trade
+    assert user.parse(["sell"])[0] is None
+    assert user.parse(["buy"])[0] is guild_buy
+    assert user.parse(["purchase"])[0] is None
+    assert set(user.commands) == {"buy", "trade"}
+    assert dict(user.commands.items()) == {"buy": guild_buy, "trade": trade}
+
+    @base.command
+    def other():
+        return "other"
+
+    assert user.parse(["other"])[0] is other
+
+
+def test_overlay_remembers_only_used_names(base: InvokeEngine):
+    tenant = base.overlay()
+    assert dict.__len__(tenant.commands) == 0
+    assert len(tenant.commands) == 3
+
+    tenant.parse(["buy", "all"])
+    tenant.parse(["missing"])
+    assert dict.__len__(tenant.commands) == 1
+
+    @base.command
+    def trade():
+        return "trade"
+
+    assert dict.__len__(tenant.commands) == 1
+    assert tenant.parse(["trade"])[0] is trade
+    assert dict.__len__(tenant.commands) == 1  # Forgotten once the base changed.
+
+
+def test_overlay_of_frozen_and_compacted_base(base: InvokeEngine):
+    base.compact()
+    tenant = base.overlay()
+    base.compact()
+
+    @base.command
+    def trade():
+        return "trade"
+
+    assert tenant.parse(["trade"])[0] is trade
+
+    base.freeze()
+    frozen_tenant = base.overlay()
+    frozen_tenant.hide("sell")
+    assert frozen_tenant.parse(["sell"])[0] is None
+    assert frozen_tenant.edit("buy").children is not base.commands["buy"].children
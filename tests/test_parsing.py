@@ -1,4 +1,4 @@
-from invokify import InvokeEngine, string_to_args
+from invokify import InvokeEngine, string_to_args, ArgParser, CacheInfo
 import pytest
 
 
@@ -44,3 +44,67 @@ def test_parsing_simple(engine: InvokeEngine):
 
     assert result() == "greetings"
     assert result2() == "hello"
+
+
+def test_arg_parser_matches_string_to_args():
+    parser = ArgParser()
+    string = 'buy 10 [1, [2, "three"]] -4.5'
+
+    assert parser.parse(string) == ("buy", 10, (1, (2, "three")), -4.5)
+    assert parser.cache_info().misses == 0
+
+
+def test_arg_parser_cache():
+    parser = ArgParser(cache_size=2)
+
+    first = parser.parse("buy [1, 2]")
+    assert parser.parse("buy [1, 2]") is first
+    parser.parse("sell 5")
+    parser.parse("balance")
+
+    info = parser.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (1, 3, 1, 2)
+
+    # "buy [1, 2]" was the least recently used entry, so it was evicted.
+    assert parser.parse("buy [1, 2]") is not first
+    assert parser.cache_info().misses == 4
+
+    parser.cache_clear()
+    assert parser.cache_info() == CacheInfo(0, 0, 0, 0, 2)
+
+
+def test_arg_parser_results_are_immutable():
+    parser = ArgParser(cache_size=8)
+
+    result = parser.parse("buy [1, 2]")
+    with pytest.raises(TypeError):
+        result[1][0] = 5  # type: ignore
+
+    assert parser.parse("buy [1, 2]") == ("buy", (1, 2))
+
+
+def test_arg_parser_unknown_backend():
+    with pytest.raises(ValueError):
+        ArgParser(backend="missing")
+
+
+def test_parsing_remaining_args(engine: InvokeEngine):
+    @engine.command
+    def buy(amount: int, items: list):
+        return amount, items
+
+    command_list = ["buy", 10, [1, 2]]
+    cmd, args, callstack = engine.parse(command_list)
+
+    assert args == [10, [1, 2]]
+    assert callstack == (buy,)
+    assert cmd(*args) == (10, [1, 2])
+
+
+def test_parsing_unknown_command(engine: InvokeEngine):
+    command_list = [[1, 2], "thing"]
+    cmd, args, callstack = engine.parse(command_list)
+
+    assert cmd is None
+    assert args is command_list
+    assert callstack == ()
@@ -0,0 +1,85 @@
+from invokify import (
+    Chain,
+    CommandNotFound,
+    InvalidArgumentSyntax,
+    InvokeEngine,
+    meta,
+    string_to_chain,
+)
+from invokify.pipeline import AND, PIPE
+import pytest
+
+
+@pytest.fixture
+def engine():
+    engine = InvokeEngine()
+
+    @engine.command
+    @meta.coerce()
+    def buy(amount: int):
+        return amount * 2
+
+    @buy.subcommand
+    def all():
+        return "everything"
+
+    @engine.command
+    def echo(*words):
+        return words
+
+    @engine.command
+    def fail():
+        raise RuntimeError
+
+    return engine
+
+
+def test_string_to_chain():
+    assert string_to_chain('buy 10 && sell "&&" | log [1, 2]') == [
+        "buy", 10, AND, "sell", "&&", PIPE, "log", [1, 2]
+    ]
+    assert type(string_to_chain('"&&"')[0]) is str
+    assert string_to_chain("a&&b") == ["a&&b"]
+
+
+def test_and(engine: InvokeEngine):
+    assert engine.invoke_chain("buy 10 && buy all && echo a b") == [20, "everything", ("a", "b")]
+
+
+def test_pipe(engine: InvokeEngine):
+    assert engine.invoke_chain("buy 10 | echo a | echo") == [20, ("a", 20), (("a", 20),)]
+    assert engine.invoke_chain('echo a && buy 3 | echo "|"') == [("a",), 6, ("|", 6)]
+
+
+def test_chain_is_resolved_once(engine: InvokeEngine):
+    chain = engine.chain("buy 1 && buy all")
+    assert isinstance(chain, Chain)
+    assert [link.command.name for link in chain.links] == ["buy", "all"]
+    buy = engine.commands["buy"]
+    assert chain.links[1].callstack == (buy, buy.children["all"])
+    assert engine.invoke_chain(chain) == engine.invoke_chain(chain) == [2, "everything"]
+    assert engine.invoke_chain(["echo", 1, AND, "echo"], "x") == [("x", 1), ("x",)]
+
+
+def test_errors(engine: InvokeEngine):
+    with pytest.raises(CommandNotFound):
+        engine.chain("buy 1 && missing")
+    for line in ("&& buy 1", "buy 1 |", "buy 1 && | echo"):
+        with pytest.raises(InvalidArgumentSyntax):
+            engine.chain(line)
+
+    results = []
+    engine.commands["echo"].func = lambda *words: results.append(words)
+    engine.commands["echo"].prepare()
+    with pytest.raises(RuntimeError):
+        engine.invoke_chain("echo 1 && fail && echo 2")
+    assert results == [(1,)]
+
+
+def test_chain_metrics(engine: InvokeEngine):
+    metrics = engine.instrument()
+    with pytest.raises(RuntimeError):
+        engine.invoke_chain("buy 1 && buy all && fail")
+    snapshot = metrics.snapshot()
+    assert set(snapshot) == {"buy", "buy all", "fail"}
+    assert snapshot["fail"]["errors"] == 1 and snapshot["buy"]["errors"] == 0
@@ -0,0 +1,108 @@
+import asyncio
+import io
+import time
+
+from invokify import AsyncInvokeEngine, CommandDispatcher, InvokeEngine, Profiler, meta
+import pytest
+
+
+def spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def engine():
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy():
+        spin(0.05)
+
+    @buy.subcommand
+    def all():
+        spin(0.05)
+
+    @engine.command
+    def sell():
+        spin(0.05)
+
+    return engine
+
+
+def test_profile_collapsed_stacks(engine: InvokeEngine):
+    with engine.profile() as profiler:
+        list(engine.invoke_many(["buy", "buy all"]))
+
+    assert engine.profiler is None
+    assert profiler.samples > 0
+    lines = profiler.collapsed().splitlines()
+    assert any(line.startswith("buy;engine.<locals>.buy (") for line in lines)
+    assert any(line.startswith("buy;all;engine.<locals>.all (") for line in lines)
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";spin (" in stack
+
+
+def test_profile_selected_paths(engine: InvokeEngine):
+    with engine.profile("buy") as profiler:
+        list(engine.invoke_many(["sell", "buy all"]))
+
+    assert profiler.samples > 0
+    assert all(stack.startswith("buy;all;") for stack in profiler.stacks)
+    assert profiler.wants("buy all")
+    assert not profiler.wants("buyer")
+
+
+def test_meta_profile():
+    engine = InvokeEngine()
+    shared = Profiler(interval=0.001)
+
+    @engine.command
+    @meta.profile(shared)
+    def slow():
+        spin(0.05)
+
+    @engine.command
+    @meta.profile()
+    def other():
+        spin(0.01)
+
+    list(engine.invoke_many(["slow"]))
+    shared.stop()
+
+    assert slow.profiler is shared
+    assert isinstance(other.profiler, Profiler) and other.profiler is not shared
+    assert shared.samples > 0
+    assert all(stack.startswith("slow;") for stack in shared.stacks)
+
+    output = io.StringIO()
+    shared.write(output)
+    assert output.getvalue() == shared.collapsed()
+    shared.clear()
+    assert shared.collapsed() == "" and shared.samples == 0
+
+
+def test_profile_async_and_threads():
+    engine = AsyncInvokeEngine()
+
+    @engine.command
+    async def wait():
+        await asyncio.sleep(0.02)
+        spin(0.05)
+
+    @engine.command
+    @meta.executor("thread")
+    def work():
+        spin(0.05)
+
+    with engine.profile() as profiler:
+        asyncio.run(engine.invoke("wait"))
+        with CommandDispatcher(engine) as dispatcher:
+            dispatcher.submit("work").result()
+
+    assert any(stack.startswith("wait;") for stack in profiler.stacks)
+    assert any(stack.startswith("work;") for stack in profiler.stacks)
+    assert not profiler.active
@@ -0,0 +1,116 @@
+import io
+import mmap
+import random
+import socket
+import tempfile
+from invokify import InvokeEngine, CommandSplitter, CommandTooLong, read_commands
+from invokify.parser import InvalidArgumentSyntax
+import pytest
+
+SCRIPT = 'buy 10\nsay "multi\nline \\"quoted\\" text"\r\n\n   \nsell [1, 2]\nsay "end\\\\"'
+COMMANDS = ["buy 10", 'say "multi\nline \\"quoted\\" text"', "sell [1, 2]", 'say "end\\\\"']
+
+
+@pytest.fixture
+def engine():
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy(amount: int):
+        ...
+
+    @engine.command
+    def sell(items: list):
+        ...
+
+    @engine.command
+    def say(text: str):
+        ...
+
+    return engine
+
+
+def split(chunks: list[str], max_length: int = 1 << 20) -> list[str]:
+    splitter = CommandSplitter(max_length)
+    commands = [command for chunk in chunks for command in splitter.feed(chunk)]
+    return commands + splitter.flush()
+
+
+def test_split_commands():
+    assert split([SCRIPT]) == COMMANDS
+
+
+def test_split_commands_in_random_chunks():
+    rng = random.Random(42)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(len(SCRIPT)), rng.randint(1, 12)))
+        chunks = [SCRIPT[start:end] for start, end in zip([0, *cuts], [*cuts, len(SCRIPT)])]
+        assert split(chunks) == COMMANDS
+
+
+def test_split_commands_too_long():
+    with pytest.raises(CommandTooLong):
+        split(['say "never closed', " and more" * 10], max_length=50)
+
+    assert split(["a" * 50, "\nb"], max_length=50) == ["a" * 50, "b"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_split_resumes_after_too_long_commands(chunk_size: int):
+    text = 'say "never closed\nbuy 1\nbuy 2\n' + "x" * 40 + '\nsell [1]\nbuy 3'
+    errors = []
+    splitter = CommandSplitter(30, lambda line, error: errors.append((line, error)))
+    chunks = [text[start : start + chunk_size] for start in range(0, len(text), chunk_size)]
+    commands = [command for chunk in chunks for command in splitter.feed(chunk)]
+
+    assert commands + splitter.flush() == ["buy 1", "buy 2", "sell [1]", "buy 3"]
+    assert [line for line, _ in errors][0] == 'say "never closed'
+    assert errors[1][0].startswith("x") and len(errors) == 2
+    assert all(isinstance(error, CommandTooLong) for _, error in errors)
+
+
+def test_read_text_and_binary_streams(engine: InvokeEngine):
+    for source in (io.StringIO(SCRIPT), io.BytesIO(SCRIPT.encode()), io.BufferedReader(io.BytesIO(SCRIPT.encode()))):
+        results = list(read_commands(engine, source, chunk_size=3))
+        assert [cmd.name for cmd, _, _ in results] == ["buy", "say", "sell", "say"]
+        assert results[1][1] == ['multi\nline "quoted" text']
+
+
+def test_read_multibyte_characters(engine: InvokeEngine):
+    source = io.BytesIO('say "héllo wörld"\n'.encode())
+
+    (cmd, args, callstack), = read_commands(engine, source, chunk_size=1)
+    assert args == ["héllo wörld"]
+
+
+def test_read_mmap(engine: InvokeEngine):
+    with tempfile.TemporaryFile() as file:
+        file.write(SCRIPT.encode())
+        file.flush()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert len(list(read_commands(engine, mapped, chunk_size=4))) == 4
+
+
+def test_read_socket(engine: InvokeEngine):
+    left, right = socket.socketpair()
+    with left, right:
+        right.sendall(SCRIPT.encode())
+        right.close()
+        assert len(list(read_commands(engine, left, chunk_size=5))) == 4
+
+
+def test_read_errors(engine: InvokeEngine):
+    with pytest.raises(InvalidArgumentSyntax):
+        list(read_commands(engine, ["buy [1\nbuy 2\n"]))
+
+    errors = []
+    results = list(read_commands(engine, ["buy [1\nbuy 2\n"], on_error=lambda command, error: errors.append(command)))
+    assert errors == ["buy [1"]
+    assert results[0][1] == [2]
+
+    errors.clear()
+    results = list(
+        read_commands(engine, ['say "oops\nbuy 2\n'], max_length=8, on_error=lambda command, error: errors.append(command))
+    )
+    assert errors == ['say "oops']
+    assert results[0][1] == [2]
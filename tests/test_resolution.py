@@ -0,0 +1,135 @@
+from invokify import InvokeEngine
+from invokify.resolution import build_index, edit_distance
+import pytest
+
+
+@pytest.fixture
+def engine():
+    engine = InvokeEngine(prefix_matching=True)
+
+    @engine.command(aliases=["purchase"])
+    def buy():
+        return "buy"
+
+    @buy.subcommand
+    def all():
+        return "all"
+
+    @engine.command
+    def balance():
+        return "balance"
+
+    @engine.command
+    def sell():
+        return "sell"
+
+    return engine
+
+
+def test_prefix_matching_is_opt_in():
+    engine = InvokeEngine()
+
+    @engine.command
+    def buy():
+        pass
+
+    assert engine.parse(["bu"])[0] is None
+    assert engine.suggest("bu") == ["buy"]
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_unique_prefixes(engine: InvokeEngine, frozen: bool):
+    if frozen:
+        engine.freeze()
+
+    assert engine.parse(["bu"])[0].name == "buy"
+    assert engine.parse(["pur", "a", 10]) == (engine.commands["buy"].children["all"], [10], engine.parse(["buy", "all"])[2])
+    assert engine.parse(["s", 1])[0].name == "sell"
+    assert engine.parse(["b"]) == (None, ["b"], ())  # buy and balance
+    assert engine.parse(["buy"])[0].name == "buy"
+
+
+def test_prefix_of_aliases_is_unique(engine: InvokeEngine):
+    @engine.command(aliases=["zap", "zapper"])
+    def zoom():
+        pass
+
+    assert engine.parse(["za"])[0] is zoom
+    assert engine.parse(["z"])[0] is zoom
+
+
+def test_index_rebuilds_after_registration(engine: InvokeEngine):
+    assert engine.parse(["se"])[0].name == "sell"
+
+    @engine.command
+    def send():
+        pass
+
+    assert engine.parse(["se"])[0] is None
+    assert engine.parse(["sen"])[0] is send
+
+
+def test_index_rebuilds_after_same_size_changes(engine: InvokeEngine):
+    buy = engine.commands["buy"]
+    assert engine.parse(["buy", "a"])[0] is buy.children["all"]
+
+    del buy.children["all"]
+
+    @buy.subcommand
+    def any():
+        pass
+
+    assert len(buy.children) == 1
+    assert engine.parse(["buy", "a"])[0] is any
+
+
+def test_suggest(engine: InvokeEngine):
+    assert engine.suggest("biy") == ["buy"]
+    assert engine.suggest("b") == ["balance", "buy"]
+    assert engine.suggest("buy alll") == ["buy all"]
+    assert engine.suggest("purchse") == ["purchase"]
+    assert engine.suggest("buy all") == []
+    assert engine.suggest("xyzzy") == []
+    assert engine.suggest(["sella"]) == ["sell"]
+    assert engine.suggest("selll", limit=0) == []
+
+
+def test_wide_engine():
+    engine = InvokeEngine(prefix_matching=True)
+    for index in range(20_000):
+        engine.command(lambda: None, name=f"command{index:05}", aliases=[f"alias{index:05}"])
+
+    assert engine.parse(["command1234"])[0] is None  # command12340 to command12349
+    assert engine.parse(["command12345"])[0].name == "command12345"
+    assert engine.parse(["alias19999"])[0].name == "command19999"
+
+    @engine.command
+    def zebra():
+        pass
+
+    assert engine.parse(["ze"])[0] is zebra
+    assert engine.suggest("comand12345", limit=1) == ["command12345"]
+
+
+def test_similar_names():
+    index = build_index({"buy": 1, "bus": 2, "sell": 3, "a": 4})
+
+    assert index.similar("buz") == [(1, "bus"), (1, "buy")]
+    assert index.similar("bu", max_distance=1) == [(1, "bus"), (1, "buy")]
+    assert index.starting_with("bu") == ["bus", "buy"]
+    assert index.starting_with("bu", limit=1) == ["bus"]
+    assert index.unique_prefix("s") == 3
+    assert index.unique_prefix("bu") is None
+    assert edit_distance("kitten", "sitting", 5) == 3
+    assert edit_distance("kitten", "sitting", 1) == 2
+
+
+def test_similar_names_share_common_bigrams():
+    words = ["send", "end", "sender", "ends", "mend", "lend"]
+    names = {f"{first}{second}": None for first in words for second in words}
+    index = build_index(names)
+
+    for name in ["sendend", "lendsend", "endmend", "sendr", "xyz"]:
+        assert index.similar(name) == sorted(
+            (distance, other) for other in names if (distance := edit_distance(name, other, 2)) <= 2
+        )
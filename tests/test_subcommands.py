@@ -66,3 +66,16 @@ def test_stacking_subcommands(engine: InvokeEngine):
 
     cmd, *_ = engine.parse(["extra"])
     assert cmd() == "extra"
+
+
+def test_deep_subcommands(engine: InvokeEngine):
+    command = engine.command(lambda: 0, name="level0")
+    for depth in range(1, 50):
+        command = command.subcommand(lambda depth=depth: depth, name=f"level{depth}")
+
+    path = [f"level{depth}" for depth in range(50)]
+    cmd, args, callstack = engine.parse([*path, "tail", 1, 2])
+
+    assert cmd() == 49
+    assert args == ["tail", 1, 2]
+    assert [c.name for c in callstack] == path
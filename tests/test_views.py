@@ -0,0 +1,84 @@
+from array import array
+
+from invokify import ArgParser, InvokeEngine, StringView, meta, string_to_args
+from invokify.parser import ARRAY_THRESHOLD, VIEW_THRESHOLD
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return InvokeEngine()
+
+
+def numbers(amount: int, form: str = "{}") -> str:
+    return "[" + ", ".join(form.format(index) for index in range(amount)) + "]"
+
+
+def test_large_lists_become_arrays():
+    ints, floats = string_to_args(
+        f"{numbers(ARRAY_THRESHOLD)} {numbers(ARRAY_THRESHOLD, '{}.5')}", backend="views"
+    )
+
+    assert isinstance(ints, array) and ints.typecode == "q"
+    assert ints.tolist() == list(range(ARRAY_THRESHOLD))
+    assert isinstance(floats, array) and floats.typecode == "d"
+    assert floats[1] == 1.5
+
+
+@pytest.mark.parametrize(
+    "string",
+    [
+        numbers(ARRAY_THRESHOLD - 1),
+        "[" + ", ".join(["1", "2.5"] * ARRAY_THRESHOLD) + "]",
+        "[" + ", ".join(["1"] * ARRAY_THRESHOLD + ["a"]) + "]",
+        "[" + ", ".join(["1"] * ARRAY_THRESHOLD + [str(2**64)]) + "]",
+        "[[1, 2], 3]",
+    ],
+)
+def test_other_lists_match_native(string: str):
+    (value,) = string_to_args(string, backend="views")
+
+    assert isinstance(value, list)
+    assert value == string_to_args(string)[0]
+
+
+def test_large_strings_become_views():
+    text = "words " * VIEW_THRESHOLD
+    line = f'say "{text}" "short"'
+    _, view, short = string_to_args(line, backend="views")
+
+    assert isinstance(view, StringView) and view.source is line
+    assert view == text and str(view) == text and len(view) == len(text)
+    assert hash(view) == hash(text)
+    assert view[0] == "w" and view[-1] == " " and view[:5] == "words"
+    assert type(short) is str
+
+
+def test_escaped_strings_are_copied():
+    (value,) = string_to_args('"' + "a" * VIEW_THRESHOLD + '\\n"', backend="views")
+
+    assert type(value) is str and value.endswith("\n")
+
+
+def test_cached_arrays_are_read_only():
+    parser = ArgParser(backend="views", cache_size=4)
+    first = parser.parse(numbers(ARRAY_THRESHOLD))[0]
+
+    assert isinstance(first, memoryview) and first.readonly
+    assert parser.parse(numbers(ARRAY_THRESHOLD))[0] is first
+    with pytest.raises(TypeError):
+        first[0] = 5
+
+
+def test_coerce_views(engine: InvokeEngine):
+    @engine.command
+    @meta.coerce()
+    def store(ids: list[int], note: str):
+        return ids, note
+
+    text = "n" * VIEW_THRESHOLD
+    cmd, args, _ = engine.parse(string_to_args(f'store {numbers(ARRAY_THRESHOLD)} "{text}"', backend="views"))
+    ids, note = cmd(*args)
+
+    assert ids == list(range(ARRAY_THRESHOLD))
+    assert type(note) is str and note == text